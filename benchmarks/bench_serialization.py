@@ -0,0 +1,86 @@
+"""レスポンスシリアライズの高速パスのマイクロベンチマーク
+
+実行方法:
+    uv run python benchmarks/bench_serialization.py
+"""
+
+import asyncio
+import json
+import time
+import timeit
+from collections.abc import Callable
+
+import httpx
+from fastapi import APIRouter, FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+
+from python_project_2026.responses import ModelResponse, TrustedModelRoute
+from python_project_2026.routers.hello import HelloResponse
+
+MODEL = HelloResponse(message="こんにちは、World!", name="World")
+ADAPTER = TypeAdapter(HelloResponse)
+
+
+def default_serialize() -> bytes:
+    """FastAPIの通常経路に相当する処理(再検証 + jsonable_encoder + json.dumps)"""
+    validated = ADAPTER.validate_python(MODEL, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast_serialize() -> bytes:
+    """高速パス(事前コンパイル済みシリアライザーで直接バイト列化)"""
+    return ModelResponse(MODEL).body
+
+
+def build_app(route_class: type[APIRoute]) -> FastAPI:
+    """指定したルートクラスで /hello を持つアプリを作成"""
+    router = APIRouter(route_class=route_class)
+
+    @router.get("/hello", response_model=HelloResponse)
+    async def hello() -> HelloResponse:
+        return HelloResponse(message="こんにちは、World!", name="World")
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+async def requests_per_second(app: FastAPI, requests: int) -> float:
+    """ASGIトランスポート経由でアプリ内のリクエスト処理性能を計測"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(100):
+            await client.get("/hello")
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get("/hello")
+        return requests / (time.perf_counter() - start)
+
+
+def report(label: str, func: Callable[[], bytes], number: int) -> float:
+    """関数1回あたりの所要時間(マイクロ秒)を表示"""
+    per_call = min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+    print(f"{label:<28} {per_call:8.2f} µs/op")
+    return per_call
+
+
+def main() -> None:
+    """ベンチマークを実行して結果を表示"""
+    assert default_serialize() == fast_serialize()
+
+    print("== シリアライズ単体 ==")
+    default = report("再検証 + jsonable_encoder", default_serialize, 20_000)
+    fast = report("ModelResponse", fast_serialize, 20_000)
+    print(f"{'高速化率':<28} {default / fast:8.2f} x")
+
+    print("== ASGIアプリ経由 ==")
+    default_rps = asyncio.run(requests_per_second(build_app(APIRoute), 2_000))
+    fast_rps = asyncio.run(requests_per_second(build_app(TrustedModelRoute), 2_000))
+    print(f"{'APIRoute':<28} {default_rps:8.0f} req/s")
+    print(f"{'TrustedModelRoute':<28} {fast_rps:8.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
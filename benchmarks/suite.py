@@ -0,0 +1,212 @@
+"""ASGIアプリとユーティリティのベンチマークスイート(回帰検出付き)
+
+``api.app`` をASGIトランスポート経由でプロセス内から呼び出し、ルートごとのスループットと
+p50/p99レイテンシーを計測します。あわせてユーティリティ関数とPydanticモデルの
+マイクロベンチマークを実行します。
+
+実行方法:
+    # 計測してベースラインを保存
+    uv run python benchmarks/suite.py --save .benchmarks/baseline.json
+
+    # ベースラインと比較(閾値を超えて遅くなった項目があれば終了コード1)
+    uv run python benchmarks/suite.py --compare .benchmarks/baseline.json --threshold 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from python_project_2026 import __version__
+from python_project_2026.api import app
+from python_project_2026.routers.hello import HelloResponse, VersionResponse
+from python_project_2026.utils import format_size
+
+# 計測対象のルート(ベンチマーク名 -> パス)
+ROUTES = {
+    "route:/health": "/health",
+    "route:/api/": "/api/",
+    "route:/api/hello": "/api/hello?name=bench",
+    "route:/api/version": "/api/version",
+    "route:/api-info": "/api-info",
+    "route:/health-check": "/health-check",
+}
+
+HELLO_PAYLOAD = {"message": "こんにちは、bench!", "name": "bench"}
+
+
+@dataclass
+class Result:
+    """1項目の計測結果"""
+
+    ops_per_sec: float
+    p50_us: float
+    p99_us: float
+
+
+def percentile(sorted_samples: list[float], fraction: float) -> float:
+    """ソート済みの標本から百分位数を取得(最近傍法)"""
+    index = min(len(sorted_samples) - 1, max(0, round(fraction * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+async def bench_route(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> Result:
+    """1ルートのスループットとレイテンシーを計測"""
+    for _ in range(min(100, requests)):
+        (await client.get(path)).raise_for_status()
+
+    latencies: list[float] = []
+
+    async def worker(count: int) -> None:
+        for _ in range(count):
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    per_worker, remainder = divmod(requests, concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(per_worker + (i < remainder)) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return Result(
+        ops_per_sec=requests / elapsed,
+        p50_us=percentile(latencies, 0.50) * 1e6,
+        p99_us=percentile(latencies, 0.99) * 1e6,
+    )
+
+
+async def bench_routes(requests: int, concurrency: int, selected: Callable[[str], bool]) -> dict[str, Result]:
+    """全ルートを計測"""
+    results: dict[str, Result] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, path in ROUTES.items():
+            if selected(name):
+                results[name] = await bench_route(client, path, requests, concurrency)
+    return results
+
+
+def bench_function(func: Callable[[], object], number: int) -> Result:
+    """関数1回あたりの所要時間を計測(スループットは最良値、p50/p99には繰り返しの中央値/最大値を記録)"""
+    timings = [t / number for t in timeit.repeat(func, number=number, repeat=7)]
+    best = min(timings)
+    return Result(ops_per_sec=1 / best, p50_us=statistics.median(timings) * 1e6, p99_us=max(timings) * 1e6)
+
+
+MICRO_BENCHMARKS: dict[str, Callable[[], object]] = {
+    "utils.format_size": lambda: [format_size(n) for n in (0, 1023, 1536, 10**6, 10**9, 10**13)],
+    "HelloResponse.validate": lambda: HelloResponse.model_validate(HELLO_PAYLOAD),
+    "HelloResponse.dump_json": lambda: HelloResponse(**HELLO_PAYLOAD).model_dump_json(),
+    "VersionResponse.dump": lambda: VersionResponse(version=__version__, python_version="3.12.0").model_dump(),
+}
+
+
+def run(requests: int, concurrency: int, number: int, pattern: str | None) -> dict[str, Result]:
+    """すべてのベンチマークを実行"""
+
+    def selected(name: str) -> bool:
+        return pattern is None or pattern in name
+
+    results = asyncio.run(bench_routes(requests, concurrency, selected))
+    for name, func in MICRO_BENCHMARKS.items():
+        if selected(name):
+            results[name] = bench_function(func, number)
+    return results
+
+
+def compare(baseline: dict[str, Result], current: dict[str, Result], threshold: float) -> list[str]:
+    """ベースラインと比較し、閾値を超えて遅くなった項目を返す
+
+    スループットの低下とp50レイテンシーの増加を判定します。
+    p99は揺らぎが大きいため表示のみで判定には使いません。
+    """
+    regressions: list[str] = []
+    print(f"{'benchmark':<28} {'ops/s':>12} {'Δ':>8} {'p50 µs':>10} {'Δ':>8} {'p99 µs':>10} {'Δ':>8}")
+    for name, result in current.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<28} {result.ops_per_sec:12.1f} {'new':>8}")
+            continue
+        throughput = result.ops_per_sec / base.ops_per_sec - 1
+        p50 = result.p50_us / base.p50_us - 1
+        p99 = result.p99_us / base.p99_us - 1
+        regressed = throughput < -threshold or p50 > threshold
+        marker = "  REGRESSION" if regressed else ""
+        print(
+            f"{name:<28} {result.ops_per_sec:12.1f} {throughput:+8.1%} "
+            f"{result.p50_us:10.1f} {p50:+8.1%} {result.p99_us:10.1f} {p99:+8.1%}{marker}"
+        )
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def load(path: Path) -> dict[str, Result]:
+    """JSONベースラインを読み込む"""
+    data = json.loads(path.read_text())
+    return {name: Result(**values) for name, values in data["results"].items()}
+
+
+def save(path: Path, results: dict[str, Result]) -> None:
+    """計測結果をJSONベースラインとして保存"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document: dict[str, Any] = {
+        "meta": {
+            "version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": {name: asdict(result) for name, result in results.items()},
+    }
+    path.write_text(json.dumps(document, indent=2, ensure_ascii=False) + "\n")
+
+
+def main() -> int:
+    """コマンドライン引数を解釈してベンチマークを実行"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2_000, help="ルートごとのリクエスト数")
+    parser.add_argument("--concurrency", type=int, default=1, help="同時に送信するリクエスト数")
+    parser.add_argument("--number", type=int, default=10_000, help="マイクロベンチマークの1計測あたりの実行回数")
+    parser.add_argument("--filter", dest="pattern", help="名前にこの文字列を含む項目のみ実行")
+    parser.add_argument("--save", type=Path, help="結果を保存するJSONファイル")
+    parser.add_argument("--compare", type=Path, help="比較するベースラインのJSONファイル")
+    parser.add_argument("--threshold", type=float, default=0.15, help="回帰とみなす悪化率(0.15 = 15%%)")
+    args = parser.parse_args()
+
+    results = run(args.requests, args.concurrency, args.number, args.pattern)
+    if args.save:
+        save(args.save, results)
+        print(f"saved {len(results)} results to {args.save}")
+
+    if args.compare:
+        regressions = compare(load(args.compare), results, args.threshold)
+        if regressions:
+            print(
+                f"\n{len(regressions)} benchmark(s) regressed more than {args.threshold:.0%}: {', '.join(regressions)}"
+            )
+            return 1
+        return 0
+
+    if not args.save:
+        for name, result in results.items():
+            print(
+                f"{name:<28} {result.ops_per_sec:12.1f} ops/s  p50 {result.p50_us:9.1f} µs  p99 {result.p99_us:9.1f} µs"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""過負荷時のリクエスト受付制御(レート制限・同時実行数の上限・イベントループ遅延による制限)"""
+
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .loop_monitor import LoopLagMonitor
+from .utils import is_warmup
+
+# 受付制御の対象外とするパス(配下のパスも含む)
+DEFAULT_EXEMPT_PATHS = ("/health", "/metrics")
+
+# クライアントごとのトークンバケットを保持する最大数(超えたら最も長く使われていないものから破棄)
+MAX_TRACKED_CLIENTS = 10_000
+
+
+class TokenBucket:
+    """トークンバケットによるレート制限
+
+    ``rate`` 個/秒でトークンが補充され、最大 ``burst`` 個まで貯まります。
+    """
+
+    __slots__ = ("_clock", "burst", "rate", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._clock = clock
+        self.updated = clock()
+
+    def acquire(self) -> float:
+        """トークンを1つ消費
+
+        Returns:
+            消費できた場合は0、できなかった場合は次のトークンが貯まるまでの秒数
+        """
+        now = self._clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class ClientBuckets:
+    """クライアントごとのトークンバケット(保持数に上限あり)"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        max_clients: int = MAX_TRACKED_CLIENTS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._clock = clock
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, client: str) -> float:
+        """クライアントのトークンを1つ消費(戻り値は ``TokenBucket.acquire`` と同じ)"""
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            if len(self._buckets) >= self.max_clients:
+                self._buckets.popitem(last=False)
+            bucket = self._buckets[client] = TokenBucket(self.rate, self.burst, self._clock)
+        else:
+            self._buckets.move_to_end(client)
+        return bucket.acquire()
+
+
+@dataclass(frozen=True)
+class AdmissionSettings:
+    """受付制御の設定(0は無効)"""
+
+    # 1秒あたりに受け付けるリクエスト数と、一時的に超過を許す件数
+    rate_limit: float = 0.0
+    burst: int = 0
+    # Trueならクライアント(接続元アドレス)ごと、Falseならアプリケーション全体で制限
+    per_client: bool = False
+    # 同時に処理するリクエスト数の上限
+    max_in_flight: int = 0
+    # イベントループの遅延がこの秒数を超えている間は新しいリクエストを断る
+    max_loop_lag: float = 0.0
+    exempt_paths: tuple[str, ...] = DEFAULT_EXEMPT_PATHS
+
+    @property
+    def enabled(self) -> bool:
+        """いずれかの制限が有効か"""
+        return self.rate_limit > 0 or self.max_in_flight > 0 or self.max_loop_lag > 0
+
+
+class AdmissionStats:
+    """受付制御の集計(処理中のリクエスト数と、理由ごとに断った件数)
+
+    Server-Sent Events(``text/event-stream``)のレスポンスは接続が続く限り終わらないため、
+    レスポンスを開始した時点で処理中の件数から外します。
+    """
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.rejected: dict[str, int] = {"loop_lag": 0, "in_flight": 0, "rate_limit": 0}
+
+    def render_metrics(self) -> str:
+        """断ったリクエスト数と処理中のリクエスト数をPrometheus形式で出力"""
+        lines = [
+            "# HELP http_requests_rejected_total Requests rejected by admission control.",
+            "# TYPE http_requests_rejected_total counter",
+        ]
+        lines.extend(
+            f'http_requests_rejected_total{{reason="{reason}"}} {count}' for reason, count in self.rejected.items()
+        )
+        lines += [
+            "# HELP http_requests_admitted_in_flight Admitted requests being processed, excluding event streams.",
+            "# TYPE http_requests_admitted_in_flight gauge",
+            f"http_requests_admitted_in_flight {self.in_flight}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def is_exempt(path: str, exempt_paths: Iterable[str]) -> bool:
+    """受付制御の対象外のパスか(``/health`` なら ``/health/...`` も対象外、``/health-check`` は対象)"""
+    return any(path == prefix or path.startswith(prefix + "/") for prefix in exempt_paths)
+
+
+class AdmissionMiddleware:
+    """過負荷時に処理を始める前のリクエストを即座に断るASGIミドルウェア
+
+    断ったリクエストにはアプリケーションを呼ばずに ``Retry-After`` ヘッダー付きで応答します。
+
+    - イベントループの遅延が ``max_loop_lag`` を超えている: 503
+    - 処理中のリクエストが ``max_in_flight`` に達している: 503
+    - トークンバケットのレート制限を超えた: 429
+
+    ``exempt_paths`` 配下(ヘルスチェックとメトリクス)と起動時のウォームアップは常に受け付けます。
+    制限が無効でも処理中のリクエスト数は ``stats`` に集計します(Readinessの判定に使う)。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        settings: AdmissionSettings,
+        monitor: LoopLagMonitor | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        stats: AdmissionStats | None = None,
+    ) -> None:
+        self.app = app
+        self.settings = settings
+        self.monitor = monitor if monitor is not None else LoopLagMonitor()
+        self.stats = stats if stats is not None else AdmissionStats()
+        self._global_bucket: TokenBucket | None = None
+        self._client_buckets: ClientBuckets | None = None
+        if settings.rate_limit > 0:
+            burst = max(1, settings.burst)
+            if settings.per_client:
+                self._client_buckets = ClientBuckets(settings.rate_limit, burst, clock=clock)
+            else:
+                self._global_bucket = TokenBucket(settings.rate_limit, burst, clock)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or is_exempt(scope["path"], self.settings.exempt_paths) or is_warmup(scope):
+            await self.app(scope, receive, send)
+            return
+
+        settings = self.settings
+        stats = self.stats
+        if settings.max_loop_lag > 0:
+            self.monitor.ensure_started()
+            lag = self.monitor.lag
+            if lag > settings.max_loop_lag:
+                stats.rejected["loop_lag"] += 1
+                await _reject(send, 503, math.ceil(lag), "Server is overloaded")
+                return
+
+        if settings.max_in_flight > 0 and stats.in_flight >= settings.max_in_flight:
+            stats.rejected["in_flight"] += 1
+            await _reject(send, 503, 1, "Too many concurrent requests")
+            return
+
+        wait = self._acquire(scope)
+        if wait > 0:
+            stats.rejected["rate_limit"] += 1
+            await _reject(send, 429, math.ceil(wait), "Rate limit exceeded")
+            return
+
+        counted = True
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal counted
+            if message["type"] == "http.response.start" and counted and _is_event_stream(message):
+                counted = False
+                stats.in_flight -= 1
+            await send(message)
+
+        stats.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if counted:
+                stats.in_flight -= 1
+
+    def _acquire(self, scope: Scope) -> float:
+        if self._global_bucket is not None:
+            return self._global_bucket.acquire()
+        if self._client_buckets is not None:
+            client = scope.get("client")
+            return self._client_buckets.acquire(client[0] if client else "")
+        return 0.0
+
+
+def _is_event_stream(message: Message) -> bool:
+    content_type = Headers(raw=message.get("headers", [])).get("content-type", "")
+    return content_type.startswith("text/event-stream")
+
+
+async def _reject(send: Send, status: int, retry_after: int, detail: str) -> None:
+    content = f'{{"detail":"{detail}"}}'.encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(content)).encode()),
+                (b"retry-after", str(max(1, retry_after)).encode()),
+                (b"cache-control", b"no-store"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": content})
@@ -1,38 +1,280 @@
 """FastAPIアプリケーション"""
 
+import asyncio
 import os
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from dataclasses import asdict
 from pathlib import Path
+from typing import Any
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from . import __version__
-from .routers import hello, web
+from .admission import AdmissionMiddleware, AdmissionSettings, AdmissionStats
+from .assets import AssetStaticFiles, LazyAssetManifest, has_vendored_assets, install_url_for
+from .broadcast import Broadcaster
+from .compression import DEFAULT_CONTENT_TYPES, DEFAULT_ENCODINGS, CompressionMiddleware, CompressionSettings
+from .health import LIVE_BODY, HealthMonitor, HealthSnapshot, ReadinessThresholds
+from .http_client import HttpClientSettings, PoolStats, create_http_client, http2_available, pool_stats
+from .lifecycle import Drainer, DrainMiddleware, install_shutdown_hook, warm_up
+from .logs import AccessLogMiddleware
+from .logs import logger as log
+from .loop_monitor import LoopLagMonitor
+from .metrics import PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, MetricsRegistry
+from .profiling import ProfilingMiddleware
+from .providers import DataProvider, HttpDataProvider, LocalDataProvider
+from .responses import PrecomputedJSON
+from .routers import debug, hello, web
+from .shared_stats import SharedStats
+from .templating import configure_environment
+from .tracing import FileSpanExporter, SpanMiddleware, TracingMiddleware, TracingSettings
 
 # 環境設定
 ENVIRONMENT = os.getenv("ENVIRONMENT", "production")  # デフォルトは本番環境
 DEBUG = os.getenv("DEBUG", "false").lower() in ("true", "1", "yes")
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "").split(",") if os.getenv("ALLOWED_ORIGINS") else []
+# Web UIのデータ取得先(未設定なら同一プロセス内で構築、設定時のみHTTP経由で取得)
+API_BASE_URL = os.getenv("API_BASE_URL", "")
+
+# 外部HTTP通信用のコネクションプール設定
+HTTP_CLIENT_SETTINGS = HttpClientSettings(
+    max_connections=int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "5.0")),
+    timeout=float(os.getenv("HTTP_TIMEOUT", "5.0")),
+    connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "2.0")),
+    http2=os.getenv("HTTP2", "false").lower() in ("true", "1", "yes"),
+)
+
+# ヘルスチェックのServer-Sent Events配信設定
+HEALTH_STREAM_INTERVAL = float(os.getenv("HEALTH_STREAM_INTERVAL", "5.0"))
+HEALTH_STREAM_MAX_SUBSCRIBERS = int(os.getenv("HEALTH_STREAM_MAX_SUBSCRIBERS", "1000"))
+HEALTH_STREAM_QUEUE_SIZE = int(os.getenv("HEALTH_STREAM_QUEUE_SIZE", "1"))
+
+# テンプレートのバイトコードキャッシュ保存先(未設定ならJinja2の既定の利用者ごとのディレクトリ、空文字で無効化)
+# とフラグメントのキャッシュ秒数
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR")
+FRAGMENT_CACHE_TTL = float(os.getenv("FRAGMENT_CACHE_TTL", "5.0"))
+# Web UIのデータ取得結果を共有する秒数と、取得元の停止中に古い値を返し続ける上限秒数
+DATA_CACHE_TTL = float(os.getenv("DATA_CACHE_TTL", "2.0"))
+DATA_CACHE_MAX_STALE = float(os.getenv("DATA_CACHE_MAX_STALE", "60.0"))
+
+# フィンガープリント付き・事前圧縮済み静的ファイルの出力先と、CDNアセットのローカル配信
+STATIC_BUILD_DIR = os.getenv("STATIC_BUILD_DIR")
+USE_VENDORED_ASSETS = os.getenv("USE_VENDORED_ASSETS", "false").lower() in ("true", "1", "yes")
+
+# 一括挨拶エンドポイントの最大件数と、レスポンスをまとめて送出する件数
+HELLO_BATCH_MAX_SIZE = int(os.getenv("HELLO_BATCH_MAX_SIZE", "10000"))
+HELLO_BATCH_FLUSH_SIZE = int(os.getenv("HELLO_BATCH_FLUSH_SIZE", "100"))
+HELLO_BATCH_MAX_ITEM_SIZE = int(os.getenv("HELLO_BATCH_MAX_ITEM_SIZE", "65536"))
+
+# リクエストメトリクス(/metrics)の有効化
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("true", "1", "yes")
+
+# 過負荷時の受付制御(0で無効、/healthと/metricsは常に受け付ける)
+ADMISSION_SETTINGS = AdmissionSettings(
+    rate_limit=float(os.getenv("RATE_LIMIT_RPS", "0")),
+    burst=int(os.getenv("RATE_LIMIT_BURST", "0")),
+    per_client=os.getenv("RATE_LIMIT_PER_CLIENT", "false").lower() in ("true", "1", "yes"),
+    max_in_flight=int(os.getenv("MAX_IN_FLIGHT", "0")),
+    max_loop_lag=float(os.getenv("MAX_LOOP_LAG", "0")),
+)
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+
+# Readinessプローブ(/health/ready)を落とす閾値(0で無効)と状態の更新間隔
+READINESS_THRESHOLDS = ReadinessThresholds(
+    max_loop_lag=float(os.getenv("READY_MAX_LOOP_LAG", "1.0")),
+    max_in_flight=int(os.getenv("READY_MAX_IN_FLIGHT", "0")),
+    max_pool_utilization=float(os.getenv("READY_MAX_POOL_UTILIZATION", "0.9")),
+)
+HEALTH_REFRESH_INTERVAL = float(os.getenv("HEALTH_REFRESH_INTERVAL", "1.0"))
+
+# ワーカー間で共有する集計(共有メモリ)。同じ名前の共有メモリを使うワーカー同士で合計する。
+# 無関係なインスタンス同士が混ざらないよう、名前が設定されている場合のみ有効(serveコマンドは自動で設定)
+SHARED_STATS_ENABLED = os.getenv("SHARED_STATS_ENABLED", "true").lower() in ("true", "1", "yes")
+SHARED_STATS_NAME = os.getenv("SHARED_STATS_NAME", "")
+SHARED_STATS_SLOTS = int(os.getenv("SHARED_STATS_SLOTS", "64"))
+
+# レスポンスの動的圧縮(brはbrotli、zstdはzstandardがインストールされている場合のみ)
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("true", "1", "yes")
+COMPRESSION_SETTINGS = CompressionSettings(
+    minimum_size=int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024")),
+    encodings=tuple(os.getenv("COMPRESSION_ENCODINGS", ",".join(DEFAULT_ENCODINGS)).replace(" ", "").split(",")),
+    content_types=tuple(
+        os.getenv("COMPRESSION_CONTENT_TYPES", ",".join(DEFAULT_CONTENT_TYPES)).replace(" ", "").split(",")
+    ),
+    gzip_level=int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+    brotli_quality=int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4")),
+    zstd_level=int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3")),
+    cache_size=int(os.getenv("COMPRESSION_CACHE_SIZE", "256")),
+)
+
+# 起動時のウォームアップ(完了までReadinessはNot Ready)と、終了時に処理中のリクエストを待つ秒数
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() in ("true", "1", "yes")
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "10.0"))
+DRAIN_TIMEOUT = float(os.getenv("DRAIN_TIMEOUT", "10.0"))
+
+# 構造化ログ(JSON Lines)の出力レベルとアクセスログ
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+ACCESS_LOG = os.getenv("ACCESS_LOG", "false").lower() in ("true", "1", "yes")
+ACCESS_LOG_SAMPLE_RATE = os.getenv("ACCESS_LOG_SAMPLE_RATE", "10")
+# どちらも不正な値なら起動は止めず、警告を出して既定値を使う
+try:
+    log.level = LOG_LEVEL
+except ValueError as e:
+    log.warning("LOG_LEVELが不正なため既定のレベルを使います", value=LOG_LEVEL, fallback=log.level, error=str(e))
+try:
+    log.sample_rate = int(ACCESS_LOG_SAMPLE_RATE)
+except ValueError as e:
+    log.warning(
+        "ACCESS_LOG_SAMPLE_RATEが不正なため既定値を使います",
+        value=ACCESS_LOG_SAMPLE_RATE,
+        fallback=log.sample_rate,
+        error=str(e),
+    )
+
+# リクエスト単位のトレーシング(サンプリング率0で無効)と、OTLP/JSON形式でトレースを追記するファイル(空文字で出力しない)
+TRACING_SETTINGS = TracingSettings(
+    sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "0")),
+    trust_parent=os.getenv("TRACE_TRUST_PARENT", "false").lower() in ("true", "1", "yes"),
+    expose_server_timing=os.getenv("TRACE_SERVER_TIMING", "false").lower() in ("true", "1", "yes"),
+)
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+
+# プロファイリング用トークン(設定すると本番環境でもX-Profile-Tokenヘッダー付きで利用可能)
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+# X-Profileヘッダーで1リクエストを計測する最長秒数
+PROFILING_TIMEOUT = float(os.getenv("PROFILING_TIMEOUT", "30"))
 
 # 開発環境判定
 IS_DEVELOPMENT = ENVIRONMENT.lower() in ("development", "dev", "local") or DEBUG
+# プロファイリングは開発環境かトークン設定時のみ有効(無効時はミドルウェアもルートも登録しない)
+PROFILING_ENABLED = IS_DEVELOPMENT or bool(PROFILING_TOKEN)
+
+# テンプレート設定(開発環境のみテンプレートの変更を自動検知)
+configure_environment(
+    web.templates.env,
+    cache_dir=Path(TEMPLATE_CACHE_DIR) if TEMPLATE_CACHE_DIR else None,
+    auto_reload=IS_DEVELOPMENT,
+    bytecode_cache=TEMPLATE_CACHE_DIR != "",
+)
+web.fragments.ttl = FRAGMENT_CACHE_TTL
+web.fragments.clear()
+web.data_cache.ttl = DATA_CACHE_TTL
+web.data_cache.max_stale = DATA_CACHE_MAX_STALE
+web.data_cache.clear()
+
+
+def use_data_provider(fastapi_app: FastAPI, provider: DataProvider) -> None:
+    """Web UIのデータプロバイダーを差し替える
+
+    データ取得のキャッシュはプロバイダーごとに保持するため、古いプロバイダーの値
+    (とプロバイダー自身)を残し続けないよう破棄します。
+    """
+    fastapi_app.state.data_provider = provider
+    web.data_cache.clear()
+
+
+async def begin_shutdown(fastapi_app: FastAPI) -> None:
+    """新しいリクエストの受け付けを止め、Server-Sent Eventsのストリームを終了させる(何度呼んでもよい)"""
+    # ロードバランサーが新しいリクエストを振り分けないよう先にNot Readyにする
+    fastapi_app.state.health_monitor.mark_shutting_down()
+    fastapi_app.state.drainer.begin()
+    await fastapi_app.state.health_broadcaster.aclose()
+
+
+def open_shared_stats() -> SharedStats | None:
+    """ワーカー間で共有する集計に接続し、このワーカーのスロットを確保(使えない場合はNone)"""
+    if not SHARED_STATS_ENABLED or not SHARED_STATS_NAME:
+        return None
+    try:
+        shared_stats = SharedStats(
+            SHARED_STATS_NAME,
+            slots=SHARED_STATS_SLOTS,
+            buckets=metrics_registry.buckets,
+            stale_after=app.state.health_monitor.stale_after,
+        )
+    except (OSError, ValueError) as exc:
+        log.warning("ワーカー間の集計を無効化します", name=SHARED_STATS_NAME, detail=str(exc))
+        return None
+    try:
+        shared_stats.claim()
+    except RuntimeError as exc:
+        shared_stats.close()
+        log.warning("ワーカー間の集計を無効化します", name=SHARED_STATS_NAME, detail=str(exc))
+        return None
+    return shared_stats
 
 
 @asynccontextmanager
-async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+async def lifespan(fastapi_app: FastAPI) -> AsyncIterator[None]:
     """アプリケーションライフサイクル管理"""
     # 起動時の処理
     env_label = "開発環境" if IS_DEVELOPMENT else "本番環境"
-    print(f"🚀 FastAPIアプリケーション起動 [{env_label}]")
+    log.info(f"FastAPIアプリケーション起動 [{env_label}]", environment=ENVIRONMENT, version=__version__)
     if IS_DEVELOPMENT:
-        print("⚠️  開発モード: セキュリティ制限が緩和されています")
-    yield
-    # 終了時の処理
-    print("👋 FastAPIアプリケーション終了")
+        log.warning("開発モード: セキュリティ制限が緩和されています")
+    if HTTP_CLIENT_SETTINGS.http2 and not http2_available():
+        log.warning("h2がインストールされていないため、HTTP/1.1で通信します。")
+
+    fastapi_app.state.loop_monitor.ensure_started()
+    if asset_manifest is not None:
+        # 静的ファイルのビルドはイベントループを塞がないよう別スレッドで行う
+        await asyncio.to_thread(asset_manifest.load)
+    shared_stats = open_shared_stats()
+    fastapi_app.state.shared_stats = shared_stats
+    metrics_registry.shared = shared_stats
+
+    # 共有HTTPクライアントを作成し、ルーターへ依存性注入で渡す
+    async with create_http_client(HTTP_CLIENT_SETTINGS) as client:
+        fastapi_app.state.http_client = client
+        if API_BASE_URL:
+            use_data_provider(fastapi_app, HttpDataProvider(API_BASE_URL, client=client))
+        fastapi_app.state.health_monitor.ensure_started()
+        if WARMUP_ENABLED:
+            report = await warm_up(fastapi_app, web.templates.env, timeout=WARMUP_TIMEOUT)
+            log.info(
+                "ウォームアップ完了",
+                duration_ms=round(report.duration * 1000, 1),
+                templates=report.templates,
+                requests=report.requests,
+            )
+            for failure in report.failures:
+                log.warning("ウォームアップ失敗", detail=failure)
+        fastapi_app.state.health_monitor.mark_warmed_up()
+
+        # 終了シグナルを受けた時点でドレインを始める(サーバーが接続の終了を待つ前に、終わらないストリームを閉じる)
+        shutdown_tasks: set[asyncio.Task[None]] = set()
+        uninstall_shutdown_hook = install_shutdown_hook(
+            lambda: shutdown_tasks.add(asyncio.ensure_future(begin_shutdown(fastapi_app)))
+        )
+        yield
+        # 終了時の処理
+        uninstall_shutdown_hook()
+        await begin_shutdown(fastapi_app)
+        remaining = await fastapi_app.state.drainer.wait(DRAIN_TIMEOUT)
+        if remaining:
+            log.warning("完了しないリクエストを残して終了します", in_flight=remaining)
+        await fastapi_app.state.health_monitor.aclose()
+        await fastapi_app.state.loop_monitor.aclose()
+        # 他のワーカーが動作中として数えないようスロットを解放する
+        fastapi_app.state.shared_stats = metrics_registry.shared = None
+        if shared_stats is not None:
+            shared_stats.release()
+        log.info("FastAPIアプリケーション終了")
+        # 出力先が詰まっていてもイベントループを塞がないよう別スレッドで待つ
+        await asyncio.to_thread(log.flush)
+        if span_exporter is not None:
+            await asyncio.to_thread(span_exporter.close)
+    # クローズ済みのクライアントを参照し続けないよう元に戻し、再起動に備えて受け付けを再開する
+    fastapi_app.state.http_client = None
+    fastapi_app.state.drainer.reset()
+    fastapi_app.state.health_monitor.reset()
+    if API_BASE_URL:
+        use_data_provider(fastapi_app, HttpDataProvider(API_BASE_URL))
 
 
 # FastAPIアプリケーション作成
@@ -47,6 +289,10 @@ app = FastAPI(
     openapi_url="/openapi.json" if IS_DEVELOPMENT else None,
 )
 
+# トレース対象のリクエストでルーティングとハンドラーの処理を計測(最初に追加して最も内側に置く)
+if TRACING_SETTINGS.enabled:
+    app.add_middleware(SpanMiddleware, name="handler")
+
 # CORS設定(環境に応じて切り替え)
 if IS_DEVELOPMENT:
     # 開発環境: すべてのオリジンを許可
@@ -61,7 +307,7 @@ else:
     # 本番環境: 指定されたオリジンのみ許可
     if not ALLOWED_ORIGINS:
         # 環境変数が設定されていない場合のフォールバック
-        print("⚠️  警告: ALLOWED_ORIGINSが設定されていません。CORSは無効化されます。")
+        log.warning("ALLOWED_ORIGINSが設定されていません。CORSは無効化されます。")
 
     app.add_middleware(
         CORSMiddleware,
@@ -71,31 +317,191 @@ else:
         allow_headers=["Content-Type", "Authorization"],
     )
 
+if TRACING_SETTINGS.enabled:
+    app.add_middleware(SpanMiddleware, name="cors")
+
+
+def api_root_payload() -> dict[str, Any]:
+    """APIルートエンドポイントのレスポンス内容を構築"""
+    return {
+        "message": "Python Project 2026 API",
+        "version": __version__,
+        "environment": ENVIRONMENT,
+        "docs": "/docs" if IS_DEVELOPMENT else None,
+        "redoc": "/redoc" if IS_DEVELOPMENT else None,
+    }
+
+
+def health_payload() -> dict[str, Any]:
+    """ヘルスチェックエンドポイントのレスポンス内容を構築"""
+    return {"status": "healthy", "version": __version__}
+
+
+# 内容は起動時の設定のみに依存するため、本文とETagを事前計算しておく
+API_ROOT_RESPONSE = PrecomputedJSON.from_content(api_root_payload())
+HEALTH_RESPONSE = PrecomputedJSON.from_content(health_payload())
+
+
+# レスポンスの動的圧縮(プロファイリングとメトリクスより内側に置き、圧縮の時間も計測に含める)
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, settings=COMPRESSION_SETTINGS)
+
+# リクエスト単位のプロファイリング(X-Profileヘッダー付きのリクエストのみ計測)
+app.state.profiling_token = PROFILING_TOKEN or None
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, token=PROFILING_TOKEN or None, timeout=PROFILING_TIMEOUT)
+
+# 過負荷時の受付制御(メトリクスより内側に置き、断ったリクエストも計測する)。
+# 制限が無効でも処理中のリクエスト数(SSEを除く)をReadinessの判定用に集計する
+loop_monitor = LoopLagMonitor(interval=LOOP_LAG_INTERVAL)
+app.state.loop_monitor = loop_monitor
+admission_stats = AdmissionStats()
+app.state.admission_stats = admission_stats
+app.add_middleware(AdmissionMiddleware, settings=ADMISSION_SETTINGS, monitor=loop_monitor, stats=admission_stats)
+
+# 終了時のドレイン(受付制御より外側に置き、終了中のリクエストを最初に断る)
+drainer = Drainer()
+app.state.drainer = drainer
+app.add_middleware(DrainMiddleware, drainer=drainer)
+
+# アクセスログ(メトリクスと同様に外側で記録し、断ったリクエストも含める)
+if ACCESS_LOG:
+    app.add_middleware(AccessLogMiddleware, logger=log)
+
+# リクエストメトリクス(最後に追加して最も外側で計測する)
+metrics_registry = MetricsRegistry()
+app.state.metrics = metrics_registry
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+
+# トレーシング(最も外側でトレースを開始し、Server-Timingヘッダーを付ける)
+span_exporter = FileSpanExporter(Path(TRACE_EXPORT_PATH)) if TRACE_EXPORT_PATH else None
+if TRACING_SETTINGS.enabled:
+    app.add_middleware(TracingMiddleware, settings=TRACING_SETTINGS, exporter=span_exporter)
+
 
 @app.get("/api/", tags=["Root"])
-async def api_root() -> JSONResponse:
+async def api_root(request: Request) -> Response:
     """APIルートエンドポイント"""
-    return JSONResponse(
-        content={
-            "message": "Python Project 2026 API",
-            "version": __version__,
-            "environment": ENVIRONMENT,
-            "docs": "/docs" if IS_DEVELOPMENT else None,
-            "redoc": "/redoc" if IS_DEVELOPMENT else None,
-        }
-    )
+    return API_ROOT_RESPONSE.response(request)
 
 
 @app.get("/health", tags=["Health"])
-async def health() -> JSONResponse:
+async def health(request: Request) -> Response:
     """ヘルスチェックエンドポイント"""
-    return JSONResponse(content={"status": "healthy", "version": __version__})
+    return HEALTH_RESPONSE.response(request)
+
+
+@app.get("/health/live", tags=["Health"])
+async def health_live() -> Response:
+    """Livenessプローブ(イベントループが応答できれば常に200)"""
+    return Response(LIVE_BODY, media_type="application/json", headers={"Cache-Control": "no-store"})
+
+
+@app.get("/health/ready", tags=["Health"])
+async def health_ready(request: Request) -> Response:
+    """Readinessプローブ(バックグラウンドで集計済みの状態を返す)"""
+    status_code, body = request.app.state.health_monitor.readiness()
+    return Response(body, status_code=status_code, media_type="application/json", headers={"Cache-Control": "no-store"})
+
+
+@app.get("/health/instance", tags=["Health"])
+async def health_instance(request: Request) -> JSONResponse:
+    """全ワーカーの合計(どのワーカーが応答しても共有メモリから同じ値を返す)"""
+    shared_stats = request.app.state.shared_stats
+    if shared_stats is None:
+        return JSONResponse(status_code=503, content={"detail": "Shared statistics are not available"})
+    return JSONResponse(content=asdict(shared_stats.totals()), headers={"Cache-Control": "no-store"})
+
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+async def metrics(request: Request) -> PlainTextResponse:
+    """Prometheus形式のメトリクス"""
+    text = metrics_registry.render() + admission_stats.render_metrics() + log.render_metrics()
+    shared_stats = request.app.state.shared_stats
+    if shared_stats is not None:
+        text += shared_stats.render_metrics()
+    return PlainTextResponse(text, media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.get("/health/http-pool", tags=["Health"])
+async def http_pool(request: Request) -> JSONResponse:
+    """共有HTTPクライアントのコネクションプール統計"""
+    client = getattr(request.app.state, "http_client", None)
+    if client is None:
+        return JSONResponse(status_code=503, content={"detail": "HTTP client is not started"})
+    return JSONResponse(content=asdict(pool_stats(client, HTTP_CLIENT_SETTINGS)))
+
+
+# Web UI向けデータプロバイダー
+data_provider: DataProvider
+if API_BASE_URL:
+    # 分離デプロイ構成: リモートのAPIサーバーから取得
+    data_provider = HttpDataProvider(API_BASE_URL)
+else:
+    # デフォルト: ループバック通信なしで同一プロセス内から取得
+    data_provider = LocalDataProvider(api_info=api_root_payload, health=health_payload)
+app.state.data_provider = data_provider
+# 共有HTTPクライアントはlifespanで作成される
+app.state.http_client = None
+
+
+def _shared_pool_stats() -> PoolStats | None:
+    """Web UIのデータ取得に使う共有HTTPクライアントのプール統計(未作成ならNone)"""
+    client = app.state.http_client
+    return pool_stats(client, HTTP_CLIENT_SETTINGS) if client is not None else None
+
+
+# ワーカー間で共有する集計はlifespanで接続する
+app.state.shared_stats = None
+
+
+def _publish_health(snapshot: HealthSnapshot) -> None:
+    """集計したヘルス状態をワーカー間で共有する集計にも書き込む"""
+    shared_stats: SharedStats | None = app.state.shared_stats
+    if shared_stats is not None:
+        shared_stats.publish(snapshot.ready, snapshot.warmed_up, snapshot.in_flight, snapshot.loop_lag)
+
+
+# Readinessの判定材料はlifespan中にバックグラウンドで集計する
+app.state.health_monitor = HealthMonitor(
+    loop_monitor,
+    in_flight=lambda: admission_stats.in_flight,
+    pool=_shared_pool_stats,
+    thresholds=READINESS_THRESHOLDS,
+    interval=HEALTH_REFRESH_INTERVAL,
+    on_refresh=_publish_health,
+)
+
+
+async def _produce_health_fragment() -> str:
+    """配信用のヘルスチェックフラグメントを生成(常に最新のプロバイダーを参照)"""
+    return await web.render_health_check(app.state.data_provider)
+
+
+# ヘルスチェックは全接続で1つのプロデューサーを共有して配信する
+app.state.health_broadcaster = Broadcaster(
+    _produce_health_fragment,
+    interval=HEALTH_STREAM_INTERVAL,
+    max_subscribers=HEALTH_STREAM_MAX_SUBSCRIBERS,
+    queue_size=HEALTH_STREAM_QUEUE_SIZE,
+)
 
 
 # スタティックファイルを提供
 static_path = Path(__file__).parent / "static"
+use_vendored_assets = False
+asset_manifest: LazyAssetManifest | None = None
 if static_path.exists():
-    app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
+    # 起動時にフィンガープリント付きのファイルとgzip/brotli版をメモリ上にビルドし、不変キャッシュで配信
+    asset_manifest = LazyAssetManifest(static_path, Path(STATIC_BUILD_DIR) if STATIC_BUILD_DIR else None)
+    app.mount("/static", AssetStaticFiles(directory=static_path, manifest=asset_manifest), name="static")
+    install_url_for(web.templates.env, asset_manifest)
+
+    use_vendored_assets = USE_VENDORED_ASSETS and has_vendored_assets(static_path)
+    if USE_VENDORED_ASSETS and not use_vendored_assets:
+        log.warning("CDNアセットが取り込まれていません。`python-project-2026 vendor-assets`を実行してください。")
+web.templates.env.globals["use_vendored_assets"] = use_vendored_assets
 
 # ルーターを登録
 # Webページルーター(HTMX)
@@ -103,3 +509,10 @@ app.include_router(web.router, tags=["Web"])
 
 # APIルーター(JSON)
 app.include_router(hello.router, prefix="/api", tags=["Hello"])
+app.state.hello_batch_settings = hello.BatchSettings(
+    max_size=HELLO_BATCH_MAX_SIZE, flush_size=HELLO_BATCH_FLUSH_SIZE, max_item_size=HELLO_BATCH_MAX_ITEM_SIZE
+)
+
+# プロファイリング用ルーター(/debug/profile)
+if PROFILING_ENABLED:
+    app.include_router(debug.router, prefix="/debug", tags=["Debug"], include_in_schema=IS_DEVELOPMENT)
@@ -0,0 +1,331 @@
+"""静的ファイルのビルド(フィンガープリント・事前圧縮)と配信"""
+
+import base64
+import gzip
+import hashlib
+import importlib
+import json
+import mimetypes
+import os
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import httpx
+import jinja2
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from .utils import ensure_directory
+
+# 事前圧縮の対象とする拡張子
+COMPRESSIBLE_SUFFIXES = frozenset({".css", ".js", ".mjs", ".json", ".svg", ".html", ".txt", ".map", ".xml"})
+
+# フィンガープリント付きURLに付与するキャッシュヘッダー
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@dataclass(frozen=True)
+class VendorAsset:
+    """ローカルに取り込むCDNアセット"""
+
+    # バージョンを固定した取得元URL
+    url: str
+    # Subresource Integrity形式のハッシュ("sha384-<base64>"など)。Noneなら未記録のため取り込まない
+    integrity: str | None
+
+
+# オフライン環境向けにローカルへ取り込むCDNアセット(static/配下のパス -> 取得元)
+# バージョンを上げる場合はハッシュも合わせて更新する
+VENDOR_ASSETS: dict[str, VendorAsset] = {
+    "vendor/pico.min.css": VendorAsset("https://cdn.jsdelivr.net/npm/@picocss/pico@2.0.6/css/pico.min.css", None),
+    "vendor/htmx.min.js": VendorAsset(
+        "https://unpkg.com/htmx.org@2.0.3/dist/htmx.min.js",
+        "sha384-0895/pl2MU10Hqc6jd4RvrthNlDiE9U1tWmX7WRESftEDRosgxNsQG/Ze9YMRzHq",
+    ),
+    "vendor/sse.js": VendorAsset("https://unpkg.com/htmx-ext-sse@2.2.2/sse.js", None),
+}
+
+# Subresource Integrityで使えるハッシュ関数
+INTEGRITY_ALGORITHMS = ("sha256", "sha384", "sha512")
+
+
+def _brotli() -> Any:
+    """brotliモジュールを取得(未インストールならNone)"""
+    try:
+        return importlib.import_module("brotli")
+    except ImportError:
+        return None
+
+
+@dataclass(frozen=True)
+class Asset:
+    """フィンガープリント済みのアセット"""
+
+    path: str
+    hashed_path: str
+    media_type: str
+    digest: str
+    # エンコーディング("identity", "gzip", "br") -> 内容
+    variants: Mapping[str, bytes] = field(repr=False)
+
+    def etag(self, encoding: str) -> str:
+        """内容のハッシュから求めたETag(エンコーディングごとに異なる)"""
+        return f'"{self.digest}-{encoding}"'
+
+
+class AssetManifest:
+    """元のパスとフィンガープリント付きパスの対応表"""
+
+    def __init__(self, assets: Mapping[str, Asset]) -> None:
+        self._by_path = dict(assets)
+        self._by_hashed = {asset.hashed_path: asset for asset in assets.values()}
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._by_path
+
+    def __len__(self) -> int:
+        return len(self._by_path)
+
+    def url_path(self, path: str) -> str:
+        """フィンガープリント付きパスを返す(未登録なら元のパス)"""
+        asset = self._by_path.get(path)
+        return asset.hashed_path if asset is not None else path
+
+    def lookup(self, hashed_path: str) -> Asset | None:
+        """フィンガープリント付きパスからアセットを取得"""
+        return self._by_hashed.get(hashed_path)
+
+    def to_json(self) -> dict[str, str]:
+        """manifest.json形式(元のパス -> フィンガープリント付きパス)"""
+        return {path: asset.hashed_path for path, asset in sorted(self._by_path.items())}
+
+
+def _write_verified(target: Path, content: bytes) -> None:
+    """内容アドレス化されたファイルを書き込む(既存のファイルは内容が一致する場合のみそのまま使う)"""
+    try:
+        if target.read_bytes() == content:
+            return
+    except FileNotFoundError:
+        pass
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(content)
+    tmp.replace(target)
+
+
+def build_assets(source_dir: Path, output_dir: Path | None = None, min_compress_size: int = 256) -> AssetManifest:
+    """静的ファイルにフィンガープリントを付け、gzip/brotli版とともにメモリ上に用意する
+
+    ``output_dir`` を指定した場合はCDNやリバースプロキシ向けにファイルとしても出力します。
+    ファイル名に内容のハッシュを含めるため、同じ内容なら再ビルドしても書き込みは発生しません
+    (既存のファイルは内容を照合し、一致しなければ書き直します)。
+    配信はメモリ上の内容から行うため、出力したファイルが削除・改変されても影響しません。
+
+    Args:
+        source_dir: 元の静的ファイルのディレクトリ
+        output_dir: ビルド結果の出力先(Noneならファイルに出力しない)
+        min_compress_size: 事前圧縮する最小バイト数
+
+    Returns:
+        アセットの対応表
+    """
+    brotli = _brotli()
+    assets: dict[str, Asset] = {}
+    for source in sorted(p for p in source_dir.rglob("*") if p.is_file()):
+        relative = source.relative_to(source_dir)
+        content = source.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        hashed_relative = relative.with_name(f"{relative.stem}.{digest}{relative.suffix}")
+
+        variants = {"identity": content}
+        if relative.suffix in COMPRESSIBLE_SUFFIXES and len(content) >= min_compress_size:
+            variants["gzip"] = gzip.compress(content, compresslevel=9, mtime=0)
+            if brotli is not None:
+                variants["br"] = brotli.compress(content, quality=11)
+
+        if output_dir is not None:
+            target = ensure_directory(output_dir / hashed_relative.parent) / hashed_relative.name
+            for encoding, data in variants.items():
+                suffix = {"identity": "", "gzip": ".gz", "br": ".br"}[encoding]
+                _write_verified(target.with_name(f"{target.name}{suffix}"), data)
+
+        path = relative.as_posix()
+        assets[path] = Asset(
+            path=path,
+            hashed_path=hashed_relative.as_posix(),
+            media_type=mimetypes.guess_type(source.name)[0] or "application/octet-stream",
+            digest=digest,
+            variants=variants,
+        )
+
+    manifest = AssetManifest(assets)
+    if output_dir is not None:
+        (ensure_directory(output_dir) / "manifest.json").write_text(json.dumps(manifest.to_json(), indent=2) + "\n")
+    return manifest
+
+
+class LazyAssetManifest:
+    """初回の参照時(または :meth:`load` の呼び出し時)に静的ファイルをビルドする対応表
+
+    モジュールの読み込み時にビルドせず、アプリケーションの起動処理で別スレッドから
+    :meth:`load` を呼んでおくことで、最初のリクエストでビルドを待たずに済みます。
+    """
+
+    def __init__(self, source_dir: Path, output_dir: Path | None = None) -> None:
+        self.source_dir = source_dir
+        self.output_dir = output_dir
+        self._manifest: AssetManifest | None = None
+        self._lock = threading.Lock()
+
+    def load(self) -> AssetManifest:
+        """ビルド済みの対応表を返す(未ビルドならビルドする)"""
+        manifest = self._manifest
+        if manifest is None:
+            with self._lock:
+                if self._manifest is None:
+                    self._manifest = build_assets(self.source_dir, self.output_dir)
+                manifest = self._manifest
+        return manifest
+
+    def url_path(self, path: str) -> str:
+        """フィンガープリント付きパスを返す(未登録なら元のパス)"""
+        return self.load().url_path(path)
+
+    def lookup(self, hashed_path: str) -> Asset | None:
+        """フィンガープリント付きパスからアセットを取得"""
+        return self.load().lookup(hashed_path)
+
+
+def accepted_encodings(accept_encoding: str) -> dict[str, float]:
+    """Accept-Encodingヘッダーをエンコーディング -> q値に変換"""
+    encodings: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        key, _, value = params.strip().partition("=")
+        if key.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        encodings[name.strip().lower()] = quality
+    return encodings
+
+
+def choose_encoding(accept_encoding: str, available: Mapping[str, object]) -> str:
+    """利用可能な事前圧縮版からクライアントが受け入れるものを選択(brotli優先)"""
+    accepted = accepted_encodings(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return "identity"
+
+
+class AssetStaticFiles(StaticFiles):
+    """フィンガープリント付きURLを事前圧縮版と不変キャッシュで配信するStaticFiles
+
+    フィンガープリントのないパスは通常のStaticFilesとして元のディレクトリから配信します。
+    フィンガープリント付きのファイルはビルド時にメモリへ読み込んだ内容を返すため、
+    一時ディレクトリの掃除などで出力先のファイルが消えても配信を続けられます。
+    """
+
+    def __init__(self, *, directory: Path, manifest: AssetManifest | LazyAssetManifest) -> None:
+        super().__init__(directory=directory)
+        self.manifest = manifest
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        """フィンガープリント付きパスなら事前ビルド済みのファイルを返す"""
+        asset = self.manifest.lookup(path.replace(os.sep, "/"))
+        if asset is None or scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""), asset.variants)
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "Vary": "Accept-Encoding", "ETag": asset.etag(encoding)}
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        response = Response(asset.variants[encoding], media_type=asset.media_type, headers=headers)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def install_url_for(
+    env: jinja2.Environment, manifest: AssetManifest | LazyAssetManifest, mount_name: str = "static"
+) -> None:
+    """テンプレートの ``url_for('static', path=...)`` がフィンガープリント付きURLを返すようにする"""
+
+    @jinja2.pass_context
+    def url_for(context: Mapping[str, Any], name: str, /, **path_params: Any) -> Any:
+        if name == mount_name and "path" in path_params:
+            path_params["path"] = manifest.url_path(path_params["path"])
+        return context["request"].url_for(name, **path_params)
+
+    env.globals["url_for"] = url_for
+
+
+def integrity_of(content: bytes, algorithm: str = "sha384") -> str:
+    """内容のハッシュをSubresource Integrity形式で返す"""
+    digest = hashlib.new(algorithm, content).digest()
+    return f"{algorithm}-{base64.b64encode(digest).decode()}"
+
+
+def verify_integrity(content: bytes, integrity: str | None, url: str) -> None:
+    """取得した内容が記録済みのハッシュと一致するか確認
+
+    Raises:
+        ValueError: ハッシュが未記録・未対応の形式、または一致しない場合
+    """
+    if integrity is None:
+        raise ValueError(f"no integrity hash is recorded for {url} (downloaded content is {integrity_of(content)})")
+    algorithm, _, _ = integrity.partition("-")
+    if algorithm not in INTEGRITY_ALGORITHMS:
+        raise ValueError(f"unsupported integrity algorithm for {url}: {algorithm}")
+    actual = integrity_of(content, algorithm)
+    if actual != integrity:
+        raise ValueError(f"integrity mismatch for {url}: expected {integrity}, got {actual}")
+
+
+def vendor_assets(
+    dest_dir: Path, client: httpx.Client | None = None, assets: Mapping[str, VendorAsset] = VENDOR_ASSETS
+) -> list[Path]:
+    """バージョン固定のCDNアセットをダウンロードし、ハッシュを確認して ``dest_dir`` に保存
+
+    すべてのファイルのハッシュを確認してから書き込むため、1つでも一致しなければ何も保存しません。
+
+    Returns:
+        保存したファイルのパス
+
+    Raises:
+        ValueError: ハッシュが未記録、または一致しない場合
+    """
+    contents: dict[str, bytes] = {}
+    http = client or httpx.Client(timeout=30.0, follow_redirects=True)
+    try:
+        for relative, asset in assets.items():
+            response = http.get(asset.url)
+            response.raise_for_status()
+            verify_integrity(response.content, asset.integrity, asset.url)
+            contents[relative] = response.content
+    finally:
+        if client is None:
+            http.close()
+
+    saved: list[Path] = []
+    for relative, content in contents.items():
+        target = ensure_directory((dest_dir / relative).parent) / Path(relative).name
+        _write_verified(target, content)
+        saved.append(target)
+    return saved
+
+
+def has_vendored_assets(static_dir: Path) -> bool:
+    """CDNアセットがすべてローカルに取り込まれているか"""
+    return all((static_dir / relative).is_file() for relative in VENDOR_ASSETS)
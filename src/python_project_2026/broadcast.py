@@ -0,0 +1,107 @@
+"""Server-Sent Events向けのブロードキャスト"""
+
+import asyncio
+import contextlib
+from collections.abc import Awaitable, Callable
+
+
+class TooManySubscribersError(Exception):
+    """購読者数の上限に達した"""
+
+
+def format_sse(data: str, event: str | None = None) -> str:
+    """Server-Sent Events形式のメッセージに変換
+
+    複数行のデータは行ごとに ``data:`` フィールドへ分割します。
+    """
+    lines = [f"event: {event}"] if event else []
+    lines.extend(f"data: {line}" for line in data.splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
+
+
+class Broadcaster:
+    """単一のプロデューサーで生成したイベントを全購読者に配信
+
+    プロデューサーは購読者がいる間だけ ``interval`` 秒ごとに実行されるため、
+    接続中のタブ数に関係なく生成コストは一定です。各購読者のキューは
+    ``queue_size`` 件までで、遅いクライアントには古いイベントを捨てて最新のみを渡します。
+    購読者がいなくなると ``latest`` も破棄するため、しばらく後の新しい購読者には
+    古い結果ではなく、再開したプロデューサーが生成した結果を渡します。
+    """
+
+    def __init__(
+        self,
+        producer: Callable[[], Awaitable[str]],
+        interval: float = 5.0,
+        max_subscribers: int = 1000,
+        queue_size: int = 1,
+    ) -> None:
+        self._producer = producer
+        self.interval = interval
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.latest: str | None = None
+        self.dropped = 0
+        self.errors = 0
+        self._subscribers: set[asyncio.Queue[str | None]] = set()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        """現在の購読者数"""
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue[str | None]:
+        """購読を開始し、イベントを受け取るキューを返す
+
+        Raises:
+            TooManySubscribersError: 購読者数が上限に達している場合
+        """
+        if len(self._subscribers) >= self.max_subscribers:
+            raise TooManySubscribersError(f"subscriber limit reached ({self.max_subscribers})")
+        queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[str | None]) -> None:
+        """購読を終了し、購読者がいなくなったらプロデューサーを停止"""
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            # 停止中は更新されないため、次の購読者に古い結果を渡さない
+            self.latest = None
+
+    def publish(self, event: str) -> None:
+        """全購読者にイベントを配信(満杯のキューは最古のイベントを破棄)"""
+        self.latest = event
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+
+    async def aclose(self) -> None:
+        """プロデューサーを停止し、全購読者のストリームを終了させる"""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        for queue in self._subscribers:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+        self._subscribers.clear()
+        self.latest = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self.publish(await self._producer())
+            except Exception:
+                # 生成に失敗した回は配信せず、次の周期で再試行する
+                self.errors += 1
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,37 @@
+"""大量の行データのストリーミング入出力"""
+
+from collections.abc import Iterable, Iterator
+from typing import TextIO
+
+
+def iter_lines(stream: TextIO) -> Iterator[str]:
+    """ストリームから1行ずつ読み込む(改行を除去し、空行は無視)
+
+    ファイル全体を読み込まないため、行数に関係なくメモリ使用量は一定です。
+    """
+    for line in stream:
+        line = line.rstrip("\r\n")
+        if line.strip():
+            yield line
+
+
+def write_batched(lines: Iterable[str], out: TextIO, batch_size: int = 1000) -> int:
+    """行をまとめて書き込む(``batch_size`` 行ごとに1回の書き込みとフラッシュ)
+
+    Returns:
+        書き込んだ行数
+    """
+    batch: list[str] = []
+    count = 0
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= batch_size:
+            out.write("".join(batch))
+            out.flush()
+            count += len(batch)
+            batch.clear()
+    if batch:
+        out.write("".join(batch))
+        out.flush()
+        count += len(batch)
+    return count
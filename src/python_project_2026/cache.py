@@ -0,0 +1,119 @@
+"""同時リクエストの取得を1回にまとめるstale-while-revalidateキャッシュ"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class _Entry:
+    """取得済みの値"""
+
+    __slots__ = ("fetched_at", "value")
+
+    def __init__(self, value: Any, fetched_at: float) -> None:
+        self.value = value
+        self.fetched_at = fetched_at
+
+
+class SingleFlightCache:
+    """キーごとに取得処理を1つだけ実行し、結果を短時間共有するキャッシュ
+
+    - 取得から ``ttl`` 秒以内: キャッシュした値を返す
+    - ``ttl + max_stale`` 秒以内: 古い値をすぐに返し、バックグラウンドで再取得する
+    - それより古い、または未取得: 取得を待つ(同時に来た呼び出しは同じ取得を待つ)
+
+    取得元が停止していても ``max_stale`` の範囲内なら最後に成功した値を返し続けます。
+    取得に失敗した場合は ``ttl`` 秒間は再試行せず同じ例外を返すため、
+    取得元への呼び出しは負荷に関係なくキーごとに1間隔あたり1回までになります。
+    """
+
+    def __init__(self, ttl: float = 2.0, max_stale: float = 60.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._clock = clock
+        self._entries: dict[Hashable, _Entry] = {}
+        self._inflight: dict[Hashable, asyncio.Task[Any]] = {}
+        self._failures: dict[Hashable, tuple[float, BaseException]] = {}
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[T]]) -> T:
+        """キーの値を取得(``ttl`` が0以下ならキャッシュせず毎回取得)
+
+        Raises:
+            Exception: 取得に失敗し、返せる値がキャッシュにない場合は取得時の例外
+        """
+        if self.ttl <= 0:
+            return await fetch()
+
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = now - entry.fetched_at
+            if age < self.ttl:
+                self.hits += 1
+                value: T = entry.value
+                return value
+            if age < self.ttl + self.max_stale:
+                self.stale_hits += 1
+                if self._running(key) is None and not self._recently_failed(key, now):
+                    self._start(key, fetch)
+                value = entry.value
+                return value
+
+        failure = self._failures.get(key)
+        task = self._running(key)
+        if task is not None:
+            self.coalesced += 1
+        elif failure is not None and now - failure[0] < self.ttl:
+            # 同じ例外オブジェクトを投げ直すたびにトレースバックが伸び続けないよう消してから投げる
+            raise failure[1].with_traceback(None)
+        else:
+            self.misses += 1
+            task = self._start(key, fetch)
+        # 呼び出し元がキャンセルされても共有している取得は止めない
+        result: T = await asyncio.shield(task)
+        return result
+
+    def clear(self) -> None:
+        """キャッシュを破棄"""
+        self._entries.clear()
+        self._failures.clear()
+
+    def _running(self, key: Hashable) -> "asyncio.Task[Any] | None":
+        """実行中のイベントループで動いている取得処理"""
+        task = self._inflight.get(key)
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return None
+        return task
+
+    def _recently_failed(self, key: Hashable, now: float) -> bool:
+        failure = self._failures.get(key)
+        return failure is not None and now - failure[0] < self.ttl
+
+    def _start(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> "asyncio.Task[Any]":
+        task = asyncio.get_running_loop().create_task(self._fetch(key, fetch))
+        # バックグラウンドでの再取得は誰も待たないため、例外はここで回収する
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._inflight[key] = task
+        return task
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+        except Exception as exc:
+            self.errors += 1
+            self._failures[key] = (self._clock(), exc)
+            raise
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+        self._failures.pop(key, None)
+        self._entries[key] = _Entry(value, self._clock())
+        return value
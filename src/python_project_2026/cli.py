@@ -0,0 +1,25 @@
+"""コンソールスクリプトのエントリーポイント
+
+シェルスクリプトやヘルスチェックから頻繁に呼ばれる ``version`` はtyper/richを読み込まずに応答し、
+それ以外のコマンドのときだけ :mod:`python_project_2026.main` を読み込みます。
+"""
+
+import sys
+
+from . import __version__
+
+
+def run(argv: list[str] | None = None) -> None:
+    """CLIを実行"""
+    args = sys.argv[1:] if argv is None else argv
+    if args == ["version"]:
+        sys.stdout.write(f"Python Project 2026 version: {__version__}\n")
+        return
+
+    from .main import app
+
+    app(args=args, prog_name="python-project-2026")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,344 @@
+"""レスポンスの動的圧縮(gzip / brotli / zstd)"""
+
+import hashlib
+import importlib
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .assets import accepted_encodings
+
+# 圧縮する Content-Type(前方一致)。画像や圧縮済みの形式は効果がないため含めない
+DEFAULT_CONTENT_TYPES = (
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/javascript",
+    "text/xml",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+)
+
+# Server-Sent Eventsはイベントごとに届く必要があり、バッファリングするプロキシもあるため圧縮しない
+EXCLUDED_CONTENT_TYPES = ("text/event-stream",)
+
+# 優先順(クライアントのq値が同じ場合に先のものを選ぶ)
+DEFAULT_ENCODINGS = ("br", "zstd", "gzip")
+
+
+class StreamCompressor(Protocol):
+    """1レスポンス分の圧縮器"""
+
+    def compress(self, data: bytes, flush: bool = True) -> bytes:
+        """データを圧縮(flushがTrueならここまでの入力をすべて出力する)"""
+        ...
+
+    def finish(self) -> bytes:
+        """残りを出力して圧縮を終える"""
+        ...
+
+
+class _GzipCompressor:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool = True) -> bytes:
+        output = self._compressor.compress(data)
+        return output + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else output
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, module: Any, level: int) -> None:
+        self._compressor = module.Compressor(quality=level)
+
+    def compress(self, data: bytes, flush: bool = True) -> bytes:
+        output: bytes = self._compressor.process(data)
+        return output + self._compressor.flush() if flush else output
+
+    def finish(self) -> bytes:
+        output: bytes = self._compressor.finish()
+        return output
+
+
+class _ZstandardCompressor:
+    """zstandardパッケージによるzstd圧縮"""
+
+    def __init__(self, module: Any, level: int) -> None:
+        self._module = module
+        self._compressor = module.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, flush: bool = True) -> bytes:
+        output: bytes = self._compressor.compress(data)
+        return output + self._compressor.flush(self._module.COMPRESSOBJ_FLUSH_BLOCK) if flush else output
+
+    def finish(self) -> bytes:
+        output: bytes = self._compressor.flush()
+        return output
+
+
+class _StdlibZstdCompressor:
+    """標準ライブラリ(Python 3.14以降の ``compression.zstd``)によるzstd圧縮"""
+
+    def __init__(self, module: Any, level: int) -> None:
+        self._module = module
+        self._compressor = module.ZstdCompressor(level=level)
+
+    def compress(self, data: bytes, flush: bool = True) -> bytes:
+        mode = self._module.ZstdCompressor.FLUSH_BLOCK if flush else self._module.ZstdCompressor.CONTINUE
+        output: bytes = self._compressor.compress(data, mode)
+        return output
+
+    def finish(self) -> bytes:
+        output: bytes = self._compressor.flush()
+        return output
+
+
+def _import(name: str) -> Any:
+    """モジュールを取得(未インストールならNone)"""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def available_compressors() -> dict[str, Callable[[int], StreamCompressor]]:
+    """利用可能なエンコーディング -> 圧縮レベルを受け取って圧縮器を作る関数
+
+    gzipは常に利用でき、brotliは ``brotli``、zstdは ``compression.zstd`` か ``zstandard`` が
+    インストールされている場合のみ利用できます。
+    """
+    factories: dict[str, Callable[[int], StreamCompressor]] = {"gzip": _GzipCompressor}
+    brotli = _import("brotli")
+    if brotli is not None:
+        factories["br"] = lambda level: _BrotliCompressor(brotli, level)
+    stdlib_zstd = _import("compression.zstd")
+    zstandard = _import("zstandard")
+    if stdlib_zstd is not None:
+        factories["zstd"] = lambda level: _StdlibZstdCompressor(stdlib_zstd, level)
+    elif zstandard is not None:
+        factories["zstd"] = lambda level: _ZstandardCompressor(zstandard, level)
+    return factories
+
+
+@dataclass(frozen=True)
+class CompressionSettings:
+    """動的圧縮の設定"""
+
+    # これより小さい本文は圧縮しない(小さなJSONで圧縮のCPUコストをかけない)
+    minimum_size: int = 1024
+    encodings: tuple[str, ...] = DEFAULT_ENCODINGS
+    content_types: tuple[str, ...] = DEFAULT_CONTENT_TYPES
+    gzip_level: int = 6
+    brotli_quality: int = 4
+    zstd_level: int = 3
+    # 同一本文の圧縮結果をキャッシュする件数(0で無効)と、キャッシュする本文の最大サイズ
+    cache_size: int = 256
+    cache_max_body: int = 256 * 1024
+
+    def level(self, encoding: str) -> int:
+        """エンコーディングの圧縮レベル"""
+        return {"gzip": self.gzip_level, "br": self.brotli_quality, "zstd": self.zstd_level}[encoding]
+
+
+def should_compress_type(content_type: str, content_types: Iterable[str]) -> bool:
+    """Content-Typeが圧縮対象か"""
+    media_type = content_type.partition(";")[0].strip().lower()
+    if media_type.startswith(EXCLUDED_CONTENT_TYPES):
+        return False
+    return media_type.startswith(tuple(content_types))
+
+
+def weaken_etag(etag: str) -> str:
+    """強いETagを弱いETagに変換(圧縮後の本文はバイト単位で元と一致しないため)"""
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+class CompressionCache:
+    """同一本文の圧縮結果を保持するLRUキャッシュ(キーは本文のハッシュ)"""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compress(self, encoding: str, body: bytes, compress: Callable[[bytes], bytes]) -> bytes:
+        """キャッシュ済みの圧縮結果を返し、なければ圧縮して保持"""
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        cached = self._entries.get(key)
+        if cached is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+        compressed = compress(body)
+        self._entries[key] = compressed
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return compressed
+
+
+class CompressionMiddleware:
+    """Accept-Encodingに応じてレスポンスを圧縮するASGIミドルウェア
+
+    - 本文が ``minimum_size`` 未満、Content-Typeが対象外、すでにContent-Encodingがある
+      (事前圧縮済みの静的ファイルなど)、``Cache-Control: no-transform`` の場合は圧縮しません。
+    - 1回で送られる本文は一括で圧縮し、同じ本文の結果はキャッシュから返します。
+    - ストリーミングのレスポンスはチャンクごとに圧縮してすぐに送出します(NDJSONなどが遅延しない)。
+    - 圧縮した場合はETagを弱いETagにし、 ``Vary: Accept-Encoding`` を付与します。
+    """
+
+    def __init__(self, app: ASGIApp, settings: CompressionSettings | None = None) -> None:
+        self.app = app
+        self.settings = settings or CompressionSettings()
+        factories = available_compressors()
+        self.encodings = tuple(encoding for encoding in self.settings.encodings if encoding in factories)
+        self._factories = factories
+        self.cache = CompressionCache(self.settings.cache_size) if self.settings.cache_size > 0 else None
+
+    def choose_encoding(self, accept_encoding: str) -> str | None:
+        """クライアントが受け入れる中でq値が最も高いエンコーディング(同値なら設定の優先順)"""
+        if not accept_encoding:
+            return None
+        accepted = accepted_encodings(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        best: str | None = None
+        best_quality = 0.0
+        for encoding in self.encodings:
+            quality = accepted.get(encoding, wildcard)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def compressor(self, encoding: str) -> StreamCompressor:
+        """設定した圧縮レベルの圧縮器を作成"""
+        return self._factories[encoding](self.settings.level(encoding))
+
+    def compress_body(self, encoding: str, body: bytes) -> bytes:
+        """本文全体を圧縮(キャッシュ対象のサイズならキャッシュを使う)"""
+
+        def compress(data: bytes) -> bytes:
+            compressor = self.compressor(encoding)
+            return compressor.compress(data, flush=False) + compressor.finish()
+
+        if self.cache is not None and len(body) <= self.settings.cache_max_body:
+            return self.cache.get_or_compress(encoding, body, compress)
+        return compress(body)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressionResponder(self, encoding, send).run(scope, receive)
+
+
+class _CompressionResponder:
+    """1リクエスト分の圧縮処理"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Message | None = None
+        # None: 未判定、False: 圧縮しない、True: ストリーミングで圧縮中
+        self.streaming: bool | None = None
+        self.compressor: StreamCompressor | None = None
+
+    async def run(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.handle)
+
+    async def handle(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            return
+        if self.start_message is None or self.streaming is False:
+            await self.send(message)
+            return
+        if self.streaming:
+            await self._send_chunk(message)
+            return
+        if message_type != "http.response.body":
+            # http.response.pathsendなどはそのまま送る
+            await self._pass_through(message)
+            return
+
+        start = self.start_message
+        headers = MutableHeaders(raw=list(start["headers"]))
+        start["headers"] = headers.raw
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+        if not self._compressible(start, headers):
+            await self._pass_through(message)
+            return
+
+        if not more_body:
+            if len(body) < self.middleware.settings.minimum_size:
+                await self._pass_through(message)
+                return
+            compressed = self.middleware.compress_body(self.encoding, body)
+            self._set_encoding_headers(headers)
+            headers["content-length"] = str(len(compressed))
+            self.streaming = False
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": compressed})
+            return
+
+        content_length = headers.get("content-length")
+        if content_length is not None and int(content_length) < self.middleware.settings.minimum_size:
+            await self._pass_through(message)
+            return
+        self._set_encoding_headers(headers)
+        del headers["content-length"]
+        self.compressor = self.middleware.compressor(self.encoding)
+        self.streaming = True
+        await self.send(start)
+        await self._send_chunk(message)
+
+    def _compressible(self, start: Message, headers: MutableHeaders) -> bool:
+        if start["status"] < 200 or start["status"] in (204, 304):
+            return False
+        if "content-encoding" in headers or "no-transform" in headers.get("cache-control", "").lower():
+            return False
+        return should_compress_type(headers.get("content-type", ""), self.middleware.settings.content_types)
+
+    def _set_encoding_headers(self, headers: MutableHeaders) -> None:
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag is not None:
+            headers["etag"] = weaken_etag(etag)
+
+    async def _pass_through(self, message: Message) -> None:
+        self.streaming = False
+        assert self.start_message is not None
+        await self.send(self.start_message)
+        await self.send(message)
+
+    async def _send_chunk(self, message: Message) -> None:
+        assert self.compressor is not None
+        more_body: bool = message.get("more_body", False)
+        body: bytes = message.get("body", b"")
+        chunk = self.compressor.compress(body) if more_body else self.compressor.compress(body, flush=False)
+        if not more_body:
+            chunk += self.compressor.finish()
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
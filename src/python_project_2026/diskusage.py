@@ -0,0 +1,145 @@
+"""ディレクトリツリーのディスク使用量の並列集計"""
+
+import os
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+
+from .utils import default_workers
+
+
+@dataclass(frozen=True)
+class DirectoryUsage:
+    """ディレクトリ配下(サブディレクトリを含む)の合計"""
+
+    path: Path
+    size: int
+    files: int
+    depth: int
+
+
+@dataclass(frozen=True)
+class _ScanResult:
+    """1ディレクトリ直下の走査結果"""
+
+    size: int
+    files: int
+    subdirectories: list[str]
+
+
+class _Node:
+    """集計中のディレクトリ"""
+
+    __slots__ = ("depth", "files", "parent", "path", "pending", "size")
+
+    def __init__(self, path: str, depth: int, parent: "_Node | None") -> None:
+        self.path = path
+        self.depth = depth
+        self.parent = parent
+        self.size = 0
+        self.files = 0
+        # 完了を待っている処理の数(自身の走査 + 未完了のサブディレクトリ)
+        self.pending = 1
+
+
+class _HardLinks:
+    """ハードリンクされたファイルを1回だけ数えるための記録(複数リンクのファイルのみ保持)"""
+
+    def __init__(self) -> None:
+        self._seen: set[tuple[int, int]] = set()
+        self._lock = threading.Lock()
+
+    def first_seen(self, stat: os.stat_result) -> bool:
+        key = (stat.st_dev, stat.st_ino)
+        with self._lock:
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+            return True
+
+
+def _scan_directory(path: str, hard_links: _HardLinks, on_error: Callable[[OSError], None] | None) -> _ScanResult:
+    """ディレクトリ直下のファイルサイズを合計し、サブディレクトリを列挙(シンボリックリンクは辿らない)"""
+    size = 0
+    files = 0
+    subdirectories: list[str] = []
+    try:
+        # du -b と同様にディレクトリ自体のサイズも含める
+        size = os.lstat(path).st_size
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(entry.path)
+                    else:
+                        stat = entry.stat(follow_symlinks=False)
+                        if stat.st_nlink > 1 and not hard_links.first_seen(stat):
+                            continue
+                        size += stat.st_size
+                        files += 1
+                except OSError as exc:
+                    if on_error is not None:
+                        on_error(exc)
+    except OSError as exc:
+        if on_error is not None:
+            on_error(exc)
+    return _ScanResult(size=size, files=files, subdirectories=subdirectories)
+
+
+def scan_disk_usage(
+    root: Path,
+    max_depth: int | None = None,
+    workers: int | None = None,
+    on_error: Callable[[OSError], None] | None = None,
+) -> Iterator[DirectoryUsage]:
+    """ディレクトリごとの合計をサブディレクトリの集計が終わった順に返す(最後はroot)
+
+    ``os.scandir`` による走査をスレッドプールで並列に行います。ファイルの一覧は保持せず、
+    集計中のディレクトリの合計値だけを持つため、ファイル数が数百万でもメモリ使用量は増えません。
+    ``du`` と同様に、ハードリンクされたファイルは最初に見つかった1回だけ数えます。
+    走査待ちのディレクトリは深さ優先で処理し、同時に走査するのは ``workers`` の2倍までです。
+
+    Args:
+        root: 集計するディレクトリ
+        max_depth: 結果を返す最大の深さ(rootが0)。それより深いディレクトリも合計には含まれる
+        workers: 走査するスレッド数(省略時はCPU数の4倍、I/O待ちが主なため)
+        on_error: 読み取れなかったファイルやディレクトリのエラーを受け取る関数
+    """
+    workers = workers or default_workers() * 4
+    stack: list[_Node] = [_Node(str(root), 0, None)]
+    running: dict[Future[_ScanResult], _Node] = {}
+    hard_links = _HardLinks()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="du") as executor:
+        try:
+            while stack or running:
+                while stack and len(running) < workers * 2:
+                    node = stack.pop()
+                    running[executor.submit(_scan_directory, node.path, hard_links, on_error)] = node
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    result = future.result()
+                    node.size += result.size
+                    node.files += result.files
+                    node.pending += len(result.subdirectories) - 1
+                    stack.extend(_Node(path, node.depth + 1, node) for path in result.subdirectories)
+
+                    # 完了したディレクトリの合計を親へ伝播
+                    finished: _Node | None = node
+                    while finished is not None and finished.pending == 0:
+                        if max_depth is None or finished.depth <= max_depth:
+                            yield DirectoryUsage(Path(finished.path), finished.size, finished.files, finished.depth)
+                        parent = finished.parent
+                        if parent is not None:
+                            parent.size += finished.size
+                            parent.files += finished.files
+                            parent.pending -= 1
+                        finished = parent
+        finally:
+            # 途中で反復をやめた場合は未着手の走査を取り消す
+            for future in running:
+                future.cancel()
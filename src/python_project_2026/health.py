@@ -0,0 +1,172 @@
+"""Liveness/Readinessプローブ向けのヘルス状態"""
+
+import asyncio
+import contextlib
+import json
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+
+from .http_client import PoolStats
+from .loop_monitor import LoopLagMonitor
+
+# 常に同じ内容のため事前にエンコードしておく
+LIVE_BODY = b'{"status":"alive"}'
+
+
+@dataclass(frozen=True)
+class ReadinessThresholds:
+    """Readinessを落とす閾値(0は無効)"""
+
+    # イベントループの遅延(秒)
+    max_loop_lag: float = 1.0
+    # 処理中のリクエスト数
+    max_in_flight: int = 0
+    # 共有HTTPクライアントのコネクションプール使用率((使用中 + 接続待ち) / 最大接続数)
+    max_pool_utilization: float = 0.9
+
+
+@dataclass(frozen=True)
+class HealthSnapshot:
+    """バックグラウンドで更新したヘルス状態"""
+
+    ready: bool
+    reasons: tuple[str, ...]
+    warmed_up: bool
+    shutting_down: bool
+    loop_lag: float
+    in_flight: int
+    pool_utilization: float
+    updated_at: float
+
+
+def pool_utilization(stats: PoolStats | None) -> float:
+    """コネクションプールの使用率(接続待ちのリクエストを含むため1を超えることがある)"""
+    if stats is None or stats.max_connections <= 0:
+        return 0.0
+    return (stats.active + stats.waiting) / stats.max_connections
+
+
+class HealthMonitor:
+    """Readinessの判定材料を一定間隔で集計し、プローブへの応答を事前に組み立てておく
+
+    プローブの処理は組み立て済みの本文を返すだけなので、負荷が高いときも一定時間で応答します。
+    集計が ``stale_after`` 秒以上更新されていない場合(イベントループが長時間塞がっていたなど)は
+    Not Readyとして扱います。
+    """
+
+    def __init__(
+        self,
+        loop_monitor: LoopLagMonitor,
+        in_flight: Callable[[], int],
+        pool: Callable[[], PoolStats | None],
+        thresholds: ReadinessThresholds | None = None,
+        interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        on_refresh: Callable[[HealthSnapshot], None] | None = None,
+    ) -> None:
+        self.loop_monitor = loop_monitor
+        self.thresholds = thresholds or ReadinessThresholds()
+        self.interval = interval
+        self.stale_after = interval * 3 + self.thresholds.max_loop_lag
+        self.warmed_up = False
+        self.shutting_down = False
+        self._in_flight = in_flight
+        self._pool = pool
+        self._clock = clock
+        # 集計のたびに呼ぶ(ワーカー間で共有する集計への書き込みなど)
+        self._on_refresh = on_refresh
+        self._task: asyncio.Task[None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.refresh()
+
+    def mark_warmed_up(self, warmed_up: bool = True) -> None:
+        """起動時のウォームアップの完了を記録して即座に反映"""
+        self.warmed_up = warmed_up
+        self.refresh()
+
+    def mark_shutting_down(self) -> None:
+        """終了処理(ドレイン)の開始を記録して即座に反映"""
+        self.shutting_down = True
+        self.refresh()
+
+    def reset(self) -> None:
+        """ウォームアップ前の状態に戻す(同じアプリケーションを再起動する場合)"""
+        self.warmed_up = False
+        self.shutting_down = False
+        self.refresh()
+
+    def refresh(self) -> HealthSnapshot:
+        """現在の状態を集計し、プローブへの応答を組み立て直す"""
+        thresholds = self.thresholds
+        loop_lag = self.loop_monitor.lag
+        in_flight = self._in_flight()
+        utilization = pool_utilization(self._pool())
+
+        reasons: list[str] = []
+        if self.shutting_down:
+            reasons.append("shutting_down")
+        elif not self.warmed_up:
+            reasons.append("warming_up")
+        if thresholds.max_loop_lag > 0 and loop_lag > thresholds.max_loop_lag:
+            reasons.append("loop_lag")
+        if thresholds.max_in_flight > 0 and in_flight >= thresholds.max_in_flight:
+            reasons.append("in_flight")
+        if thresholds.max_pool_utilization > 0 and utilization >= thresholds.max_pool_utilization:
+            reasons.append("http_pool")
+
+        snapshot = HealthSnapshot(
+            ready=not reasons,
+            reasons=tuple(reasons),
+            warmed_up=self.warmed_up,
+            shutting_down=self.shutting_down,
+            loop_lag=round(loop_lag, 6),
+            in_flight=in_flight,
+            pool_utilization=round(utilization, 4),
+            updated_at=self._clock(),
+        )
+        self.snapshot = snapshot
+        self._ready_body = self._encode(snapshot)
+        self._stale_body = self._encode(HealthSnapshot(**{**asdict(snapshot), "ready": False, "reasons": ("stale",)}))
+        if self._on_refresh is not None:
+            self._on_refresh(snapshot)
+        return snapshot
+
+    @staticmethod
+    def _encode(snapshot: HealthSnapshot) -> bytes:
+        payload = asdict(snapshot)
+        payload["status"] = "ready" if snapshot.ready else "not_ready"
+        del payload["updated_at"]
+        return json.dumps(payload, separators=(",", ":")).encode()
+
+    def readiness(self) -> tuple[int, bytes]:
+        """Readinessプローブのステータスコードと本文"""
+        if self._clock() - self.snapshot.updated_at > self.stale_after:
+            return 503, self._stale_body
+        return (200 if self.snapshot.ready else 503), self._ready_body
+
+    @property
+    def running(self) -> bool:
+        """集計タスクが動作中か"""
+        return self._task is not None and not self._task.done()
+
+    def ensure_started(self) -> None:
+        """実行中のイベントループで集計タスクが動いていなければ起動"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self.running:
+            return
+        self._loop = loop
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            self.refresh()
+            await asyncio.sleep(self.interval)
+
+    async def aclose(self) -> None:
+        """集計タスクを停止"""
+        task, self._task = self._task, None
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
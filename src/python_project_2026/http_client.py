@@ -0,0 +1,76 @@
+"""共有HTTPクライアント(コネクションプール)"""
+
+import importlib.util
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+
+@dataclass(frozen=True)
+class HttpClientSettings:
+    """コネクションプールとタイムアウトの設定"""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 5.0
+    timeout: float = 5.0
+    connect_timeout: float = 2.0
+    http2: bool = False
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """コネクションプールの統計情報"""
+
+    connections: int
+    active: int
+    idle: int
+    waiting: int
+    max_connections: int
+    max_keepalive_connections: int
+    http2: bool
+
+
+def http2_available() -> bool:
+    """HTTP/2に必要なh2パッケージがインストールされているか"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_http_client(settings: HttpClientSettings) -> httpx.AsyncClient:
+    """設定に従ってプール付きのAsyncClientを作成
+
+    HTTP/2が要求されてもh2が未インストールの場合はHTTP/1.1で動作します。
+    """
+    limits = httpx.Limits(
+        max_connections=settings.max_connections,
+        max_keepalive_connections=settings.max_keepalive_connections,
+        keepalive_expiry=settings.keepalive_expiry,
+    )
+    http2 = settings.http2 and http2_available()
+    transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(settings.timeout, connect=settings.connect_timeout),
+    )
+
+
+def pool_stats(client: httpx.AsyncClient, settings: HttpClientSettings) -> PoolStats:
+    """クライアントのコネクションプールの状態を取得
+
+    httpcoreの内部状態を参照するため、取得できない場合は0として扱います。
+    """
+    pool: Any = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections: list[Any] = list(getattr(pool, "connections", []))
+    requests: list[Any] = list(getattr(pool, "_requests", []))
+    idle = sum(1 for connection in connections if connection.is_idle())
+    waiting = sum(1 for request in requests if request.is_queued())
+    return PoolStats(
+        connections=len(connections),
+        active=len(connections) - idle,
+        idle=idle,
+        waiting=waiting,
+        max_connections=settings.max_connections,
+        max_keepalive_connections=settings.max_keepalive_connections,
+        http2=settings.http2 and http2_available(),
+    )
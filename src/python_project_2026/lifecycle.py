@@ -0,0 +1,208 @@
+"""起動時のウォームアップと終了時のリクエストの排出(ドレイン)"""
+
+import asyncio
+import signal
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Any
+
+import httpx
+import jinja2
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .admission import DEFAULT_EXEMPT_PATHS, is_exempt
+from .utils import WARMUP_SCOPE_KEY
+
+# ウォームアップで送る合成リクエストのパス(主要なページ・フラグメント・API)
+WARMUP_PATHS = ("/", "/api/", "/api/version", "/api/hello?name=warmup", "/health", "/api-info", "/health-check")
+
+
+@dataclass
+class WarmupReport:
+    """ウォームアップの結果"""
+
+    duration: float = 0.0
+    templates: int = 0
+    requests: int = 0
+    failures: list[str] = field(default_factory=list)
+
+
+async def warm_up(
+    app: Any,
+    env: jinja2.Environment | None = None,
+    paths: Iterable[str] = WARMUP_PATHS,
+    timeout: float = 10.0,
+) -> WarmupReport:
+    """初回リクエストで発生する準備処理を起動時に済ませる
+
+    - 全テンプレートのコンパイル(バイトコードキャッシュの読み込みを含む)
+    - OpenAPIスキーマの生成(Pydanticモデルのスキーマ構築)
+    - 主要なルートへの合成リクエスト(ミドルウェアスタック・依存関係・レスポンスの組み立て)
+
+    合成リクエストはスコープに ``WARMUP_SCOPE_KEY`` を付けて送り、メトリクス・ワーカー間の集計・
+    アクセスログ・受付制御・トレーシングには含めません。
+
+    失敗した項目は ``failures`` に記録し、起動は止めません。``timeout`` 秒を超えた場合は
+    残りを打ち切ります。
+    """
+    report = WarmupReport()
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(_warm_up(app, env, paths, report), timeout)
+    except TimeoutError:
+        report.failures.append(f"timed out after {timeout:.1f}s")
+    report.duration = time.perf_counter() - start
+    return report
+
+
+async def _warm_up(app: Any, env: jinja2.Environment | None, paths: Iterable[str], report: WarmupReport) -> None:
+    if env is not None:
+        for name in env.list_templates():
+            try:
+                env.get_template(name)
+                report.templates += 1
+            except Exception as exc:
+                report.failures.append(f"template {name}: {exc}")
+
+    try:
+        app.openapi()
+    except Exception as exc:
+        report.failures.append(f"openapi: {exc}")
+
+    async def marked_app(scope: Scope, receive: Receive, send: Send) -> None:
+        scope[WARMUP_SCOPE_KEY] = True
+        await app(scope, receive, send)
+
+    # 実際のクライアントと区別できるよう接続元も "warmup" にする
+    transport = httpx.ASGITransport(app=marked_app, raise_app_exceptions=False, client=("warmup", 0))
+    async with httpx.AsyncClient(transport=transport, base_url="http://warmup") as client:
+        for path in paths:
+            try:
+                response = await client.get(path)
+            except Exception as exc:
+                report.failures.append(f"GET {path}: {exc}")
+                continue
+            report.requests += 1
+            if response.status_code >= 500:
+                report.failures.append(f"GET {path}: {response.status_code}")
+
+
+class Drainer:
+    """処理中のリクエスト(ストリーミング中を含む)を数え、終了時に完了を待つ"""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.draining = False
+        self._idle: asyncio.Event | None = None
+
+    def begin(self) -> None:
+        """新しいリクエストの受け付けを止める"""
+        self.draining = True
+
+    def reset(self) -> None:
+        """受け付けを再開(同じアプリケーションを再起動する場合)"""
+        self.draining = False
+
+    def enter(self) -> None:
+        self.in_flight += 1
+
+    def exit(self) -> None:
+        self.in_flight -= 1
+        if self.in_flight == 0 and self._idle is not None:
+            self._idle.set()
+
+    async def wait(self, timeout: float) -> int:
+        """処理中のリクエストが完了するまで最大 ``timeout`` 秒待つ
+
+        Returns:
+            待ち終えた時点でまだ処理中のリクエスト数
+        """
+        if self.in_flight > 0:
+            self._idle = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout)
+            except TimeoutError:
+                pass
+            finally:
+                self._idle = None
+        return self.in_flight
+
+
+class DrainMiddleware:
+    """処理中のリクエストを数え、ドレイン中の新しいリクエストを503で断るASGIミドルウェア
+
+    断る際は ``Connection: close`` を付け、キープアライブ中のクライアントにも再接続を促します。
+    ``exempt_paths`` 配下(ヘルスチェックとメトリクス)はドレイン中も応答します。
+    """
+
+    def __init__(self, app: ASGIApp, drainer: Drainer, exempt_paths: tuple[str, ...] = DEFAULT_EXEMPT_PATHS) -> None:
+        self.app = app
+        self.drainer = drainer
+        self.exempt_paths = exempt_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if self.drainer.draining and not is_exempt(scope["path"], self.exempt_paths):
+            content = b'{"detail":"Server is shutting down"}'
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 503,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(content)).encode()),
+                        (b"retry-after", b"1"),
+                        (b"connection", b"close"),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": content})
+            return
+        self.drainer.enter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.drainer.exit()
+
+
+def install_shutdown_hook(callback: Callable[[], None]) -> Callable[[], None]:
+    """終了シグナル(SIGTERM/SIGINT)を受け取った時点でイベントループ上で ``callback`` を呼ぶ
+
+    uvicornは接続がすべて閉じるのを待ってからlifespanの終了処理を呼ぶため、
+    Server-Sent Eventsなど終わらないストリームがあると終了処理まで到達しません。
+    サーバーが設定したシグナルハンドラーを呼ぶ前に ``callback`` を予約し、
+    lifespanより前にドレインを始められるようにします。
+
+    メインスレッド以外(テストクライアントなど)では何もしません。
+
+    Returns:
+        元のシグナルハンドラーに戻す関数
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return lambda: None
+
+    loop = asyncio.get_running_loop()
+    previous: dict[int, Any] = {}
+
+    def handler(signum: int, frame: FrameType | None) -> None:
+        loop.call_soon_threadsafe(callback)
+        original = previous.get(signum)
+        if callable(original):
+            original(signum, frame)
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous[sig] = signal.getsignal(sig)
+        signal.signal(sig, handler)
+
+    def uninstall() -> None:
+        for sig, original in previous.items():
+            # サーバーが既に別のハンドラーへ戻している場合はそのままにする
+            if signal.getsignal(sig) is handler:
+                signal.signal(sig, original)
+
+    return uninstall
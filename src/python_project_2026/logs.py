@@ -0,0 +1,260 @@
+"""イベントループを塞がない構造化ログ(JSON Lines)"""
+
+import atexit
+import itertools
+import json
+import queue
+import sys
+import threading
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from typing import Any, TextIO
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .utils import is_warmup
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+# 他のロギングライブラリで使われるレベル名の読み替え
+LEVEL_ALIASES = {"warn": "warning", "critical": "error", "fatal": "error"}
+
+
+def normalize_level(name: str) -> str:
+    """レベル名を正規化(大文字小文字と別名を吸収)
+
+    Raises:
+        ValueError: 未知のレベル名の場合
+    """
+    level = name.strip().lower()
+    level = LEVEL_ALIASES.get(level, level)
+    if level not in LEVELS:
+        raise ValueError(f"unknown log level {name!r} (expected one of {', '.join(LEVELS)})")
+    return level
+
+
+# (時刻, レベル, メッセージ, 追加フィールド)
+_Record = tuple[float, str, str, dict[str, Any]]
+
+
+class JsonLinesLogger:
+    """ログをキューに積み、バックグラウンドのスレッドでまとめてJSON Linesとして書き出す
+
+    呼び出し側はキューに積むだけで、JSONへの変換と書き込みは専用スレッドで行います。
+    出力先が詰まってキューが ``max_queue`` 件に達した場合は新しいログを捨てて件数を数え、
+    キューが半分を超えている間はアクセスログを ``sample_rate`` 件に1件だけ残します(0なら間引かない)。
+    """
+
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        level: str = "info",
+        max_queue: int = 10_000,
+        batch_size: int = 256,
+        sample_rate: int = 10,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        # Noneなら書き込み時点のsys.stdoutに出力する
+        self.stream = stream
+        self.batch_size = batch_size
+        self.sample_rate = sample_rate
+        self.written = 0
+        self.sampled_out = 0
+        self.write_errors = 0
+        self.dropped: dict[str, int] = dict.fromkeys(LEVELS, 0)
+        self._level = LEVELS[normalize_level(level)]
+        self._clock = clock
+        self._queue: queue.Queue[_Record | threading.Event | None] = queue.Queue(max_queue)
+        self._sample_at = max_queue // 2
+        self._sample_counter = itertools.count()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def level(self) -> str:
+        """出力する最低レベル"""
+        return next(name for name, value in LEVELS.items() if value == self._level)
+
+    @level.setter
+    def level(self, name: str) -> None:
+        self._level = LEVELS[normalize_level(name)]
+
+    @property
+    def sample_rate(self) -> int:
+        """混雑時にアクセスログを何件に1件残すか(0なら間引かない)"""
+        return self._sample_rate
+
+    @sample_rate.setter
+    def sample_rate(self, rate: int) -> None:
+        if rate < 0:
+            raise ValueError(f"sample_rate must not be negative: {rate}")
+        self._sample_rate = rate
+
+    def log(self, level: str, message: str, **fields: Any) -> None:
+        """ログを1件記録(レベルが低いものは捨てる)"""
+        if LEVELS[level] >= self._level:
+            self._enqueue((self._clock(), level, message, fields))
+
+    def debug(self, message: str, **fields: Any) -> None:
+        self.log("debug", message, **fields)
+
+    def info(self, message: str, **fields: Any) -> None:
+        self.log("info", message, **fields)
+
+    def warning(self, message: str, **fields: Any) -> None:
+        self.log("warning", message, **fields)
+
+    def error(self, message: str, **fields: Any) -> None:
+        self.log("error", message, **fields)
+
+    def access(self, method: str, path: str, status: int, duration: float, client: str | None) -> None:
+        """アクセスログを1件記録(キューが混んでいる間は間引く)"""
+        rate = self._sample_rate
+        if rate and self._queue.qsize() >= self._sample_at and next(self._sample_counter) % rate:
+            self.sampled_out += 1
+            return
+        self._enqueue(
+            (
+                self._clock(),
+                "info",
+                "request",
+                {
+                    "method": method,
+                    "path": path,
+                    "status": status,
+                    "duration_ms": round(duration * 1000, 3),
+                    "client": client,
+                },
+            )
+        )
+
+    def _enqueue(self, record: _Record) -> None:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped[record[1]] += 1
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """キューに積まれたログを書き出し終えるまで待つ
+
+        Returns:
+            時間内に書き出し終えたか
+        """
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """残りのログを書き出して書き込みスレッドを止める"""
+        thread = self._thread
+        if thread is None:
+            return
+        self.flush(timeout)
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = [_format(item) for item in batch if isinstance(item, tuple)]
+            if lines:
+                self._write("".join(lines), len(lines))
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in batch:
+                return
+
+    def _write(self, text: str, count: int) -> None:
+        stream = self.stream or sys.stdout
+        try:
+            stream.write(text)
+            stream.flush()
+            self.written += count
+        except (OSError, ValueError):
+            # 出力先が閉じられていてもアプリケーションは止めない
+            self.write_errors += 1
+
+    def render_metrics(self) -> str:
+        """ログの書き出し・破棄件数をPrometheus形式で出力"""
+        lines = [
+            "# HELP log_records_written_total Log records written to the output stream.",
+            "# TYPE log_records_written_total counter",
+            f"log_records_written_total {self.written}",
+            "# HELP log_records_dropped_total Log records dropped because the queue was full.",
+            "# TYPE log_records_dropped_total counter",
+        ]
+        lines.extend(f'log_records_dropped_total{{level="{level}"}} {count}' for level, count in self.dropped.items())
+        lines += [
+            "# HELP log_access_records_sampled_out_total Access log records skipped by sampling under load.",
+            "# TYPE log_access_records_sampled_out_total counter",
+            f"log_access_records_sampled_out_total {self.sampled_out}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _format(record: _Record) -> str:
+    timestamp, level, message, fields = record
+    iso = datetime.fromtimestamp(timestamp, UTC).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    payload = {"time": iso, "level": level, "message": message, **fields}
+    return json.dumps(payload, ensure_ascii=False, default=str) + "\n"
+
+
+class AccessLogMiddleware:
+    """リクエストごとにメソッド・パス・ステータス・所要時間を記録するASGIミドルウェア
+
+    リクエスト中はタプルをキューに積むだけで、整形と書き込みはログのスレッドで行います。
+    """
+
+    def __init__(self, app: ASGIApp, logger: JsonLinesLogger) -> None:
+        self.app = app
+        self.logger = logger
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or is_warmup(scope):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            client = scope.get("client")
+            self.logger.access(
+                scope["method"], scope["path"], status, time.perf_counter() - start, client[0] if client else None
+            )
+
+
+# アプリケーション全体で共有するロガー(プロセス終了時に残りを書き出す)
+logger = JsonLinesLogger()
+atexit.register(logger.close)
@@ -0,0 +1,57 @@
+"""イベントループの遅延(ラグ)の計測"""
+
+import asyncio
+import contextlib
+import time
+from collections.abc import Callable
+
+
+class LoopLagMonitor:
+    """一定間隔でスリープし、予定より遅れて再開した時間をイベントループの遅延として記録
+
+    イベントループが同期処理やCPU負荷で塞がると、スリープからの復帰が遅れます。
+    その遅れ(``lag``)が大きいほど、新しいリクエストを受け付けても処理が追いつきません。
+    計測タスクは最初に ``ensure_started`` を呼んだイベントループ上で動作し、
+    ループが替わった場合(テストクライアントなど)は新しいループで起動し直します。
+    """
+
+    def __init__(self, interval: float = 0.1, clock: Callable[[], float] = time.monotonic) -> None:
+        self.interval = interval
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._clock = clock
+        self._task: asyncio.Task[None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def running(self) -> bool:
+        """計測タスクが動作中か"""
+        return self._task is not None and not self._task.done()
+
+    def ensure_started(self) -> None:
+        """実行中のイベントループで計測タスクが動いていなければ起動"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self.running:
+            return
+        self._loop = loop
+        self._task = loop.create_task(self._run())
+
+    def record(self, lag: float) -> None:
+        """計測した遅延を記録"""
+        self.lag = lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+
+    async def _run(self) -> None:
+        while True:
+            start = self._clock()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, self._clock() - start - self.interval))
+
+    async def aclose(self) -> None:
+        """計測タスクを停止"""
+        task, self._task = self._task, None
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
@@ -1,23 +1,56 @@
 """メインアプリケーション"""
 
+import json
+import os
+import sys
+from collections.abc import Iterable, Iterator
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING, TextIO
+
 import typer
-from rich.console import Console
-from rich.panel import Panel
 
 from . import __version__
+from .bulk import iter_lines, write_batched
+
+if TYPE_CHECKING:
+    from rich.console import Console
 
 app = typer.Typer(
     name="python-project-2026",
     help="2026年の最新Python開発テンプレート",
     add_completion=False,
 )
-console = Console()
 
 
-@app.command()
-def hello(name: str = typer.Option("World", help="挨拶する相手の名前")) -> None:
-    """挨拶を表示します"""
-    console.print(
+@cache
+def get_console() -> "Console":
+    """出力用のConsoleを取得(richは初回の出力時に読み込む)"""
+    from rich.console import Console
+
+    return Console()
+
+
+# helloコマンドの出力形式
+HELLO_FORMATS = ("rich", "plain", "ndjson")
+
+
+def _greeting_lines(names: Iterable[str], output_format: str) -> Iterator[str]:
+    """名前ごとの挨拶を出力形式に応じた1行の文字列に変換"""
+    if output_format == "ndjson":
+        # 値は文字列だけなので、辞書全体をdumpsせずに文字列のエスケープのみ行う
+        quote = json.JSONEncoder(ensure_ascii=False).encode
+        for name in names:
+            yield f'{{"message":{quote(f"こんにちは、{name}!")},"name":{quote(name)}}}\n'
+    else:
+        for name in names:
+            yield f"こんにちは、{name}!\n"
+
+
+def _print_panel(name: str) -> None:
+    from rich.panel import Panel
+
+    get_console().print(
         Panel(
             f"[bold green]こんにちは、{name}![/bold green]",
             title="Python Project 2026",
@@ -26,10 +59,174 @@ def hello(name: str = typer.Option("World", help="挨拶する相手の名前"))
     )
 
 
+@app.command()
+def hello(
+    name: str = typer.Option("World", help="挨拶する相手の名前"),
+    file: Path | None = typer.Option(
+        None, "--file", "-f", help="1行に1人ずつ名前を書いたファイル(`-`で標準入力)", allow_dash=True
+    ),
+    output_format: str | None = typer.Option(
+        None,
+        "--format",
+        help="出力形式(rich, plain, ndjson)。省略時は1人ならrich、ファイル入力ならplain",
+    ),
+    batch_size: int = typer.Option(1000, min=1, help="まとめて書き込む行数"),
+) -> None:
+    """挨拶を表示します"""
+    output_format = output_format or ("plain" if file else "rich")
+    if output_format not in HELLO_FORMATS:
+        raise typer.BadParameter(f"format must be one of {', '.join(HELLO_FORMATS)}", param_hint="--format")
+
+    if file is None:
+        names: Iterable[str] = [name]
+    elif str(file) == "-":
+        names = iter_lines(sys.stdin)
+    else:
+        try:
+            stream = file.open(encoding="utf-8")
+        except OSError as exc:
+            raise typer.BadParameter(str(exc), param_hint="--file") from exc
+        names = _close_after(stream)
+
+    if output_format == "rich":
+        for each in names:
+            _print_panel(each)
+        return
+
+    try:
+        write_batched(_greeting_lines(names, output_format), sys.stdout, batch_size)
+    except BrokenPipeError:
+        # `| head` などで出力先が閉じられた場合は静かに終了する
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        raise typer.Exit(1) from None
+
+
+def _close_after(stream: TextIO) -> Iterator[str]:
+    """ファイルの行を読み終えたらファイルを閉じる"""
+    with stream:
+        yield from iter_lines(stream)
+
+
 @app.command()
 def version() -> None:
     """バージョン情報を表示します"""
-    console.print(f"Python Project 2026 version: [bold]{__version__}[/bold]")
+    get_console().print(f"Python Project 2026 version: [bold]{__version__}[/bold]")
+
+
+# パッケージ内の静的ファイルディレクトリ
+STATIC_DIR = Path(__file__).parent / "static"
+
+
+@app.command()
+def build_assets(
+    output: Path = typer.Option(..., help="フィンガープリント付きファイルの出力先"),
+) -> None:
+    """静的ファイルにフィンガープリントを付け、gzip/brotli版を事前生成します"""
+    from .assets import build_assets as build
+
+    manifest = build(STATIC_DIR, output)
+    get_console().print(f"[bold green]{len(manifest)}[/bold green] 件のアセットを {output} に出力しました")
+
+
+@app.command()
+def vendor_assets(
+    dest: Path = typer.Option(..., help="CDNアセットの保存先(配信する静的ファイルディレクトリ)"),
+) -> None:
+    """バージョン固定のCDNのCSS/JavaScriptをダウンロードし、ハッシュを確認してローカル配信用に取り込みます"""
+    from .assets import vendor_assets as download
+
+    try:
+        saved = download(dest)
+    except ValueError as exc:
+        print(f"取り込みを中止しました: {exc}", file=sys.stderr)
+        raise typer.Exit(1) from exc
+    for path in saved:
+        get_console().print(f"取り込み完了: {path}")
+    get_console().print("USE_VENDORED_ASSETS=true で起動するとローカルのアセットを使用します")
+
+
+@app.command()
+def du(
+    path: Path = typer.Argument(Path(), help="集計するディレクトリ", exists=True, file_okay=False),
+    max_depth: int | None = typer.Option(None, "--max-depth", "-d", min=0, help="表示する最大の深さ"),
+    workers: int | None = typer.Option(None, min=1, help="走査するスレッド数(省略時はCPU数の4倍)"),
+    output: Path | None = typer.Option(None, "--output", "-o", help="結果の書き込み先ファイル"),
+    raw_bytes: bool = typer.Option(False, "--bytes", "-b", help="サイズをバイト数で表示"),
+) -> None:
+    """ディレクトリごとのディスク使用量を集計の終わった順に表示します"""
+    from .diskusage import scan_disk_usage
+    from .utils import ensure_directory, format_size
+
+    errors = 0
+
+    def count_error(_exc: OSError) -> None:
+        nonlocal errors
+        errors += 1
+
+    lines = (
+        f"{usage.size if raw_bytes else format_size(usage.size)}\t{usage.path}\n"
+        for usage in scan_disk_usage(path, max_depth=max_depth, workers=workers, on_error=count_error)
+    )
+    if output is None:
+        write_batched(lines, sys.stdout, batch_size=100)
+    else:
+        ensure_directory(output.parent)
+        with output.open("w", encoding="utf-8") as out:
+            write_batched(lines, out)
+    if errors:
+        print(f"{errors} 件のファイルまたはディレクトリを読み取れませんでした", file=sys.stderr)
+
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", help="待ち受けるホスト"),
+    port: int = typer.Option(8000, help="待ち受けるポート"),
+    workers: int | None = typer.Option(None, min=1, help="ワーカープロセス数(省略時はCPU数)"),
+    loop: str = typer.Option("auto", help="イベントループ(auto, uvloop, asyncio)"),
+    http: str = typer.Option("auto", help="HTTPパーサー(auto, httptools, h11)"),
+    reuse_port: bool = typer.Option(
+        False,
+        "--reuse-port/--shared-socket",
+        help="ワーカーごとにSO_REUSEPORTでバインドするか、1つのソケットを共有するか",
+    ),
+    backlog: int = typer.Option(2048, min=1, help="接続待ちキューの長さ"),
+    keep_alive: int = typer.Option(5, min=0, help="キープアライブのタイムアウト(秒)"),
+    limit_concurrency: int | None = typer.Option(None, min=1, help="ワーカーごとの同時接続数の上限(超過時は503)"),
+    max_requests: int | None = typer.Option(None, min=1, help="この件数を処理したワーカーを入れ替える"),
+    max_requests_jitter: int = typer.Option(0, min=0, help="入れ替え件数に加えるランダムな揺らぎ"),
+    graceful_timeout: int | None = typer.Option(None, min=0, help="終了時に処理中のリクエストを待つ秒数"),
+) -> None:
+    """APIサーバーを起動します"""
+    from .server import ServerSettings, resolve_http, resolve_loop, reuse_port_available
+    from .server import serve as run_server
+    from .utils import default_workers
+
+    try:
+        resolved_loop, resolved_http = resolve_loop(loop), resolve_http(http)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    settings = ServerSettings(
+        host=host,
+        port=port,
+        workers=workers or default_workers(),
+        loop=loop,
+        http=http,
+        reuse_port=reuse_port,
+        backlog=backlog,
+        timeout_keep_alive=keep_alive,
+        limit_concurrency=limit_concurrency,
+        limit_max_requests=max_requests,
+        limit_max_requests_jitter=max_requests_jitter,
+        timeout_graceful_shutdown=graceful_timeout,
+    )
+    if reuse_port and not reuse_port_available():
+        get_console().print("[yellow]SO_REUSEPORTが利用できないため、ソケットを共有します[/yellow]")
+    get_console().print(
+        f"[bold]{settings.workers}[/bold] workers on http://{host}:{port} (loop={resolved_loop}, http={resolved_http})"
+    )
+    run_server(settings)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,176 @@
+"""Prometheus形式のリクエストメトリクス"""
+
+import time
+from bisect import bisect_left
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .utils import is_warmup
+
+if TYPE_CHECKING:
+    from .shared_stats import SharedStats
+
+# レイテンシーヒストグラムのバケット境界(秒)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# ルートに一致しなかったリクエストのラベル(生のパスでラベルが増え続けないようにする)
+UNMATCHED_ROUTE = "<unmatched>"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ラベルにそのまま使うHTTPメソッド(それ以外は OTHER にまとめ、任意のメソッド名でラベルが増えないようにする)
+KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "DELETE", "CONNECT", "OPTIONS", "TRACE", "PATCH"})
+OTHER_METHOD = "OTHER"
+
+
+class _RouteStats:
+    """メソッドとルートの組ごとの集計値"""
+
+    __slots__ = ("buckets", "count", "statuses", "sum")
+
+    def __init__(self, bucket_count: int) -> None:
+        self.statuses: dict[int, int] = {}
+        # 各バケットの件数(累積ではない)。最後の要素は+Inf
+        self.buckets = [0] * (bucket_count + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+def _escape(value: str) -> str:
+    """ラベル値をPrometheusのテキスト形式用にエスケープ"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+class MetricsRegistry:
+    """リクエスト数・処理中リクエスト数・レイテンシーの集計
+
+    集計はイベントループのスレッドでのみ更新され、更新の途中に ``await`` を挟まないため、
+    ロックなしでもコルーチン間で値が競合しません。
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.in_flight = 0
+        # 設定するとワーカー間で共有する集計にも記録する
+        self.shared: SharedStats | None = None
+        self._series: dict[tuple[str, str], _RouteStats] = {}
+
+    def observe(self, method: str, route: str, status: int, duration: float) -> None:
+        """完了したリクエストを記録(未知のメソッドは ``OTHER`` として記録)"""
+        key = (method if method in KNOWN_METHODS else OTHER_METHOD, route)
+        stats = self._series.get(key)
+        if stats is None:
+            stats = self._series[key] = _RouteStats(len(self.buckets))
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        stats.buckets[bisect_left(self.buckets, duration)] += 1
+        stats.sum += duration
+        stats.count += 1
+        if self.shared is not None:
+            self.shared.observe(status, duration)
+
+    def total_requests(self) -> int:
+        """記録済みのリクエスト総数"""
+        return sum(stats.count for stats in self._series.values())
+
+    def render(self) -> str:
+        """Prometheusのテキスト形式で出力"""
+        series = sorted(self._series.items())
+        lines = [
+            "# HELP http_requests_total Total number of HTTP requests.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route), stats in series:
+            labels = f'method="{_escape(method)}",route="{_escape(route)}"'
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(f'http_requests_total{{{labels},status="{status}"}} {count}')
+
+        lines += [
+            "# HELP http_requests_in_flight Number of HTTP requests currently being served.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_request_duration_seconds HTTP request latency in seconds.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), stats in series:
+            labels = f'method="{_escape(method)}",route="{_escape(route)}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, stats.buckets, strict=False):
+                cumulative += count
+                lines.append(
+                    f'http_request_duration_seconds_bucket{{{labels},le="{_format_bound(bound)}"}} {cumulative}'
+                )
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {stats.sum}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {stats.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _concrete_path(route: Any, path_params: dict[str, Any]) -> str | None:
+    """ルートのテンプレートにパスパラメーターの値を埋め込んだパス(ルート自身のパラメーター以外があればNone)"""
+    convertors: dict[str, Any] = getattr(route, "param_convertors", {})
+    if not set(path_params) <= set(convertors):
+        return None
+    try:
+        return str(route.path_format.format(**{k: convertors[k].to_string(v) for k, v in path_params.items()}))
+    except (KeyError, ValueError, AssertionError):
+        return None
+
+
+def route_template(scope: Scope) -> str:
+    """ルーティング後のスコープからルートのパステンプレートを取得
+
+    ``scope["route"].path_format`` を使います。``include_router`` で登録したルートの
+    ``path_format`` にプレフィックスが含まれない場合は、パラメーターの値を埋め込んだルートのパスを
+    リクエストのパスの末尾と照合し、その前の部分をプレフィックスとして付け足します
+    (プレフィックスにパラメーターがあるなど復元できない場合は ``path_format`` のまま)。
+    マウントしたアプリ(静的ファイルなど)はマウント先のパスを、
+    どのルートにも一致しなかったリクエストは :data:`UNMATCHED_ROUTE` を返します。
+    """
+    route: Any = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if isinstance(path_format, str) and "endpoint" in scope:
+        request_path: str = scope["path"][len(scope.get("root_path", "")) :]
+        concrete = _concrete_path(route, scope.get("path_params", {}))
+        if concrete is not None and concrete != request_path and request_path.endswith(concrete):
+            return request_path[: -len(concrete)].rstrip("/") + path_format
+        return path_format
+    mount_path: str = scope.get("root_path", "")[len(scope.get("app_root_path", "")) :]
+    if mount_path and "endpoint" in scope:
+        return mount_path
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """HTTPリクエストをルートテンプレート単位で計測するASGIミドルウェア"""
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or is_warmup(scope):
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            registry.in_flight -= 1
+            registry.observe(scope["method"], route_template(scope), status, time.perf_counter() - start)
@@ -0,0 +1,160 @@
+"""ストリーミングJSON/NDJSONの逐次パーサー"""
+
+import codecs
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+# 配列の要素の直後に現れてよい文字
+_DELIMITERS = frozenset(_WHITESPACE + ",]")
+# 1件あたりの最大文字数の既定値
+DEFAULT_MAX_ITEM_SIZE = 64 * 1024
+
+
+class ItemTooLargeError(json.JSONDecodeError):
+    """1件の要素が上限の文字数を超えた場合の例外(不正な入力として扱えるようJSONDecodeErrorを継承)"""
+
+    def __init__(self, limit: int, doc: str, pos: int) -> None:
+        super().__init__(f"Item exceeds {limit} characters", doc, pos)
+        self.limit = limit
+
+
+async def _iter_text(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """バイト列のチャンクをUTF-8文字列のチャンクに変換(マルチバイト境界を考慮)"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    async for chunk in chunks:
+        if text := decoder.decode(chunk):
+            yield text
+    if text := decoder.decode(b"", final=True):
+        yield text
+
+
+async def iter_ndjson(chunks: AsyncIterable[bytes], max_item_size: int = DEFAULT_MAX_ITEM_SIZE) -> AsyncIterator[Any]:
+    """NDJSON(1行1JSON)を1件ずつ返す(空行は無視)
+
+    改行は新しく届いたチャンクの中だけを探すため、長い行でも処理量は入力長に比例します。
+
+    Args:
+        chunks: 入力のバイト列チャンク
+        max_item_size: 1行あたりの最大文字数
+
+    Raises:
+        ItemTooLargeError: 上限を超える行があった場合
+        json.JSONDecodeError: 不正な行があった場合
+    """
+    pending: list[str] = []
+    pending_size = 0
+    async for text in _iter_text(chunks):
+        start = 0
+        while (newline := text.find("\n", start)) != -1:
+            pending.append(text[start:newline])
+            line = "".join(pending)
+            pending.clear()
+            pending_size = 0
+            start = newline + 1
+            if len(line) > max_item_size:
+                raise ItemTooLargeError(max_item_size, "", 0)
+            if line.strip():
+                yield json.loads(line)
+        if start < len(text):
+            pending.append(text[start:])
+            pending_size += len(text) - start
+            if pending_size > max_item_size:
+                raise ItemTooLargeError(max_item_size, "", 0)
+    line = "".join(pending)
+    if line.strip():
+        yield json.loads(line)
+
+
+async def iter_json_array(
+    chunks: AsyncIterable[bytes], max_item_size: int = DEFAULT_MAX_ITEM_SIZE
+) -> AsyncIterator[Any]:
+    """JSON配列の要素を全体を読み込まずに1件ずつ返す
+
+    読み込み途中の要素が上限を超えた時点で打ち切るため、不正な入力や巨大な要素でも
+    入力の終端まで読み込み続けることはありません。
+
+    Args:
+        chunks: 入力のバイト列チャンク
+        max_item_size: 1要素あたりの最大文字数
+
+    Raises:
+        ItemTooLargeError: 上限を超える要素があった場合
+        json.JSONDecodeError: 配列として不正な場合
+    """
+    buffer = ""
+    pos = 0
+    started = False
+    texts = _iter_text(chunks)
+    eof = False
+
+    async def fill() -> bool:
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        if len(buffer) - pos > max_item_size:
+            raise ItemTooLargeError(max_item_size, buffer, pos)
+        try:
+            text = await anext(texts)
+        except StopAsyncIteration:
+            eof = True
+            return False
+        # 消費済みの部分を捨ててからチャンクを追加
+        buffer = buffer[pos:] + text
+        pos = 0
+        return True
+
+    def skip_whitespace() -> None:
+        nonlocal pos
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+
+    while True:
+        skip_whitespace()
+        if pos < len(buffer):
+            break
+        if not await fill():
+            raise json.JSONDecodeError("Expecting '['", buffer, pos)
+    if buffer[pos] != "[":
+        raise json.JSONDecodeError("Expecting '['", buffer, pos)
+    pos += 1
+
+    while True:
+        skip_whitespace()
+        if pos >= len(buffer):
+            if not await fill():
+                raise json.JSONDecodeError("Unterminated array", buffer, pos)
+            continue
+
+        char = buffer[pos]
+        if char == "]" and not started:
+            return
+        if started:
+            if char == "]":
+                return
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+            pos += 1
+            skip_whitespace()
+            while pos >= len(buffer):
+                if not await fill():
+                    raise json.JSONDecodeError("Unterminated array", buffer, pos)
+                skip_whitespace()
+
+        # 値の直後に区切り文字が届くまで待つ(数値などが途中で切れている可能性があるため)
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if not await fill():
+                    raise
+                continue
+            if (end < len(buffer) and buffer[end] in _DELIMITERS) or not await fill():
+                break
+        if end - pos > max_item_size:
+            raise ItemTooLargeError(max_item_size, buffer, pos)
+        started = True
+        yield value
+        pos = end
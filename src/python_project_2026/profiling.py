@@ -0,0 +1,199 @@
+"""本番環境向けのオンデマンドプロファイリング"""
+
+import asyncio
+import cProfile
+import hmac
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# 付与するとそのリクエストをcProfileで計測するヘッダー(値はソートキー、空なら累積時間順)
+PROFILE_HEADER = "x-profile"
+# PROFILING_TOKEN設定時に認証に使うヘッダー
+PROFILE_TOKEN_HEADER = "x-profile-token"
+# cProfileの結果として出力する関数の数
+PROFILE_LIMIT = 50
+# 1リクエストを計測する最長時間(秒)
+DEFAULT_PROFILE_TIMEOUT = 30.0
+# 計測を拒否したストリーミングレスポンスへの応答
+STREAMING_REFUSED = "streaming responses (text/event-stream) cannot be profiled\n"
+
+PSTATS_SORT_KEYS = frozenset({"calls", "cumulative", "filename", "ncalls", "pcalls", "line", "name", "tottime"})
+
+# プロファイラーはプロセス全体で1つしか有効にできないため、同時実行を防ぐ
+_profiler_lock = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    """別のプロファイリングが実行中"""
+
+
+def is_authorized(headers: Headers, token: str | None) -> bool:
+    """プロファイリング用トークンを検証(トークン未設定なら常に許可)"""
+    if not token:
+        return True
+    supplied = headers.get(PROFILE_TOKEN_HEADER, "")
+    return hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def format_stats(profiler: cProfile.Profile, sort: str = "cumulative", limit: int = PROFILE_LIMIT) -> str:
+    """cProfileの結果をテキストに整形"""
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats(sort if sort in PSTATS_SORT_KEYS else "cumulative").print_stats(limit)
+    return stream.getvalue()
+
+
+class ProfilingMiddleware:
+    """``X-Profile`` ヘッダー付きのリクエストをcProfileで計測し、結果を本文として返すASGIミドルウェア
+
+    元のレスポンス本文は破棄し、ステータスコードは ``X-Profile-Status`` ヘッダーで返します。
+    cProfileはスレッド単位で計測するため、同時に処理中の他のリクエストの処理も結果に含まれます。
+    ヘッダーのないリクエストはそのまま通過させます。
+
+    プロファイラーはプロセスで1つしか使えないため、終わらないレスポンスで占有されないよう、
+    Server-Sent Events(``text/event-stream``)は計測を拒否し、それ以外も ``timeout`` 秒で打ち切って
+    それまでの結果を返します(``X-Profile-Status: timeout``)。
+    """
+
+    def __init__(self, app: ASGIApp, token: str | None = None, timeout: float = DEFAULT_PROFILE_TIMEOUT) -> None:
+        self.app = app
+        self.token = token
+        self.timeout = timeout
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        sort = headers.get(PROFILE_HEADER)
+        if sort is None or not is_authorized(headers, self.token):
+            await self.app(scope, receive, send)
+            return
+        if _is_event_stream(headers.get("accept", "")):
+            await _send_text(send, 400, STREAMING_REFUSED)
+            return
+
+        if not _profiler_lock.acquire(blocking=False):
+            await _send_text(send, 409, "another profiling session is running\n")
+            return
+        status = 500
+        streaming = False
+
+        async def discard(message: Message) -> None:
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if _is_event_stream(Headers(raw=message["headers"]).get("content-type", "")):
+                    # ストリームの終わりを待たずに打ち切る
+                    streaming = True
+                    deadline.reschedule(asyncio.get_running_loop().time())
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            profiler.enable()
+            try:
+                async with asyncio.timeout(self.timeout) as deadline:
+                    await self.app(scope, receive, discard)
+            except TimeoutError:
+                if not deadline.expired():
+                    raise
+                timed_out = True
+            finally:
+                profiler.disable()
+        finally:
+            _profiler_lock.release()
+        elapsed = time.perf_counter() - start
+
+        if streaming:
+            await _send_text(send, 400, STREAMING_REFUSED)
+            return
+        outcome = f"timed out after {elapsed * 1000:.3f} ms" if timed_out else f"{status} in {elapsed * 1000:.3f} ms"
+        body = f"# {scope['method']} {scope['path']} -> {outcome}\n"
+        body += format_stats(profiler, sort=sort or "cumulative")
+        profile_status = b"timeout" if timed_out else str(status).encode()
+        await _send_text(send, 200, body, [(b"x-profile-status", profile_status)])
+
+
+def _is_event_stream(value: str) -> bool:
+    return "text/event-stream" in value.lower()
+
+
+async def _send_text(send: Send, status: int, body: str, headers: list[tuple[bytes, bytes]] | None = None) -> None:
+    content = body.encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(content)).encode()),
+                (b"cache-control", b"no-store"),
+                *(headers or []),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": content})
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+def _collapse(frame: FrameType | None) -> list[str]:
+    """フレームを呼び出し元から順に並べる"""
+    labels: list[str] = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def sample_stacks(seconds: float, interval: float = 0.005) -> Counter[str]:
+    """全スレッドのスタックを一定間隔で採取し、collapsed stacks形式で集計
+
+    イベントループのスレッドも対象になるため、呼び出し元はイベントループを塞がないよう
+    別スレッド(``asyncio.to_thread`` など)から呼び出してください。
+
+    Returns:
+        ``スレッド名;呼び出し元;...;呼び出し先`` -> 採取回数
+
+    Raises:
+        ProfilerBusyError: 別のプロファイリングが実行中の場合
+    """
+    if not _profiler_lock.acquire(blocking=False):
+        raise ProfilerBusyError("another profiling session is running")
+    try:
+        samples: Counter[str] = Counter()
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = [names.get(thread_id, f"thread-{thread_id}"), *_collapse(frame)]
+                samples[";".join(stack)] += 1
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(interval)
+        return samples
+    finally:
+        _profiler_lock.release()
+
+
+def format_collapsed(samples: Counter[str]) -> str:
+    """flamegraph.pl / speedscope で読み込めるcollapsed stacks形式の文字列に変換"""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(samples.items()))
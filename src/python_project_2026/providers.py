@@ -0,0 +1,73 @@
+"""ダッシュボード用データプロバイダー"""
+
+from collections.abc import Callable
+from typing import Any, Protocol
+
+import httpx
+
+from .tracing import SPAN_KIND_CLIENT, propagation_headers, span
+
+Payload = dict[str, Any]
+
+
+class DataProvider(Protocol):
+    """HTMXフラグメントが表示するデータの取得元"""
+
+    async def api_info(self) -> Payload:
+        """APIルートエンドポイントと同じ内容を返す"""
+        ...
+
+    async def health(self) -> Payload:
+        """ヘルスチェックエンドポイントと同じ内容を返す"""
+        ...
+
+
+class LocalDataProvider:
+    """同一プロセス内でデータを構築するプロバイダー(デフォルト)"""
+
+    def __init__(self, api_info: Callable[[], Payload], health: Callable[[], Payload]) -> None:
+        self._api_info = api_info
+        self._health = health
+
+    async def api_info(self) -> Payload:
+        """APIルート情報を直接構築"""
+        return self._api_info()
+
+    async def health(self) -> Payload:
+        """ヘルス情報を直接構築"""
+        return self._health()
+
+
+class HttpDataProvider:
+    """別プロセスのAPIサーバーからHTTP経由で取得するプロバイダー
+
+    APIとWeb UIを別々にデプロイする構成向けのオプトイン機能です。
+    """
+
+    def __init__(self, base_url: str, client: httpx.AsyncClient | None = None, timeout: float = 5.0) -> None:
+        self.base_url = base_url.rstrip("/")
+        self._client = client
+        self._timeout = timeout
+
+    async def api_info(self) -> Payload:
+        """リモートの /api/ から取得"""
+        return await self._get_json("/api/")
+
+    async def health(self) -> Payload:
+        """リモートの /health から取得"""
+        return await self._get_json("/health")
+
+    async def _get_json(self, path: str) -> Payload:
+        url = f"{self.base_url}{path}"
+        with span("http.client", f"GET {path}", kind=SPAN_KIND_CLIENT):
+            # 取得先でも同じトレースとして記録されるよう呼び出し元の区間を伝える
+            headers = propagation_headers()
+            if self._client is not None:
+                response = await self._client.get(url, headers=headers)
+            else:
+                async with httpx.AsyncClient(timeout=self._timeout) as client:
+                    response = await client.get(url, headers=headers)
+        response.raise_for_status()
+        with span("json.decode", path):
+            data: Payload = response.json()
+        return data
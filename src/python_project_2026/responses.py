@@ -0,0 +1,150 @@
+"""事前シリアライズ済みレスポンス"""
+
+import functools
+import hashlib
+import inspect
+import json
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.dependencies.models import Dependant
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-MatchヘッダーがETagに一致するか(弱い比較)"""
+    if not if_none_match:
+        return False
+    target = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == target:
+            return True
+    return False
+
+
+@dataclass(frozen=True)
+class PrecomputedJSON:
+    """起動時に一度だけシリアライズするJSONレスポンス
+
+    内容が不変のエンドポイント向けに、本文とETagを事前に計算しておき、
+    リクエストごとにはバイト列を返すだけにします。
+    """
+
+    body: bytes
+    etag: str
+    cache_control: str = "no-cache"
+    headers: dict[str, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "headers", {"ETag": self.etag, "Cache-Control": self.cache_control})
+
+    @classmethod
+    def from_content(cls, content: Any, cache_control: str = "no-cache") -> "PrecomputedJSON":
+        """JSONResponseと同じ形式でシリアライズし、強いETagを付与"""
+        body = json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode(
+            "utf-8"
+        )
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        return cls(body=body, etag=etag, cache_control=cache_control)
+
+    def response(self, request: Request) -> Response:
+        """If-None-Matchに応じて304または本文付きレスポンスを返す"""
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=self.headers)
+        return Response(content=self.body, media_type="application/json", headers=self.headers)
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """リクエスト本文を読みながらレスポンスを送出するStreamingResponse
+
+    標準のStreamingResponseは切断検知のために ``receive`` を並行して待ち受けるため、
+    本文を逐次読み込むハンドラーと本文のメッセージを奪い合ってしまいます。
+    切断は本文の読み込み(``request.stream()``)側で検知されるため、ここでは待ち受けません。
+    """
+
+    async def __call__(self, _scope: Scope, _receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+class ModelResponse(Response):
+    """Pydanticモデルを事前コンパイル済みのシリアライザーで直接JSONバイト列にするレスポンス
+
+    ``jsonable_encoder`` による辞書への変換と再検証を行わず、
+    モデルの ``__pydantic_serializer__`` で一度だけシリアライズします。
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: BaseModel,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+    ) -> None:
+        super().__init__(content=content, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        """モデルをJSONバイト列にシリアライズ"""
+        serialized: bytes = content.__pydantic_serializer__.to_json(content, by_alias=True)
+        return serialized
+
+
+class TrustedModelRoute(APIRoute):
+    """ハンドラーが構築したレスポンスモデルを信頼して再検証を省略するルート
+
+    エンドポイントが ``response_model`` と同じ型のインスタンスを返した場合、FastAPIによる
+    再検証と再シリアライズを行わず :class:`ModelResponse` で直接返します。
+    ``response_model`` はそのまま残るため、OpenAPIスキーマは変わりません。
+    ステータスコードはルートの ``status_code`` を使います。
+    それ以外の戻り値や、フィールドの絞り込み(``response_model_exclude`` 等)・独自の
+    ``response_class`` を指定したルート、ハンドラーや依存関係が ``Response`` 引数で
+    ヘッダーやCookieを設定しうるルートでは通常の処理になります。
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        if inspect.iscoroutinefunction(endpoint):
+            endpoint = self._wrap_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def _wrap_endpoint(self, endpoint: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(endpoint)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            result = await endpoint(*args, **kwargs)
+            if type(result) is self.response_model and self._trusts_response_model:
+                return ModelResponse(result, status_code=self.status_code or 200)
+            return result
+
+        return wrapper
+
+    @functools.cached_property
+    def _trusts_response_model(self) -> bool:
+        """レスポンスモデルをそのまま返してよい設定か"""
+        return (
+            self.response_model_include is None
+            and self.response_model_exclude is None
+            and self.response_model_by_alias
+            and not self.response_model_exclude_unset
+            and not self.response_model_exclude_defaults
+            and not self.response_model_exclude_none
+            and isinstance(self.response_class, DefaultPlaceholder)
+            and self.status_code not in (204, 304)
+            and not _uses_response_param(self.dependant)
+        )
+
+
+def _uses_response_param(dependant: Dependant) -> bool:
+    """エンドポイントか依存関係のいずれかが ``Response`` 引数を受け取るか"""
+    return dependant.response_param_name is not None or any(_uses_response_param(sub) for sub in dependant.dependencies)
@@ -0,0 +1,39 @@
+"""プロファイリング用のデバッグルーター"""
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+
+from python_project_2026.profiling import (
+    ProfilerBusyError,
+    format_collapsed,
+    is_authorized,
+    sample_stacks,
+)
+
+router = APIRouter()
+
+
+def require_profiling_token(request: Request) -> None:
+    """アプリケーションに設定されたプロファイリング用トークンを検証"""
+    token: str | None = request.app.state.profiling_token
+    if not is_authorized(request.headers, token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+
+@router.get("/profile", response_class=PlainTextResponse, dependencies=[Depends(require_profiling_token)])
+async def profile(
+    seconds: float = Query(5.0, gt=0, le=60, description="採取する秒数"),
+    interval: float = Query(0.005, ge=0.001, le=1.0, description="採取間隔(秒)"),
+) -> PlainTextResponse:
+    """全スレッド(イベントループを含む)のスタックを採取してcollapsed stacks形式で返します
+
+    Returns:
+        flamegraph.plやspeedscopeで読み込めるテキスト
+    """
+    try:
+        samples = await asyncio.to_thread(sample_stacks, seconds, interval)
+    except ProfilerBusyError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return PlainTextResponse(format_collapsed(samples), headers={"Cache-Control": "no-store"})
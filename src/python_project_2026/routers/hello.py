@@ -1,9 +1,37 @@
 """挨拶APIルーター"""
 
-from fastapi import APIRouter, Query
+import json
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-router = APIRouter()
+from python_project_2026.ndjson import DEFAULT_MAX_ITEM_SIZE, ItemTooLargeError, iter_json_array, iter_ndjson
+from python_project_2026.responses import DuplexStreamingResponse, TrustedModelRoute
+
+# ハンドラーで構築したレスポンスモデルは再検証せずに直接シリアライズする
+router = APIRouter(route_class=TrustedModelRoute)
+
+# NDJSONとして扱うContent-Type
+NDJSON_MEDIA_TYPES = frozenset({"application/x-ndjson", "application/ndjson", "application/jsonl"})
+
+
+@dataclass(frozen=True)
+class BatchSettings:
+    """一括挨拶エンドポイントの設定"""
+
+    max_size: int = 10_000
+    flush_size: int = 100
+    max_item_size: int = DEFAULT_MAX_ITEM_SIZE
+
+
+def get_batch_settings(request: Request) -> BatchSettings:
+    """アプリケーションに登録された一括処理の設定を取得"""
+    settings: BatchSettings = request.app.state.hello_batch_settings
+    return settings
 
 
 class HelloResponse(BaseModel):
@@ -50,3 +78,73 @@ async def version() -> VersionResponse:
         version=__version__,
         python_version=f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}",
     )
+
+
+def _batch_item_name(item: Any) -> str | None:
+    """一括リクエストの要素から名前を取り出す(文字列または{"name": 文字列})"""
+    if isinstance(item, str):
+        return item
+    if isinstance(item, dict) and isinstance(item.get("name"), str):
+        return str(item["name"])
+    return None
+
+
+def _error_line(**fields: Any) -> bytes:
+    return json.dumps(fields, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+@router.post(
+    "/hello/batch",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "HelloResponseを1行ずつ出力"}},
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": {"type": "string"}}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def hello_batch(request: Request, settings: BatchSettings = Depends(get_batch_settings)) -> StreamingResponse:
+    """複数の名前への挨拶をNDJSONでストリーミング返却します
+
+    リクエストはJSON配列、またはNDJSON(``Content-Type: application/x-ndjson``)で送信します。
+    要素は名前の文字列か ``{"name": ...}`` です。入力と出力はどちらも逐次処理されるため、
+    全件をメモリに保持しません。ストリーミング開始後のエラーは ``{"error": ...}`` 行として出力されます。
+
+    Returns:
+        HelloResponseを1行ずつ含むNDJSON
+    """
+    media_type = request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    parse = iter_ndjson if media_type in NDJSON_MEDIA_TYPES else iter_json_array
+    items = parse(request.stream(), max_item_size=settings.max_item_size)
+
+    async def generate() -> AsyncIterator[bytes]:
+        lines: list[bytes] = []
+        count = 0
+        try:
+            async for item in items:
+                if count >= settings.max_size:
+                    lines.append(_error_line(error="batch size limit exceeded", limit=settings.max_size))
+                    break
+                name = _batch_item_name(item)
+                if name is None:
+                    lines.append(_error_line(error="invalid item", index=count))
+                else:
+                    lines.append(
+                        HelloResponse(message=f"こんにちは、{name}!", name=name).model_dump_json().encode() + b"\n"
+                    )
+                count += 1
+                if len(lines) >= settings.flush_size:
+                    yield b"".join(lines)
+                    lines.clear()
+        except ItemTooLargeError as e:
+            lines.append(_error_line(error="item too large", limit=e.limit, index=count))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            lines.append(_error_line(error="invalid request body", detail=str(e), index=count))
+        if lines:
+            yield b"".join(lines)
+
+    return DuplexStreamingResponse(generate(), media_type="application/x-ndjson")
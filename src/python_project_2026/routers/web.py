@@ -1,164 +1,133 @@
 """HTMX対応のWebルーター"""
 
-import httpx
-from fastapi import APIRouter, Request
-from fastapi.responses import HTMLResponse
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 
-# テンプレート設定
-templates = Jinja2Templates(directory="src/python_project_2026/templates")
+from python_project_2026.broadcast import Broadcaster, TooManySubscribersError, format_sse
+from python_project_2026.cache import SingleFlightCache
+from python_project_2026.providers import DataProvider
+from python_project_2026.templating import FragmentRenderer, create_environment
+from python_project_2026.tracing import span
+from python_project_2026.utils import pick_paths
+
+# テンプレート設定(パッケージ内のテンプレートを一度だけコンパイルして再利用)
+templates = Jinja2Templates(env=create_environment())
+# HTMLフラグメントのレンダリングキャッシュ
+fragments = FragmentRenderer(templates.env)
+# データ取得の共有キャッシュ(同時に来たリクエストは1回の取得を待ち、取得元の停止中は直近の値を返す)
+data_cache = SingleFlightCache()
 
 router = APIRouter()
 
+# フラグメントで表示するレスポンスのフィールド(テンプレートでの名前 -> パス式)
+# 表示しない値をキャッシュキーに含めず、想定外の形のレスポンスでも欠損値として扱う
+API_INFO_FIELDS = {"message": "message", "version": "version", "environment": "environment", "docs": "docs"}
+HEALTH_FIELDS = {"status": "status", "version": "version"}
+
+
+def get_data_provider(request: Request) -> DataProvider:
+    """アプリケーションに登録されたデータプロバイダーを取得"""
+    provider: DataProvider = request.app.state.data_provider
+    return provider
+
+
+def get_health_broadcaster(request: Request) -> Broadcaster:
+    """ヘルスチェック配信用のブロードキャスターを取得"""
+    broadcaster: Broadcaster = request.app.state.health_broadcaster
+    return broadcaster
+
 
 @router.get("/", response_class=HTMLResponse)
 async def index(request: Request) -> HTMLResponse:
     """ホームページ表示"""
-    return templates.TemplateResponse(request, "index.html")
+    with span("template", "index.html"):
+        return templates.TemplateResponse(request, "index.html")
 
 
-@router.get("/api-info", response_class=HTMLResponse)
-async def api_info(_request: Request) -> HTMLResponse:
-    """APIルートエンドポイントの情報を取得してHTMLで返却"""
+async def render_api_info(provider: DataProvider) -> str:
+    """API情報を取得してHTMLフラグメントを生成"""
     try:
-        # 内部APIエンドポイントから情報を取得
-        async with httpx.AsyncClient() as client:
-            response = await client.get("http://localhost:8000/api/")
-            data = response.json()
-
-        # HTMLフラグメントを返却
-        return HTMLResponse(f"""
-        <div class="api-info-card env-{data.get("environment", "unknown").lower()}">
-            <div class="api-info-header">
-                <h3>API情報</h3>
-                <span class="status-badge status-{data.get("environment", "unknown").lower()}">
-                    {data.get("environment", "Unknown").upper()}
-                </span>
-            </div>
-            <dl>
-                <dt>メッセージ</dt>
-                <dd>{data.get("message", "N/A")}</dd>
-
-                <dt>バージョン</dt>
-                <dd><code>{data.get("version", "N/A")}</code></dd>
-
-                <dt>環境</dt>
-                <dd>{data.get("environment", "N/A")}</dd>
-
-                <dt>APIドキュメント</dt>
-                <dd>
-                    {f'<a href="{data.get("docs")}" target="_blank">Swagger UI</a>' if data.get("docs") else "本番環境では無効"}
-                </dd>
-
-                <dt>取得時刻</dt>
-                <dd class="text-small text-muted">{__import__("datetime").datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</dd>
-            </dl>
-
-            <button
-                hx-get="/api-info"
-                hx-target="#api-info-container"
-                hx-swap="innerHTML"
-                hx-indicator="#loading-indicator"
-                style="margin-top: 1rem;"
-            >
-                再読み込み
-            </button>
-        </div>
-        """)
-
+        # データプロバイダーから情報を取得
+        with span("data", "api_info"):
+            data = await data_cache.get((provider, "api_info"), provider.api_info)
     except Exception as e:
-        return HTMLResponse(f"""
-        <div class="api-info-card" style="border-left: 4px solid var(--danger-color);">
-            <div class="api-info-header">
-                <h3>エラー</h3>
-                <span class="status-badge" style="background-color: var(--danger-color); color: white;">
-                    ERROR
-                </span>
-            </div>
-            <p>API情報の取得に失敗しました。</p>
-            <details>
-                <summary>エラー詳細</summary>
-                <pre style="background-color: var(--code-background-color); padding: 0.5rem; border-radius: 0.25rem; font-size: 0.875rem;">{e!s}</pre>
-            </details>
-
-            <button
-                hx-get="/api-info"
-                hx-target="#api-info-container"
-                hx-swap="innerHTML"
-                hx-indicator="#loading-indicator"
-                style="margin-top: 1rem;"
-            >
-                再試行
-            </button>
-        </div>
-        """)
+        return fragments.render(
+            "fragments/error.html",
+            {
+                "title": "エラー",
+                "badge": "ERROR",
+                "message": "API情報の取得に失敗しました。",
+                "error": str(e),
+                "url": "/api-info",
+                "target": "#api-info-container",
+                "indicator": "#loading-indicator",
+            },
+            cache=False,
+        )
+    return fragments.render("fragments/api_info.html", {"data": pick_paths(data, API_INFO_FIELDS)})
+
+
+async def render_health_check(provider: DataProvider) -> str:
+    """ヘルスチェック結果を取得してHTMLフラグメントを生成"""
+    try:
+        # データプロバイダーからヘルス情報を取得
+        with span("data", "health"):
+            data = await data_cache.get((provider, "health"), provider.health)
+    except Exception as e:
+        return fragments.render(
+            "fragments/error.html",
+            {
+                "title": "ヘルスチェック",
+                "badge": "UNHEALTHY",
+                "message": "ヘルスチェックに失敗しました。APIサーバーが停止している可能性があります。",
+                "error": str(e),
+                "url": "/health-check",
+                "target": "#health-check-container",
+                "indicator": "#health-loading",
+            },
+            cache=False,
+        )
+    return fragments.render("fragments/health_check.html", {"data": pick_paths(data, HEALTH_FIELDS)})
+
+
+@router.get("/api-info", response_class=HTMLResponse)
+async def api_info(provider: DataProvider = Depends(get_data_provider)) -> HTMLResponse:
+    """APIルートエンドポイントの情報を取得してHTMLで返却"""
+    return HTMLResponse(await render_api_info(provider))
 
 
 @router.get("/health-check", response_class=HTMLResponse)
-async def health_check(_request: Request) -> HTMLResponse:
+async def health_check(provider: DataProvider = Depends(get_data_provider)) -> HTMLResponse:
     """ヘルスチェック結果を取得してHTMLで返却"""
-    try:
-        # 内部APIエンドポイントからヘルス情報を取得
-        async with httpx.AsyncClient() as client:
-            response = await client.get("http://localhost:8000/health")
-            data = response.json()
-
-        return HTMLResponse(f"""
-        <div class="api-info-card">
-            <div class="api-info-header">
-                <h3>ヘルスチェック</h3>
-                <span class="status-badge status-healthy">
-                    {data.get("status", "unknown").upper()}
-                </span>
-            </div>
-            <dl>
-                <dt>ステータス</dt>
-                <dd>{data.get("status", "unknown")}</dd>
-
-                <dt>バージョン</dt>
-                <dd><code>{data.get("version", "N/A")}</code></dd>
-
-                <dt>最終チェック</dt>
-                <dd class="text-small text-muted">{__import__("datetime").datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</dd>
-            </dl>
-
-            <button
-                hx-get="/health-check"
-                hx-target="#health-check-container"
-                hx-swap="innerHTML"
-                hx-trigger="click, every 5s"
-                hx-indicator="#health-loading"
-                style="margin-top: 1rem;"
-            >
-                再チェック (5秒ごとに自動更新)
-            </button>
-        </div>
-        """)
+    return HTMLResponse(await render_health_check(provider))
 
-    except Exception as e:
-        return HTMLResponse(f"""
-        <div class="api-info-card" style="border-left: 4px solid var(--danger-color);">
-            <div class="api-info-header">
-                <h3>ヘルスチェック</h3>
-                <span class="status-badge" style="background-color: var(--danger-color); color: white;">
-                    UNHEALTHY
-                </span>
-            </div>
-            <p>ヘルスチェックに失敗しました。APIサーバーが停止している可能性があります。</p>
-            <details>
-                <summary>エラー詳細</summary>
-                <pre style="background-color: var(--code-background-color); padding: 0.5rem; border-radius: 0.25rem; font-size: 0.875rem;">{e!s}</pre>
-            </details>
-
-            <button
-                hx-get="/health-check"
-                hx-target="#health-check-container"
-                hx-swap="innerHTML"
-                hx-trigger="click, every 5s"
-                hx-indicator="#health-loading"
-                style="margin-top: 1rem;"
-            >
-                再試行 (5秒ごとに自動更新)
-            </button>
-        </div>
-        """)
+
+@router.get("/health-check/stream", response_class=StreamingResponse)
+async def health_check_stream(broadcaster: Broadcaster = Depends(get_health_broadcaster)) -> Response:
+    """ヘルスチェック結果をServer-Sent Eventsで配信
+
+    ヘルス情報はバックグラウンドで一定間隔ごとに1回だけ生成され、全接続に配信されます。
+    """
+    try:
+        queue = broadcaster.subscribe()
+    except TooManySubscribersError:
+        return Response(status_code=503, headers={"Retry-After": str(int(broadcaster.interval) or 1)})
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            # 接続直後は最新の結果をすぐに返す
+            if broadcaster.latest is not None:
+                yield format_sse(broadcaster.latest, event="health")
+            while (event := await queue.get()) is not None:
+                yield format_sse(event, event="health")
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
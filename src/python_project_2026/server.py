@@ -0,0 +1,183 @@
+"""本番運用向けのASGIサーバー起動(マルチワーカー・SO_REUSEPORT対応)"""
+
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+from dataclasses import dataclass, field
+from importlib.util import find_spec
+from typing import Any
+
+import uvicorn
+
+from .logs import logger as log
+from .shared_stats import default_segment_name
+from .utils import default_workers
+
+# 起動するASGIアプリケーション(マルチワーカーでは各プロセスが読み込むため文字列で指定)
+APP_IMPORT_STRING = "python_project_2026.api:app"
+
+LOOP_CHOICES = ("auto", "uvloop", "asyncio")
+HTTP_CHOICES = ("auto", "httptools", "h11")
+
+# 起動に失敗したワーカーの終了コード(uvicornと同じ値。公開場所がバージョンで異なるため自前で定義)
+STARTUP_FAILURE = 3
+
+
+def reuse_port_available() -> bool:
+    """SO_REUSEPORTによるカーネルでの負荷分散が使えるか"""
+    return hasattr(socket, "SO_REUSEPORT") and sys.platform.startswith("linux")
+
+
+def resolve_loop(choice: str) -> str:
+    """イベントループの実装を決定(autoならuvloopを優先)
+
+    Raises:
+        ValueError: 不明な指定、または指定した実装がインストールされていない場合
+    """
+    if choice not in LOOP_CHOICES:
+        raise ValueError(f"loop must be one of {', '.join(LOOP_CHOICES)}")
+    uvloop_available = sys.platform != "win32" and find_spec("uvloop") is not None
+    if choice == "auto":
+        return "uvloop" if uvloop_available else "asyncio"
+    if choice == "uvloop" and not uvloop_available:
+        raise ValueError("uvloop is not installed")
+    return choice
+
+
+def resolve_http(choice: str) -> str:
+    """HTTPパーサーの実装を決定(autoならhttptoolsを優先)
+
+    Raises:
+        ValueError: 不明な指定、または指定した実装がインストールされていない場合
+    """
+    if choice not in HTTP_CHOICES:
+        raise ValueError(f"http must be one of {', '.join(HTTP_CHOICES)}")
+    httptools_available = find_spec("httptools") is not None
+    if choice == "auto":
+        return "httptools" if httptools_available else "h11"
+    if choice == "httptools" and not httptools_available:
+        raise ValueError("httptools is not installed")
+    return choice
+
+
+@dataclass(frozen=True)
+class ServerSettings:
+    """サーバーの起動設定"""
+
+    host: str = "127.0.0.1"
+    port: int = 8000
+    workers: int = field(default_factory=default_workers)
+    loop: str = "auto"
+    http: str = "auto"
+    # Trueなら各ワーカーが自分のソケットをSO_REUSEPORTでバインドし、カーネルが接続を振り分ける
+    # Falseなら親プロセスがバインドした1つのソケットを全ワーカーで共有する
+    reuse_port: bool = False
+    backlog: int = 2048
+    timeout_keep_alive: int = 5
+    limit_concurrency: int | None = None
+    # ワーカーがこの件数を処理したら正常終了させ、新しいワーカーに置き換える
+    limit_max_requests: int | None = None
+    limit_max_requests_jitter: int = 0
+    timeout_graceful_shutdown: int | None = None
+
+    def uvicorn_options(self) -> dict[str, Any]:
+        """uvicorn.Configに渡すオプション"""
+        return {
+            "host": self.host,
+            "port": self.port,
+            "workers": self.workers,
+            "loop": resolve_loop(self.loop),
+            "http": resolve_http(self.http),
+            "backlog": self.backlog,
+            "timeout_keep_alive": self.timeout_keep_alive,
+            "limit_concurrency": self.limit_concurrency,
+            "limit_max_requests": self.limit_max_requests,
+            "limit_max_requests_jitter": self.limit_max_requests_jitter,
+            "timeout_graceful_shutdown": self.timeout_graceful_shutdown,
+        }
+
+
+def bind_reuse_port(host: str, port: int) -> socket.socket:
+    """SO_REUSEPORT付きでソケットをバインド(listenはuvicornが行う)"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    return sock
+
+
+def _run_reuse_port_worker(options: dict[str, Any]) -> None:
+    """SO_REUSEPORTモードのワーカープロセス本体"""
+    config = uvicorn.Config(APP_IMPORT_STRING, **{**options, "workers": 1})
+    try:
+        sock = bind_reuse_port(config.host, config.port)
+    except OSError as exc:
+        log.error("ソケットをバインドできません", host=config.host, port=config.port, detail=str(exc))
+        log.flush()
+        sys.exit(STARTUP_FAILURE)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class ReusePortSupervisor:
+    """ワーカーごとにSO_REUSEPORTのソケットを持たせるプロセス管理
+
+    終了したワーカー(``limit_max_requests`` に達したものを含む)は新しいワーカーに置き換えます。
+    他のワーカーは自分のソケットで受け付けを続けるため、入れ替え中も接続は拒否されません。
+    """
+
+    def __init__(self, options: dict[str, Any], workers: int) -> None:
+        self.options = options
+        self.workers = workers
+        self.should_exit = threading.Event()
+        self._context = multiprocessing.get_context("spawn")
+        self.processes: list[multiprocessing.process.BaseProcess] = []
+
+    def _spawn(self) -> multiprocessing.process.BaseProcess:
+        process = self._context.Process(target=_run_reuse_port_worker, args=(self.options,))
+        process.start()
+        return process
+
+    def run(self) -> None:
+        """ワーカーを起動し、終了シグナルを受け取るまで監視"""
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self.should_exit.set())
+
+        self.processes = [self._spawn() for _ in range(self.workers)]
+        log.info("SO_REUSEPORTのワーカーを起動しました", pid=os.getpid(), workers=self.workers)
+        while not self.should_exit.wait(0.5):
+            self.replace_exited_workers()
+
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join()
+
+    def replace_exited_workers(self) -> None:
+        """終了したワーカーを新しいワーカーに置き換える"""
+        for index, process in enumerate(self.processes):
+            if process.is_alive():
+                continue
+            process.join()
+            if process.exitcode == STARTUP_FAILURE:
+                # 設定やバインドの誤りは再起動しても直らないため全体を停止
+                log.error("ワーカーの起動に失敗したため停止します", pid=process.pid)
+                self.should_exit.set()
+                return
+            self.processes[index] = self._spawn()
+
+
+def serve(settings: ServerSettings) -> None:
+    """設定に従ってサーバーを起動(終了するまで戻らない)"""
+    options = settings.uvicorn_options()
+    # ワーカーの起動方法によらず全ワーカーが同じ共有メモリで集計するよう、このプロセスを基準に名前を決める
+    os.environ.setdefault("SHARED_STATS_NAME", default_segment_name(os.getpid()))
+    if settings.workers > 1 and settings.reuse_port and reuse_port_available():
+        ReusePortSupervisor(options, settings.workers).run()
+        return
+    # 1ワーカー、または親プロセスがバインドしたソケットを共有するマルチワーカー
+    # (uvicornのマルチプロセス管理が終了したワーカーを再起動する)
+    uvicorn.run(APP_IMPORT_STRING, **options)
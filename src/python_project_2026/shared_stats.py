@@ -0,0 +1,400 @@
+"""ワーカープロセス間で共有するリクエスト集計とヘルス状態(共有メモリ)"""
+
+import contextlib
+import os
+import stat
+import sys
+import tempfile
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any
+
+from .metrics import DEFAULT_BUCKETS
+
+if sys.platform != "win32":
+    import fcntl
+
+# 共有メモリの先頭に置くヘッダー(識別子, レイアウトのバージョン, スロット数, スロットあたりの要素数)
+MAGIC = 0x5050_3236_5354_4154
+LAYOUT_VERSION = 1
+_HEADER = 4
+
+# スロット内の要素の位置(すべて符号付き64ビット整数)
+_PID = 0
+_STARTED_MS = 1
+_HEARTBEAT_MS = 2
+_FLAGS = 3
+_IN_FLIGHT = 4
+_LOOP_LAG_US = 5
+_REQUESTS = 6
+_DURATION_SUM_US = 7
+_STATUS = 8
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+_BUCKETS = _STATUS + len(STATUS_CLASSES)
+
+FLAG_READY = 1
+FLAG_WARMED_UP = 2
+
+_ITEM_SIZE = 8
+
+
+def default_segment_name(pid: int) -> str:
+    """``serve`` コマンドが使う共有メモリの名前(起動したプロセスのPIDから決める)"""
+    return f"python-project-2026-{pid}"
+
+
+def runtime_dir() -> Path:
+    """ロックファイルを置く、このユーザー専用のディレクトリ
+
+    ``XDG_RUNTIME_DIR`` があればその配下、なければ一時ディレクトリ配下にユーザーごとに作成します。
+
+    Raises:
+        OSError: 既存のディレクトリが他のユーザーの所有、または他のユーザーも書き込める場合
+    """
+    uid = os.getuid()
+    xdg = os.environ.get("XDG_RUNTIME_DIR")
+    path = Path(xdg) / "python-project-2026" if xdg else Path(tempfile.gettempdir()) / f"python-project-2026-{uid}"
+    with contextlib.suppress(FileExistsError):
+        path.mkdir(mode=0o700)
+    info = path.lstat()
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != uid or info.st_mode & 0o077:
+        raise OSError(f"{path} is not a private directory")
+    return path
+
+
+def slot_fields(bucket_count: int) -> int:
+    """1ワーカー分のスロットの要素数(最後のバケットは+Inf)"""
+    return _BUCKETS + bucket_count + 1
+
+
+def segment_size(slots: int, bucket_count: int) -> int:
+    """共有メモリ全体のバイト数"""
+    return (_HEADER + slots * slot_fields(bucket_count)) * _ITEM_SIZE
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    if sys.platform == "win32":
+        # Windowsのos.killはプロセスを終了させてしまうため、ハートビートだけで判断する
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextlib.contextmanager
+def _segment_lock(path: Path | None) -> Iterator[None]:
+    """スロットの確保・解放と共有メモリの作成・削除をワーカー間で排他する(リクエスト処理中は使わない)
+
+    最後のワーカーはロックを持ったままロックファイルを削除するため、ロックを取れたあとに
+    ファイルが差し替わっていないことを確かめ、差し替わっていれば取り直します。
+    """
+    if sys.platform == "win32" or path is None:
+        yield
+        return
+    while True:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            with contextlib.suppress(FileNotFoundError):
+                if path.stat().st_ino == os.fstat(fd).st_ino:
+                    break
+        except BaseException:
+            os.close(fd)
+            raise
+        os.close(fd)
+    try:
+        yield
+    finally:
+        os.close(fd)
+
+
+def _open_segment(name: str, size: int) -> tuple[SharedMemory, bool]:
+    """共有メモリを作成(既にあれば接続)し、作成したかどうかと合わせて返す"""
+    try:
+        shm, created = SharedMemory(name, create=True, size=size), True
+    except FileExistsError:
+        shm, created = SharedMemory(name), False
+    if sys.platform != "win32":
+        # 削除は最後に解放したワーカーが行うため、プロセスごとのresource_trackerには任せない
+        resource_tracker.unregister(f"/{shm.name}", "shared_memory")
+    return shm, created
+
+
+@dataclass(frozen=True)
+class WorkerStats:
+    """1ワーカー分の集計値"""
+
+    slot: int
+    pid: int
+    alive: bool
+    ready: bool
+    warmed_up: bool
+    in_flight: int
+    loop_lag: float
+    requests: int
+    started_at: float
+    heartbeat_at: float
+
+
+@dataclass(frozen=True)
+class InstanceTotals:
+    """全ワーカーの合計
+
+    リクエスト数とレイテンシーは終了したワーカーの分も含めた累計、
+    ワーカー数・処理中リクエスト数は動作中のワーカーのみの値です。
+    """
+
+    workers: int
+    ready_workers: int
+    in_flight: int
+    requests: int
+    statuses: dict[str, int]
+    # 各バケットの件数(累積ではない)。最後の要素は+Inf
+    buckets: tuple[int, ...]
+    duration_sum: float
+    worker_stats: tuple[WorkerStats, ...]
+
+
+class SharedStats:
+    """共有メモリ上の固定レイアウトの配列に、ワーカーごとの集計値を書き込む
+
+    各ワーカーは確保した自分のスロットにだけ書き込むため、リクエストごとの更新にロックは不要です。
+    読み出し側は全スロットを足し合わせるだけで、プロセス間通信や外部サービスなしに
+    インスタンス全体の合計を返せます。
+
+    終了したワーカーのスロットは次に起動したワーカーが引き継ぎ、累計値はそのまま加算し続けます。
+    ハートビートが ``stale_after`` 秒以上更新されていないスロットは動作中として数えません。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        slots: int = 64,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+        stale_after: float = 10.0,
+        clock: Callable[[], float] = time.time,
+        lock_dir: Path | None = None,
+    ) -> None:
+        """共有メモリを作成、または他のワーカーが作成したものに接続
+
+        ``lock_dir`` はワーカー間の排他に使うロックファイルの置き場所です(省略時は :func:`runtime_dir`)。
+
+        Raises:
+            OSError: 共有メモリを作成・接続できない場合
+            ValueError: 既存の共有メモリのレイアウトが設定と一致しない場合
+        """
+        self.name = name
+        self.slots = slots
+        self.buckets = tuple(sorted(buckets))
+        self.stale_after = stale_after
+        self.slot: int | None = None
+        self._clock = clock
+        self._fields = slot_fields(len(self.buckets))
+        self.lock_path: Path | None = None
+        if sys.platform != "win32":
+            self.lock_path = (lock_dir if lock_dir is not None else runtime_dir()) / f"{name}.lock"
+        header = (MAGIC, LAYOUT_VERSION, slots, self._fields)
+        with _segment_lock(self.lock_path):
+            self._shm, created = _open_segment(name, segment_size(slots, len(self.buckets)))
+            buf = self._shm.buf
+            if buf is None:
+                raise OSError(f"shared memory {name!r} is not mapped")
+            self._view: Any = buf.cast("q")
+            if created:
+                for index, value in enumerate(header):
+                    self._view[index] = value
+            elif tuple(self._view[:_HEADER]) != header:
+                self.close()
+                raise ValueError(f"shared memory {name!r} has a different layout, set another name")
+
+    def _base(self, slot: int) -> int:
+        return _HEADER + slot * self._fields
+
+    def _now_ms(self) -> int:
+        return int(self._clock() * 1000)
+
+    def _is_alive(self, base: int, now_ms: int) -> bool:
+        view = self._view
+        return bool(view[base + _PID]) and now_ms - view[base + _HEARTBEAT_MS] <= self.stale_after * 1000
+
+    def claim(self, pid: int | None = None) -> int:
+        """このワーカーのスロットを確保(終了したワーカーのスロットは累計値ごと引き継ぐ)
+
+        Raises:
+            RuntimeError: 空いているスロットがない場合
+        """
+        pid = os.getpid() if pid is None else pid
+        view = self._view
+        with _segment_lock(self.lock_path):
+            now_ms = self._now_ms()
+            candidates = [self._base(slot) for slot in range(self.slots)]
+            free = next((base for base in candidates if view[base + _PID] == pid), None)
+            if free is None:
+                free = next(
+                    (
+                        base
+                        for base in candidates
+                        if not view[base + _PID]
+                        or (not self._is_alive(base, now_ms) and not _pid_alive(view[base + _PID]))
+                    ),
+                    None,
+                )
+            if free is None:
+                raise RuntimeError(f"no free slot in shared memory {self.name!r} ({self.slots} slots)")
+            view[free + _PID] = pid
+            view[free + _STARTED_MS] = now_ms
+            view[free + _HEARTBEAT_MS] = now_ms
+            view[free + _FLAGS] = 0
+            view[free + _IN_FLIGHT] = 0
+            view[free + _LOOP_LAG_US] = 0
+        self.slot = (free - _HEADER) // self._fields
+        return self.slot
+
+    def observe(self, status: int, duration: float) -> None:
+        """完了したリクエストを自分のスロットに記録(スロット未確保なら何もしない)"""
+        if self.slot is None:
+            return
+        view = self._view
+        base = self._base(self.slot)
+        view[base + _REQUESTS] += 1
+        view[base + _DURATION_SUM_US] += int(duration * 1_000_000)
+        view[base + _STATUS + min(max(status // 100, 1), 5) - 1] += 1
+        view[base + _BUCKETS + bisect_left(self.buckets, duration)] += 1
+
+    def publish(self, ready: bool, warmed_up: bool, in_flight: int, loop_lag: float) -> None:
+        """ヘルス状態と処理中のリクエスト数を書き込み、ハートビートを更新"""
+        if self.slot is None:
+            return
+        view = self._view
+        base = self._base(self.slot)
+        view[base + _FLAGS] = (FLAG_READY if ready else 0) | (FLAG_WARMED_UP if warmed_up else 0)
+        view[base + _IN_FLIGHT] = in_flight
+        view[base + _LOOP_LAG_US] = int(loop_lag * 1_000_000)
+        view[base + _HEARTBEAT_MS] = self._now_ms()
+
+    def totals(self) -> InstanceTotals:
+        """全スロットを合計"""
+        view = self._view
+        now_ms = self._now_ms()
+        statuses = [0] * len(STATUS_CLASSES)
+        buckets = [0] * (len(self.buckets) + 1)
+        requests = duration_sum_us = in_flight = ready_workers = 0
+        workers: list[WorkerStats] = []
+        for slot in range(self.slots):
+            base = self._base(slot)
+            values = view[base : base + self._fields].tolist()
+            if not values[_PID] and not values[_REQUESTS]:
+                continue
+            requests += values[_REQUESTS]
+            duration_sum_us += values[_DURATION_SUM_US]
+            for index in range(len(statuses)):
+                statuses[index] += values[_STATUS + index]
+            for index in range(len(buckets)):
+                buckets[index] += values[_BUCKETS + index]
+            if not values[_PID]:
+                continue
+            alive = self._is_alive(base, now_ms)
+            flags = values[_FLAGS]
+            if alive:
+                in_flight += values[_IN_FLIGHT]
+                ready_workers += bool(flags & FLAG_READY)
+            workers.append(
+                WorkerStats(
+                    slot=slot,
+                    pid=values[_PID],
+                    alive=alive,
+                    ready=alive and bool(flags & FLAG_READY),
+                    warmed_up=bool(flags & FLAG_WARMED_UP),
+                    in_flight=values[_IN_FLIGHT],
+                    loop_lag=values[_LOOP_LAG_US] / 1_000_000,
+                    requests=values[_REQUESTS],
+                    started_at=values[_STARTED_MS] / 1000,
+                    heartbeat_at=values[_HEARTBEAT_MS] / 1000,
+                )
+            )
+        return InstanceTotals(
+            workers=sum(worker.alive for worker in workers),
+            ready_workers=ready_workers,
+            in_flight=in_flight,
+            requests=requests,
+            statuses=dict(zip(STATUS_CLASSES, statuses, strict=True)),
+            buckets=tuple(buckets),
+            duration_sum=duration_sum_us / 1_000_000,
+            worker_stats=tuple(workers),
+        )
+
+    def render_metrics(self) -> str:
+        """インスタンス全体の合計をPrometheus形式で出力(どのワーカーが応答しても同じ値)"""
+        totals = self.totals()
+        lines = [
+            "# HELP instance_workers Number of live worker processes sharing the statistics segment.",
+            "# TYPE instance_workers gauge",
+            f"instance_workers {totals.workers}",
+            "# HELP instance_workers_ready Number of live worker processes reporting ready.",
+            "# TYPE instance_workers_ready gauge",
+            f"instance_workers_ready {totals.ready_workers}",
+            "# HELP instance_http_requests_in_flight HTTP requests being served by all workers.",
+            "# TYPE instance_http_requests_in_flight gauge",
+            f"instance_http_requests_in_flight {totals.in_flight}",
+            "# HELP instance_http_requests_total HTTP requests served by all workers.",
+            "# TYPE instance_http_requests_total counter",
+        ]
+        lines.extend(
+            f'instance_http_requests_total{{status_class="{status_class}"}} {count}'
+            for status_class, count in totals.statuses.items()
+        )
+        lines += [
+            "# HELP instance_http_request_duration_seconds HTTP request latency across all workers.",
+            "# TYPE instance_http_request_duration_seconds histogram",
+        ]
+        cumulative = 0
+        for bound, count in zip(self.buckets, totals.buckets, strict=False):
+            cumulative += count
+            lines.append(f'instance_http_request_duration_seconds_bucket{{le="{float(bound)!r}"}} {cumulative}')
+        lines += [
+            f'instance_http_request_duration_seconds_bucket{{le="+Inf"}} {totals.requests}',
+            f"instance_http_request_duration_seconds_sum {totals.duration_sum}",
+            f"instance_http_request_duration_seconds_count {totals.requests}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def release(self) -> None:
+        """スロットを解放して切断(最後のワーカーなら共有メモリとロックファイルを削除)"""
+        view = self._view
+        with _segment_lock(self.lock_path):
+            if self.slot is not None:
+                base = self._base(self.slot)
+                view[base + _PID] = 0
+                view[base + _FLAGS] = 0
+                view[base + _IN_FLIGHT] = 0
+                self.slot = None
+            now_ms = self._now_ms()
+            last = not any(
+                view[base + _PID] and (self._is_alive(base, now_ms) or _pid_alive(view[base + _PID]))
+                for base in map(self._base, range(self.slots))
+            )
+            self.close()
+            if last:
+                if sys.platform != "win32":
+                    # unlink()はresource_trackerの登録解除も行うため、登録し直してから削除する
+                    resource_tracker.register(f"/{self._shm.name}", "shared_memory")
+                with contextlib.suppress(FileNotFoundError):
+                    self._shm.unlink()
+                if self.lock_path is not None:
+                    self.lock_path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """共有メモリから切断(スロットは解放しない)"""
+        self._view.release()
+        self._shm.close()
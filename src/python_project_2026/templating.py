@@ -0,0 +1,120 @@
+"""Jinja2テンプレート環境とフラグメントのレンダリングキャッシュ"""
+
+import json
+import time
+import uuid
+from collections.abc import Callable, Mapping
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import jinja2
+
+from .tracing import span
+from .utils import ensure_directory
+
+# パッケージ内のテンプレートディレクトリ(カレントディレクトリに依存しない)
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+
+def create_environment(
+    cache_dir: Path | None = None, auto_reload: bool = False, bytecode_cache: bool | None = None
+) -> jinja2.Environment:
+    """パッケージ内テンプレートを読み込むJinja2環境を作成
+
+    Args:
+        cache_dir: コンパイル済みバイトコードの保存先
+        auto_reload: テンプレートファイルの変更を検知して再コンパイルするか
+        bytecode_cache: バイトコードを保存するか(Noneなら ``cache_dir`` 指定時のみ保存)
+    """
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(TEMPLATES_DIR),
+        autoescape=jinja2.select_autoescape(),
+    )
+    configure_environment(env, cache_dir=cache_dir, auto_reload=auto_reload, bytecode_cache=bytecode_cache)
+    return env
+
+
+def configure_environment(
+    env: jinja2.Environment, cache_dir: Path | None, auto_reload: bool, bytecode_cache: bool | None = None
+) -> None:
+    """作成済みの環境にバイトコードキャッシュと自動リロードを設定
+
+    ``cache_dir`` を指定せずにバイトコードを保存する場合は、Jinja2の既定の保存先
+    (利用者ごとに作成され、所有者とパーミッション0700を確認するディレクトリ)を使います。
+    共有の一時ディレクトリに固定の名前で保存すると、他の利用者が置いたバイトコードを
+    読み込んでしまうおそれがあるためです。
+    """
+    env.auto_reload = auto_reload
+    if bytecode_cache is None:
+        bytecode_cache = cache_dir is not None
+    if not bytecode_cache:
+        env.bytecode_cache = None
+    elif cache_dir is not None:
+        env.bytecode_cache = jinja2.FileSystemBytecodeCache(str(ensure_directory(cache_dir)))
+    else:
+        env.bytecode_cache = jinja2.FileSystemBytecodeCache()
+
+
+class FragmentRenderer:
+    """HTMLフラグメントのレンダリング結果を入力データごとにTTL付きでキャッシュ
+
+    同じデータに対する再描画はTTLの間キャッシュ済みの文字列を返します。
+    テンプレートには ``rendered_at`` (描画時刻)が追加で渡されます。
+    キャッシュには時刻の代わりに目印の文字列を埋め込んだ結果を保存し、返すたびに現在時刻へ置き換えるため、
+    TTLの間も表示される時刻は止まりません。
+    """
+
+    def __init__(
+        self,
+        env: jinja2.Environment,
+        ttl: float = 5.0,
+        maxsize: int = 256,
+        clock: Callable[[], float] = time.monotonic,
+        now: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        self.env = env
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._now = now
+        # エスケープの対象にならず、データと衝突しない描画時刻の目印(私用領域の文字で囲む)
+        self._placeholder = f"\ue000{uuid.uuid4().hex}\ue000"
+        self._entries: dict[tuple[str, str], tuple[float, str]] = {}
+
+    def render(self, name: str, context: Mapping[str, Any], cache: bool = True) -> str:
+        """フラグメントを描画(キャッシュが有効ならキャッシュを利用)"""
+        if not cache or self.ttl <= 0:
+            return self._render(name, context, self._timestamp())
+
+        key = (name, json.dumps(context, sort_keys=True, default=str))
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            self.hits += 1
+            return self._stamp(entry[1])
+
+        self.misses += 1
+        html = self._render(name, context, self._placeholder)
+        if entry is None and len(self._entries) >= self.maxsize:
+            # 最も古く登録されたエントリを破棄
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (now + self.ttl, html)
+        return self._stamp(html)
+
+    def clear(self) -> None:
+        """キャッシュを破棄"""
+        self._entries.clear()
+
+    def _timestamp(self) -> str:
+        return self._now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def _stamp(self, html: str) -> str:
+        """キャッシュした結果の目印を現在時刻に置き換える"""
+        return html.replace(self._placeholder, self._timestamp())
+
+    def _render(self, name: str, context: Mapping[str, Any], rendered_at: str) -> str:
+        with span("template", name):
+            return self.env.get_template(name).render(**context, rendered_at=rendered_at)
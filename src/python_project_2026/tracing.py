@@ -0,0 +1,431 @@
+"""リクエスト単位の軽量トレーシング(Server-Timingヘッダーとローカルファイルへの出力)"""
+
+import json
+import queue
+import random
+import re
+import threading
+import time
+from collections.abc import Callable
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import __version__
+from .metrics import route_template
+from .utils import is_warmup
+
+# OpenTelemetryのSpanKind
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# W3C Trace Contextのtraceparentヘッダー(version-trace_id-parent_id-flags)
+_TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+# Server-Timingのdescに使えない文字(ダブルクオート・バックスラッシュ・ASCII以外)
+_UNSAFE_DESC = re.compile(r'["\\]|[^\x20-\x7e]')
+
+
+class Span:
+    """計測区間"""
+
+    __slots__ = ("attributes", "description", "end", "kind", "name", "parent_id", "span_id", "start", "start_ns")
+
+    def __init__(self, name: str, description: str | None, parent_id: str | None, kind: int) -> None:
+        self.name = name
+        self.description = description
+        self.kind = kind
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attributes: dict[str, Any] = {}
+        self.start_ns = time.time_ns()
+        self.start = time.perf_counter()
+        self.end: float | None = None
+
+    def elapsed(self, now: float) -> float:
+        """所要時間(秒)。終了していなければ ``now`` までの経過時間"""
+        return (self.end if self.end is not None else now) - self.start
+
+
+class Trace:
+    """1リクエスト分の計測区間"""
+
+    __slots__ = ("finished", "spans", "trace_id")
+
+    def __init__(self, trace_id: str | None = None) -> None:
+        self.trace_id = trace_id or f"{random.getrandbits(128):032x}"
+        self.spans: list[Span] = []
+        self.finished = False
+
+
+_current_trace: ContextVar[Trace | None] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class _SpanScope:
+    """計測区間を開始・終了するコンテキストマネージャー"""
+
+    __slots__ = ("_span", "_token")
+
+    def __init__(self, trace: Trace, name: str, description: str | None, kind: int) -> None:
+        parent = _current_span.get()
+        self._span = Span(name, description, parent.span_id if parent is not None else None, kind)
+        # リクエストの完了後に終わった区間(共有している取得処理など)は記録しない
+        if not trace.finished:
+            trace.spans.append(self._span)
+
+    def __enter__(self) -> Span:
+        self._token: Token[Span | None] = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        self._span.end = time.perf_counter()
+        if exc is not None:
+            self._span.attributes["error.type"] = type(exc).__qualname__
+        _current_span.reset(self._token)
+
+
+class _NoopScope:
+    """トレース対象外のリクエストで使う何もしないコンテキストマネージャー"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        return None
+
+
+_NOOP = _NoopScope()
+
+
+def span(name: str, description: str | None = None, kind: int = SPAN_KIND_INTERNAL) -> _SpanScope | _NoopScope:
+    """現在のリクエストに計測区間を追加する(トレース対象外なら何もしない)
+
+    ``name`` はServer-Timingのメトリクス名になるため、英数字と ``.`` ``_`` ``-`` のみを使います。
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP
+    return _SpanScope(trace, name, description, kind)
+
+
+def current_trace() -> Trace | None:
+    """現在のリクエストのトレース(トレース対象外ならNone)"""
+    return _current_trace.get()
+
+
+def propagation_headers() -> dict[str, str]:
+    """外部へのHTTPリクエストに付けるtraceparentヘッダー(トレース対象外なら空)"""
+    trace = _current_trace.get()
+    parent = _current_span.get()
+    if trace is None or parent is None:
+        return {}
+    return {"traceparent": f"00-{trace.trace_id}-{parent.span_id}-01"}
+
+
+@dataclass(frozen=True)
+class TraceParent:
+    """traceparentヘッダーの内容"""
+
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+
+def parse_traceparent(value: str) -> TraceParent | None:
+    """W3C Trace Contextのtraceparentヘッダーを解析(不正な値ならNone)"""
+    value = value.strip().lower()
+    match = _TRACEPARENT.match(value)
+    # バージョンffは仕様上無効
+    if match is None or value.startswith("ff"):
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == _INVALID_TRACE_ID or span_id == _INVALID_SPAN_ID:
+        return None
+    return TraceParent(trace_id, span_id, bool(int(flags, 16) & 1))
+
+
+def server_timing(trace: Trace, now: float, limit: int = 20) -> str:
+    """計測区間をServer-Timingヘッダーの値に整形(終了していない区間は ``now`` までの経過時間)
+
+    最初の区間(リクエスト全体)以外は子の区間を除いた自己時間を出力するため、
+    入れ子になった区間(CORSとハンドラーなど)の時間が二重に数えられません。
+    並行して実行された子の区間が親より長い場合、自己時間は0になります。
+    """
+    children: dict[str, float] = {}
+    for item in trace.spans:
+        if item.parent_id is not None:
+            children[item.parent_id] = children.get(item.parent_id, 0.0) + item.elapsed(now)
+    entries = []
+    for index, item in enumerate(trace.spans[:limit]):
+        duration = item.elapsed(now)
+        if index:
+            duration = max(0.0, duration - children.get(item.span_id, 0.0))
+        entry = f"{item.name};dur={duration * 1000:.3f}"
+        if item.description:
+            entry += f';desc="{_UNSAFE_DESC.sub("?", item.description)}"'
+        entries.append(entry)
+    return ", ".join(entries)
+
+
+@dataclass(frozen=True)
+class TracingSettings:
+    """トレーシングの設定"""
+
+    # トレースするリクエストの割合(0で無効)
+    sample_rate: float = 0.0
+    # traceparentヘッダーを信頼するか(Trueなら上流のトレースを引き継ぎ、sampledフラグに従う)。
+    # クライアントが任意にトレースを強制できないよう、信頼できるプロキシの内側でのみ有効にする
+    trust_parent: bool = False
+    # トレースしたリクエストにServer-Timingヘッダーを付けるか(処理の内訳がクライアントに見える)
+    expose_server_timing: bool = False
+    # Server-Timingヘッダーに出力する区間の上限
+    server_timing_limit: int = 20
+
+    @property
+    def enabled(self) -> bool:
+        """トレーシングを有効にするか(無効ならミドルウェアを登録しない)"""
+        return self.sample_rate > 0 or self.trust_parent
+
+
+class FileSpanExporter:
+    """終了したトレースをOpenTelemetryのOTLP/JSON形式で1行ずつファイルへ追記する
+
+    OpenTelemetry Collectorの ``otlpjsonfile`` レシーバーなどでそのまま読み込めます。
+    書き込みはバックグラウンドのスレッドで行い、キューが ``max_queue`` 件に達した場合は
+    トレースを捨てて件数を数えます。
+    """
+
+    def __init__(self, path: Path, service_name: str = "python-project-2026", max_queue: int = 1000) -> None:
+        self.path = path
+        self.service_name = service_name
+        self.exported = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self._queue: queue.Queue[tuple[str, list[Span]] | threading.Event | None] = queue.Queue(max_queue)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    def export(self, trace: Trace) -> None:
+        """終了したトレースを書き込み待ちに追加"""
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait((trace.trace_id, [item for item in trace.spans if item.end is not None]))
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """書き込み待ちのトレースを書き出し終えるまで待つ
+
+        Returns:
+            時間内に書き出し終えたか
+        """
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """残りのトレースを書き出して書き込みスレッドを止める"""
+        thread = self._thread
+        if thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = [self.encode(*item) for item in batch if isinstance(item, tuple)]
+            if lines:
+                try:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    with self.path.open("a", encoding="utf-8") as file:
+                        file.write("".join(lines))
+                    self.exported += len(lines)
+                except OSError:
+                    self.write_errors += 1
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in batch:
+                return
+
+    def encode(self, trace_id: str, spans: list[Span]) -> str:
+        """1トレース分をOTLP/JSONの1行に変換"""
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _attributes({"service.name": self.service_name})},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "python_project_2026", "version": __version__},
+                            "spans": [_encode_span(trace_id, item) for item in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _attributes(values: dict[str, Any]) -> list[dict[str, Any]]:
+    encoded = []
+    for key, value in values.items():
+        if isinstance(value, bool):
+            encoded.append({"key": key, "value": {"boolValue": value}})
+        elif isinstance(value, int):
+            encoded.append({"key": key, "value": {"intValue": str(value)}})
+        elif isinstance(value, float):
+            encoded.append({"key": key, "value": {"doubleValue": value}})
+        else:
+            encoded.append({"key": key, "value": {"stringValue": str(value)}})
+    return encoded
+
+
+def _encode_span(trace_id: str, item: Span) -> dict[str, Any]:
+    attributes = dict(item.attributes)
+    if item.description:
+        attributes.setdefault("description", item.description)
+    failed = "error.type" in attributes or attributes.get("http.response.status_code", 0) >= 500
+    return {
+        "traceId": trace_id,
+        "spanId": item.span_id,
+        "parentSpanId": item.parent_id or "",
+        "name": item.name,
+        "kind": item.kind,
+        "startTimeUnixNano": str(item.start_ns),
+        "endTimeUnixNano": str(item.start_ns + int(((item.end or item.start) - item.start) * 1_000_000_000)),
+        "attributes": _attributes(attributes),
+        "status": {"code": 2 if failed else 0},
+    }
+
+
+class TracingMiddleware:
+    """サンプリングしたリクエストのトレースを開始し、設定に応じてServer-Timingヘッダーを付けるASGIミドルウェア
+
+    ミドルウェアスタックの最も外側に置きます。トレース対象外のリクエストは乱数の判定だけで通過し、
+    アプリケーション内の :func:`span` も何もしません。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        settings: TracingSettings,
+        exporter: FileSpanExporter | None = None,
+        sampler: Callable[[], float] = random.random,
+    ) -> None:
+        self.app = app
+        self.settings = settings
+        self.exporter = exporter
+        self._sampler = sampler
+
+    def _parent(self, scope: Scope) -> TraceParent | None:
+        if not self.settings.trust_parent:
+            return None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                return parse_traceparent(value.decode("latin-1"))
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or is_warmup(scope):
+            await self.app(scope, receive, send)
+            return
+        parent = self._parent(scope)
+        sampled = parent.sampled if parent is not None else self._sampler() < self.settings.sample_rate
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(parent.trace_id if parent is not None else None)
+        root = Span("app", None, parent.span_id if parent is not None else None, SPAN_KIND_SERVER)
+        trace.spans.append(root)
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(root)
+        status = 500
+
+        expose_server_timing = self.settings.expose_server_timing
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if not expose_server_timing:
+                    await send(message)
+                    return
+                headers = MutableHeaders(raw=list(message["headers"]))
+                headers.append(
+                    "Server-Timing", server_timing(trace, time.perf_counter(), self.settings.server_timing_limit)
+                )
+                message = {**message, "headers": headers.raw}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            root.end = time.perf_counter()
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            trace.finished = True
+            route = route_template(scope)
+            root.description = route
+            root.attributes.update(
+                {
+                    "http.request.method": scope["method"],
+                    "url.path": scope["path"],
+                    "http.route": route,
+                    "http.response.status_code": status,
+                }
+            )
+            if self.exporter is not None:
+                self.exporter.export(trace)
+
+
+class SpanMiddleware:
+    """内側のASGIアプリケーション(ミドルウェアやルーター)の処理を1つの計測区間として記録する"""
+
+    def __init__(self, app: ASGIApp, name: str) -> None:
+        self.app = app
+        self.name = name
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or _current_trace.get() is None:
+            await self.app(scope, receive, send)
+            return
+        with span(self.name):
+            await self.app(scope, receive, send)
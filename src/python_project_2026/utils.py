@@ -1,8 +1,22 @@
 """ユーティリティ関数"""
 
+import os
+import re
+from bisect import bisect_right
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from functools import cache, lru_cache
 from pathlib import Path
 from typing import Any
 
+# 起動時のウォームアップで送る合成リクエストであることを示すASGIスコープのキー
+WARMUP_SCOPE_KEY = "python_project_2026.warmup"
+
+
+def is_warmup(scope: Mapping[str, Any]) -> bool:
+    """ウォームアップの合成リクエストか(メトリクス・アクセスログ・受付制御などの対象外)"""
+    return bool(scope.get(WARMUP_SCOPE_KEY))
+
 
 def ensure_directory(path: Path) -> Path:
     """ディレクトリが存在することを確認し、必要に応じて作成"""
@@ -10,21 +24,203 @@ def ensure_directory(path: Path) -> Path:
     return path
 
 
+def default_workers() -> int:
+    """このプロセスが利用できるCPU数(CPUアフィニティを考慮)"""
+    if hasattr(os, "process_cpu_count"):
+        return os.process_cpu_count() or 1
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# 単位系 -> (基数, 単位名)
+SIZE_UNITS: dict[str, tuple[int, tuple[str, ...]]] = {
+    "binary": (1024, ("B", "KB", "MB", "GB", "TB")),
+    "iec": (1024, ("B", "KiB", "MiB", "GiB", "TiB")),
+    "si": (1000, ("B", "kB", "MB", "GB", "TB")),
+}
+
+
+@dataclass(frozen=True)
+class _SizeUnits:
+    """単位系ごとの事前計算済みの表"""
+
+    base: int
+    names: tuple[str, ...]
+    # 2のべき乗での除算は誤差なく、繰り返し除算する場合と同じ値になる
+    divisors: tuple[float, ...]
+    thresholds: tuple[int, ...]
+
+    def index(self, size: float) -> int:
+        """サイズに対応する単位の位置(ループではなくビット長または二分探索で求める)"""
+        if size < self.base:
+            return 0
+        if self.base == 1024 and isinstance(size, int):
+            # 1024 = 2**10 なので、ビット長から単位を直接求める
+            return min((size.bit_length() - 1) // 10, len(self.names) - 1)
+        return bisect_right(self.thresholds, size)
+
+
+@cache
+def _size_units(units: str) -> _SizeUnits:
+    """単位系の表を作成(単位系ごとに1回だけ)"""
+    try:
+        base, names = SIZE_UNITS[units]
+    except KeyError:
+        raise ValueError(f"units must be one of {', '.join(SIZE_UNITS)}") from None
+    return _SizeUnits(
+        base=base,
+        names=names,
+        divisors=tuple(float(base**i) for i in range(len(names))),
+        thresholds=tuple(base**i for i in range(1, len(names))),
+    )
+
+
+_BINARY_UNITS = _size_units("binary")
+
+
 def format_size(size_bytes: int) -> str:
     """バイト数を人間が読みやすい形式に変換"""
     if size_bytes == 0:
         return "0B"
+    index = _BINARY_UNITS.index(size_bytes)
+    return f"{size_bytes / _BINARY_UNITS.divisors[index]:.1f}{_BINARY_UNITS.names[index]}"
 
-    size_names = ["B", "KB", "MB", "GB", "TB"]
-    i = 0
-    size_float = float(size_bytes)
-    while size_float >= 1024.0 and i < len(size_names) - 1:
-        size_float /= 1024.0
-        i += 1
 
-    return f"{size_float:.1f}{size_names[i]}"
+def format_sizes(
+    sizes: Iterable[float] | Any,
+    units: str = "binary",
+    precision: int = 1,
+    memoize: bool = False,
+) -> list[str]:
+    """複数のバイト数をまとめて変換
+
+    ``units="binary"`` と ``precision=1`` (デフォルト)では :func:`format_size` と同じ文字列を返します。
+
+    Args:
+        sizes: バイト数の反復可能オブジェクト、またはNumPy配列など ``tolist()`` を持つ配列
+        units: 単位系("binary": 1024単位のKB表記、"iec": KiB表記、"si": 1000単位のkB表記)
+        precision: 小数点以下の桁数
+        memoize: 同じ値の変換結果を再利用するか(同じサイズが多く含まれる場合に有効)
+
+    Raises:
+        ValueError: 不明な単位系の場合
+    """
+    table = _size_units(units)
+    base, divisors, thresholds = table.base, table.divisors, table.thresholds
+    last = len(table.names) - 1
+    binary = base == 1024
+    # 単位ごとの書式を事前に作成し、ループ内では数値の書式化だけを行う(%書式が最も速い)
+    templates = [f"%.{precision}f{name}" for name in table.names]
+    if hasattr(sizes, "tolist"):
+        # NumPyのスカラーを1件ずつ変換するより、Pythonの数値のリストにまとめて変換する方が速い
+        sizes = sizes.tolist()
+
+    memo: dict[float, str] | None = {} if memoize else None
+    results: list[str] = []
+    append = results.append
+    for size in sizes:
+        if memo is not None and (text := memo.get(size)) is not None:
+            append(text)
+            continue
+        if size == 0:
+            text = "0B"
+        else:
+            # _SizeUnits.index と同じ処理(呼び出しのオーバーヘッドを避けるため展開)
+            if size < base:
+                index = 0
+            elif binary and type(size) is int:
+                index = min((size.bit_length() - 1) // 10, last)
+            else:
+                index = bisect_right(thresholds, size)
+            text = templates[index] % (size / divisors[index])
+        if memo is not None:
+            memo[size] = text
+        append(text)
+    return results
 
 
 def safe_get(data: dict[str, Any], key: str, default: Any = None) -> Any:
     """辞書から安全にキーを取得"""
     return data.get(key, default)
+
+
+# パス式の要素: 名前(a)、添字([0])、引用符付きのキー(["a.b"])
+_PATH_NAME = re.compile(r"[^.\[\]]+")
+_PATH_BRACKET = re.compile(r"""\[(?:(-?\d+)|"([^"]*)"|'([^']*)')\]""")
+
+
+class PathGetter:
+    """解析済みのパス式でネストしたデータから値を取り出すアクセサー
+
+    :func:`compile_path` で作成します。途中の要素が存在しない、または型が合わない場合は
+    デフォルト値を返します(値として ``None`` が格納されている場合は ``None`` を返します)。
+    """
+
+    __slots__ = ("keys", "path")
+
+    def __init__(self, path: str, keys: tuple[str | int, ...]) -> None:
+        self.path = path
+        self.keys = keys
+
+    def __repr__(self) -> str:
+        return f"PathGetter({self.path!r})"
+
+    def __call__(self, data: Any, default: Any = None) -> Any:
+        try:
+            for key in self.keys:
+                data = data[key]
+        except (KeyError, IndexError, TypeError):
+            return default
+        return data
+
+
+@lru_cache(maxsize=1024)
+def compile_path(path: str) -> PathGetter:
+    """``"a.b[0].c"`` 形式のパス式を解析してアクセサーを作成(同じパス式は再利用)
+
+    Raises:
+        ValueError: パス式の構文が不正な場合
+    """
+    keys: list[str | int] = []
+    pos = 0
+    while pos < len(path):
+        if pos == 0 or path[pos] == ".":
+            start = pos + (pos > 0)
+            if (name := _PATH_NAME.match(path, start)) is not None:
+                keys.append(name.group())
+                pos = name.end()
+                continue
+        if (bracket := _PATH_BRACKET.match(path, pos)) is not None:
+            index, double_quoted, single_quoted = bracket.groups()
+            keys.append(int(index) if index is not None else double_quoted or single_quoted or "")
+            pos = bracket.end()
+            continue
+        raise ValueError(f"invalid path expression {path!r} at position {pos}")
+    if not keys:
+        raise ValueError("path expression must not be empty")
+    return PathGetter(path, tuple(keys))
+
+
+def get_path(data: Any, path: str, default: Any = None) -> Any:
+    """パス式でネストしたデータから値を取得(:func:`safe_get` の複数階層版)"""
+    return compile_path(path)(data, default)
+
+
+def pick_paths(data: Any, fields: Mapping[str, str], default: Any = None) -> dict[str, Any]:
+    """複数のパス式の値を取り出して 名前 -> 値 の辞書にする"""
+    return {name: compile_path(path)(data, default) for name, path in fields.items()}
+
+
+def extract_paths(rows: Iterable[Any], fields: Mapping[str, str], default: Any = None) -> list[dict[str, Any]]:
+    """レコードの一覧から複数のフィールドを1回の走査でまとめて取り出す
+
+    パス式の解析はフィールドごとに1回だけ行います。
+
+    Args:
+        rows: 辞書などのレコードの反復可能オブジェクト
+        fields: 出力の名前 -> パス式
+        default: 値が存在しない場合の値
+    """
+    getters = [(name, compile_path(path)) for name, path in fields.items()]
+    return [{name: getter(row, default) for name, getter in getters} for row in rows]
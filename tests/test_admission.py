@@ -0,0 +1,222 @@
+"""admission.pyのテスト"""
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from python_project_2026.admission import (
+    AdmissionMiddleware,
+    AdmissionSettings,
+    AdmissionStats,
+    ClientBuckets,
+    TokenBucket,
+    is_exempt,
+)
+from python_project_2026.loop_monitor import LoopLagMonitor
+
+
+class FakeClock:
+    """テスト用の手動で進める時計"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _create_app(settings: AdmissionSettings, monitor: LoopLagMonitor | None = None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work() -> dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/health")
+    async def health() -> dict[str, str]:
+        return {"status": "healthy"}
+
+    app.add_middleware(AdmissionMiddleware, settings=settings, monitor=monitor)
+    return app
+
+
+class TestTokenBucket:
+    """TokenBucketのテスト"""
+
+    def test_burst_then_refill(self) -> None:
+        """バースト分を使い切った後は補充された分だけ受け付けることをテスト"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, burst=3, clock=clock)
+        assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert bucket.acquire() == pytest.approx(0.5)
+
+        clock.now = 0.5
+        assert bucket.acquire() == 0.0
+        assert bucket.acquire() > 0
+
+    def test_tokens_do_not_exceed_burst(self) -> None:
+        """長時間経過してもトークンがburstを超えて貯まらないことをテスト"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10.0, burst=2, clock=clock)
+        clock.now = 100.0
+        assert [bucket.acquire() == 0.0 for _ in range(3)] == [True, True, False]
+
+
+class TestClientBuckets:
+    """ClientBucketsのテスト"""
+
+    def test_limits_each_client_separately(self) -> None:
+        """クライアントごとに独立して制限されることをテスト"""
+        buckets = ClientBuckets(rate=1.0, burst=1, clock=FakeClock())
+        assert buckets.acquire("a") == 0.0
+        assert buckets.acquire("a") > 0
+        assert buckets.acquire("b") == 0.0
+
+    def test_evicts_least_recently_used(self) -> None:
+        """保持数の上限を超えると最も使われていないクライアントを破棄することをテスト"""
+        buckets = ClientBuckets(rate=1.0, burst=1, max_clients=2, clock=FakeClock())
+        buckets.acquire("a")
+        buckets.acquire("b")
+        buckets.acquire("a")
+        buckets.acquire("c")
+        assert len(buckets) == 2
+        # bが破棄されたため新しいバケットで受け付けられる
+        assert buckets.acquire("b") == 0.0
+        assert buckets.acquire("c") > 0
+
+
+def test_is_exempt() -> None:
+    """対象外パスの判定をテスト"""
+    assert is_exempt("/health", ("/health",))
+    assert is_exempt("/health/ready", ("/health",))
+    assert not is_exempt("/health-check", ("/health",))
+    assert not is_exempt("/api/", ("/health",))
+
+
+class TestAdmissionSettings:
+    """AdmissionSettingsのテスト"""
+
+    def test_disabled_by_default(self) -> None:
+        """デフォルトではすべての制限が無効であることをテスト"""
+        assert AdmissionSettings().enabled is False
+        assert AdmissionSettings(max_in_flight=1).enabled is True
+
+
+class TestAdmissionMiddleware:
+    """AdmissionMiddlewareのテスト"""
+
+    def test_rate_limit_returns_429_with_retry_after(self) -> None:
+        """レート制限を超えると429とRetry-Afterを返すことをテスト"""
+        client = TestClient(_create_app(AdmissionSettings(rate_limit=0.1, burst=2)))
+        assert [client.get("/work").status_code for _ in range(2)] == [200, 200]
+
+        response = client.get("/work")
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "10"
+        assert response.json() == {"detail": "Rate limit exceeded"}
+
+    def test_exempt_paths_are_not_limited(self) -> None:
+        """/healthはレート制限の対象外であることをテスト"""
+        client = TestClient(_create_app(AdmissionSettings(rate_limit=0.1, burst=1)))
+        assert client.get("/work").status_code == 200
+        assert client.get("/work").status_code == 429
+        assert all(client.get("/health").status_code == 200 for _ in range(5))
+
+    def test_per_client_rate_limit(self) -> None:
+        """クライアントごとのレート制限をテスト"""
+        app = _create_app(AdmissionSettings(rate_limit=0.1, burst=1, per_client=True))
+        first = TestClient(app, client=("10.0.0.1", 1234))
+        second = TestClient(app, client=("10.0.0.2", 1234))
+        assert first.get("/work").status_code == 200
+        assert first.get("/work").status_code == 429
+        assert second.get("/work").status_code == 200
+
+    def test_loop_lag_returns_503(self) -> None:
+        """イベントループの遅延が閾値を超えている間は503を返すことをテスト"""
+        monitor = LoopLagMonitor(interval=60)
+        client = TestClient(_create_app(AdmissionSettings(max_loop_lag=0.5), monitor))
+        assert client.get("/work").status_code == 200
+
+        monitor.record(2.2)
+        response = client.get("/work")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "3"
+        assert client.get("/health").status_code == 200
+
+        monitor.record(0.0)
+        assert client.get("/work").status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_max_in_flight_returns_503(self) -> None:
+        """処理中のリクエストが上限に達すると503を返すことをテスト"""
+        release = asyncio.Event()
+        started = asyncio.Event()
+        app = FastAPI()
+
+        @app.get("/slow")
+        async def slow() -> dict[str, str]:
+            started.set()
+            await release.wait()
+            return {"status": "ok"}
+
+        app.add_middleware(AdmissionMiddleware, settings=AdmissionSettings(max_in_flight=1))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            pending = asyncio.create_task(client.get("/slow"))
+            await started.wait()
+
+            rejected = await client.get("/slow")
+            assert rejected.status_code == 503
+            assert rejected.headers["retry-after"] == "1"
+
+            release.set()
+            assert (await pending).status_code == 200
+            assert (await client.get("/slow")).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_event_stream_not_counted(self) -> None:
+        """SSEはレスポンス開始後に処理中の件数から外れることをテスト"""
+        release = asyncio.Event()
+        started = asyncio.Event()
+        app = FastAPI()
+
+        @app.get("/events")
+        async def events() -> StreamingResponse:
+            async def stream() -> AsyncIterator[bytes]:
+                started.set()
+                yield b"data: hello\n\n"
+                await release.wait()
+
+            return StreamingResponse(stream(), media_type="text/event-stream")
+
+        @app.get("/work")
+        async def work() -> dict[str, str]:
+            return {"status": "ok"}
+
+        stats = AdmissionStats()
+        app.add_middleware(AdmissionMiddleware, settings=AdmissionSettings(max_in_flight=1), stats=stats)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            pending = asyncio.create_task(client.get("/events"))
+            await started.wait()
+            await asyncio.sleep(0)
+
+            assert stats.in_flight == 0
+            assert (await client.get("/work")).status_code == 200
+            release.set()
+            assert (await pending).status_code == 200
+        assert stats.in_flight == 0
+
+    def test_rejected_metrics(self) -> None:
+        """断った件数がPrometheus形式で出力されることをテスト"""
+        stats = AdmissionStats()
+        stats.rejected["rate_limit"] = 2
+        text = stats.render_metrics()
+        assert 'http_requests_rejected_total{reason="rate_limit"} 2' in text
+        assert 'http_requests_rejected_total{reason="in_flight"} 0' in text
+        assert "http_requests_admitted_in_flight 0" in text
@@ -1,13 +1,17 @@
 """FastAPI APIテスト"""
 
+import asyncio
+import json
 import os
+from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
 
-from python_project_2026 import __version__
+from python_project_2026 import __version__, api
 from python_project_2026.api import app
+from python_project_2026.routers import hello
 
 
 class TestAPI:
@@ -26,6 +30,26 @@ class TestAPI:
         assert "HTMX Demo" in response.text
         assert "Python Project 2026" in response.text
 
+    def test_index_uses_fingerprinted_static_urls(self, client: TestClient) -> None:
+        """ホームページがフィンガープリント付きの静的ファイルURLを参照することをテスト"""
+        response = client.get("/")
+        assert "/static/css/style.css" not in response.text
+        hashed = response.text.split('href="http://testserver/static/css/', 1)[1].split('"', 1)[0]
+        assert hashed.startswith("style.")
+
+        asset = client.get(f"/static/css/{hashed}", headers={"Accept-Encoding": "gzip"})
+        assert asset.status_code == 200
+        assert "immutable" in asset.headers["cache-control"]
+
+    def test_pages_are_compressed(self, client: TestClient) -> None:
+        """HTMLページはgzipで圧縮され、小さなJSONは圧縮されないことをテスト"""
+        page = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert page.headers["content-encoding"] == "gzip"
+        assert "HTMX Demo" in page.text
+
+        health = client.get("/health", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in health.headers
+
     def test_api_root_endpoint(self, client: TestClient) -> None:
         """APIルートエンドポイントのテスト"""
         response = client.get("/api/")
@@ -44,6 +68,27 @@ class TestAPI:
         assert data["status"] == "healthy"
         assert data["version"] == __version__
 
+    @pytest.mark.parametrize("path", ["/api/", "/health"])
+    def test_precomputed_endpoint_etag(self, client: TestClient, path: str) -> None:
+        """事前計算済みエンドポイントがETagと304を返すことをテスト"""
+        response = client.get(path)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        etag = response.headers["etag"]
+        assert etag.startswith('"')
+
+        not_modified = client.get(path, headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert not_modified.headers["etag"] == etag
+
+        weak = client.get(path, headers={"If-None-Match": f'"other", W/{etag}'})
+        assert weak.status_code == 304
+
+        changed = client.get(path, headers={"If-None-Match": '"stale"'})
+        assert changed.status_code == 200
+        assert changed.content == response.content
+
     def test_hello_endpoint_default(self, client: TestClient) -> None:
         """挨拶エンドポイントのテスト(デフォルト)"""
         response = client.get("/api/hello")
@@ -77,6 +122,67 @@ class TestAPI:
         assert data["message"] == expected_message
         assert data["name"] == name
 
+    def test_hello_batch_json_array(self, client: TestClient) -> None:
+        """JSON配列での一括挨拶をテスト"""
+        response = client.post("/api/hello/batch", json=["太郎", {"name": "花子"}])
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert records == [
+            {"message": "こんにちは、太郎!", "name": "太郎"},
+            {"message": "こんにちは、花子!", "name": "花子"},
+        ]
+
+    def test_hello_batch_ndjson(self, client: TestClient) -> None:
+        """NDJSONでの一括挨拶をテスト"""
+        names = [f"user{i}" for i in range(250)]
+        body = "\n".join(json.dumps(name) for name in names)
+        response = client.post(
+            "/api/hello/batch", content=body.encode(), headers={"Content-Type": "application/x-ndjson"}
+        )
+        assert response.status_code == 200
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [record["name"] for record in records] == names
+
+    def test_hello_batch_invalid_item(self, client: TestClient) -> None:
+        """不正な要素はエラー行になり処理が継続することをテスト"""
+        response = client.post("/api/hello/batch", json=["a", 1, "b"])
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert records[1] == {"error": "invalid item", "index": 1}
+        assert records[2]["name"] == "b"
+
+    def test_hello_batch_invalid_body(self, client: TestClient) -> None:
+        """不正なJSONはエラー行で終了することをテスト"""
+        response = client.post("/api/hello/batch", content=b'["a", oops]', headers={"Content-Type": "application/json"})
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert records[0]["name"] == "a"
+        assert records[-1]["error"] == "invalid request body"
+
+    def test_hello_batch_size_limit(self, client: TestClient) -> None:
+        """最大件数を超えるとエラー行で打ち切ることをテスト"""
+        original = app.state.hello_batch_settings
+        app.state.hello_batch_settings = hello.BatchSettings(max_size=2, flush_size=1)
+        try:
+            response = client.post("/api/hello/batch", json=["a", "b", "c", "d"])
+        finally:
+            app.state.hello_batch_settings = original
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [record.get("name") for record in records[:2]] == ["a", "b"]
+        assert records[2] == {"error": "batch size limit exceeded", "limit": 2}
+        assert len(records) == 3
+
+    def test_hello_batch_item_too_large(self, client: TestClient) -> None:
+        """上限を超える要素はエラー行で打ち切ることをテスト"""
+        original = app.state.hello_batch_settings
+        app.state.hello_batch_settings = hello.BatchSettings(max_item_size=10)
+        try:
+            response = client.post("/api/hello/batch", json=["a", "x" * 100, "b"])
+        finally:
+            app.state.hello_batch_settings = original
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert records[0]["name"] == "a"
+        assert records[-1] == {"error": "item too large", "limit": 10, "index": 1}
+
     def test_version_endpoint(self, client: TestClient) -> None:
         """バージョンエンドポイントのテスト"""
         response = client.get("/api/version")
@@ -90,6 +196,219 @@ class TestAPI:
         assert len(parts) == 3
         assert all(part.isdigit() for part in parts)
 
+    def test_api_info_fragment(self, client: TestClient) -> None:
+        """API情報フラグメントがループバック通信なしで取得できることをテスト"""
+        response = client.get("/api-info")
+        assert response.status_code == 200
+        assert "text/html" in response.headers.get("content-type", "")
+        assert "Python Project 2026 API" in response.text
+        assert __version__ in response.text
+        assert "エラー" not in response.text
+
+    def test_health_check_fragment(self, client: TestClient) -> None:
+        """ヘルスチェックフラグメントがループバック通信なしで取得できることをテスト"""
+        response = client.get("/health-check")
+        assert response.status_code == 200
+        assert "HEALTHY" in response.text
+        assert "UNHEALTHY" not in response.text
+
+    def test_fragment_data_is_shared_between_requests(self, client: TestClient) -> None:
+        """短時間の連続したリクエストではデータ取得が1回にまとめられることをテスト"""
+
+        class CountingProvider:
+            calls = 0
+
+            async def api_info(self) -> dict[str, str]:
+                CountingProvider.calls += 1
+                return {"message": "counted", "version": __version__}
+
+            async def health(self) -> dict[str, str]:
+                return {"status": "healthy"}
+
+        original = app.state.data_provider
+        app.state.data_provider = CountingProvider()
+        try:
+            for _ in range(3):
+                assert "counted" in client.get("/api-info").text
+        finally:
+            app.state.data_provider = original
+        assert CountingProvider.calls == 1
+
+    def test_health_check_fragment_provider_error(self, client: TestClient) -> None:
+        """データ取得失敗時にエラーフラグメントを返すことをテスト"""
+
+        class FailingProvider:
+            async def api_info(self) -> dict[str, str]:
+                raise RuntimeError("upstream down")
+
+            async def health(self) -> dict[str, str]:
+                raise RuntimeError("upstream down")
+
+        original = app.state.data_provider
+        app.state.data_provider = FailingProvider()
+        try:
+            response = client.get("/health-check")
+        finally:
+            app.state.data_provider = original
+        assert response.status_code == 200
+        assert "UNHEALTHY" in response.text
+        assert "upstream down" in response.text
+
+    def test_health_check_stream(self, client: TestClient) -> None:
+        """ヘルスチェックがServer-Sent Eventsで配信されることをテスト"""
+
+        class FiniteBroadcaster:
+            interval = 5.0
+            latest = "<p>latest</p>"
+
+            def __init__(self) -> None:
+                self.unsubscribed = False
+
+            def subscribe(self) -> asyncio.Queue[str | None]:
+                queue: asyncio.Queue[str | None] = asyncio.Queue()
+                queue.put_nowait("<p>next</p>")
+                queue.put_nowait(None)
+                return queue
+
+            def unsubscribe(self, _queue: asyncio.Queue[str | None]) -> None:
+                self.unsubscribed = True
+
+        original = app.state.health_broadcaster
+        broadcaster = FiniteBroadcaster()
+        app.state.health_broadcaster = broadcaster
+        try:
+            response = client.get("/health-check/stream")
+        finally:
+            app.state.health_broadcaster = original
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text == "event: health\ndata: <p>latest</p>\n\nevent: health\ndata: <p>next</p>\n\n"
+        assert broadcaster.unsubscribed
+
+    def test_health_check_stream_subscriber_limit(self, client: TestClient) -> None:
+        """購読者数の上限に達した場合は503を返すことをテスト"""
+        broadcaster = app.state.health_broadcaster
+        original_limit = broadcaster.max_subscribers
+        broadcaster.max_subscribers = 0
+        try:
+            response = client.get("/health-check/stream")
+        finally:
+            broadcaster.max_subscribers = original_limit
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
+
+    def test_http_pool_stats_with_lifespan(self) -> None:
+        """lifespan中は共有HTTPクライアントのプール統計を返すことをテスト"""
+        with TestClient(app) as client:
+            response = client.get("/health/http-pool")
+            assert response.status_code == 200
+            data = response.json()
+            assert data["connections"] == 0
+            assert data["waiting"] == 0
+            assert data["max_connections"] > 0
+        assert app.state.http_client is None
+
+    def test_health_live(self, client: TestClient) -> None:
+        """Livenessプローブをテスト"""
+        response = client.get("/health/live")
+        assert response.status_code == 200
+        assert response.json() == {"status": "alive"}
+
+    def test_health_ready_with_lifespan(self) -> None:
+        """lifespan中はReady、終了時にNot Readyへ戻ることをテスト"""
+        with TestClient(app) as client:
+            response = client.get("/health/ready")
+            assert response.status_code == 200
+            data = response.json()
+            assert data["status"] == "ready"
+            assert data["warmed_up"] is True
+            assert {"loop_lag", "in_flight", "pool_utilization"} <= data.keys()
+        assert app.state.health_monitor.readiness()[0] == 503
+
+    def test_readiness_in_flight_from_admission(self) -> None:
+        """Readinessの処理中件数はメトリクスではなく受付制御の集計から取ることをテスト"""
+        admission_stats = app.state.admission_stats
+        admission_stats.in_flight += 2
+        try:
+            assert app.state.health_monitor.refresh().in_flight == 2
+        finally:
+            admission_stats.in_flight -= 2
+            app.state.health_monitor.refresh()
+
+    def test_health_instance_with_lifespan(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """lifespan中は共有メモリから全ワーカーの合計を返し、終了時にスロットを解放することをテスト"""
+        monkeypatch.setattr(api, "SHARED_STATS_NAME", f"pp2026-test-api-{os.getpid()}")
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+        with TestClient(app) as client:
+            client.get("/api/version")
+            response = client.get("/health/instance")
+            assert response.status_code == 200
+            assert response.headers["cache-control"] == "no-store"
+            data = response.json()
+            assert data["workers"] == 1
+            assert data["ready_workers"] == 1
+            assert data["requests"] >= 1
+            assert data["statuses"]["2xx"] >= 1
+            assert [worker["pid"] for worker in data["worker_stats"]] == [os.getpid()]
+            assert "instance_http_requests_total" in client.get("/metrics").text
+        assert app.state.shared_stats is None
+
+    def test_shared_stats_disabled_without_name(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """共有メモリの名前が設定されていなければワーカー間の集計を行わないことをテスト"""
+        monkeypatch.setattr(api, "SHARED_STATS_NAME", "")
+        with TestClient(app):
+            assert app.state.shared_stats is None
+
+    def test_health_instance_without_lifespan(self, client: TestClient) -> None:
+        """共有メモリ未接続時は503を返すことをテスト"""
+        assert client.get("/health/instance").status_code == 503
+        assert "instance_workers" not in client.get("/metrics").text
+
+    def test_health_ready_without_lifespan(self, client: TestClient) -> None:
+        """lifespan開始前はウォームアップ中としてNot Readyを返すことをテスト"""
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["reasons"] == ["warming_up"]
+
+    def test_health_ready_while_shutting_down(self) -> None:
+        """終了処理を始めるとウォームアップ中ではなく終了処理中としてNot Readyを返すことをテスト"""
+        with TestClient(app) as client:
+            assert client.get("/health/ready").status_code == 200
+            client.portal.call(api.begin_shutdown, app)
+            response = client.get("/health/ready")
+            assert response.status_code == 503
+            assert response.json()["reasons"] == ["shutting_down"]
+
+    def test_http_pool_stats_without_lifespan(self, client: TestClient) -> None:
+        """共有HTTPクライアント未作成時は503を返すことをテスト"""
+        response = client.get("/health/http-pool")
+        assert response.status_code == 503
+
+    def test_metrics_uses_route_templates(self, client: TestClient) -> None:
+        """メトリクスがルートテンプレート単位で集計されることをテスト"""
+        client.get("/api/hello", params={"name": "metrics"})
+        client.get("/no-such-path")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        assert 'http_requests_total{method="GET",route="/api/hello",status="200"}' in body
+        assert 'route="<unmatched>",status="404"' in body
+        assert "name=metrics" not in body
+        assert "http_request_duration_seconds_bucket" in body
+
+    def test_metrics_include_log_counters(self, client: TestClient) -> None:
+        """メトリクスにログの書き出し・破棄件数が含まれることをテスト"""
+        body = client.get("/metrics").text
+        assert "log_records_written_total" in body
+        assert 'log_records_dropped_total{level="warning"}' in body
+
+    def test_profiling_disabled_in_production(self, client: TestClient) -> None:
+        """本番環境ではプロファイリングが無効なことをテスト"""
+        assert client.get("/debug/profile").status_code == 404
+        response = client.get("/health", headers={"X-Profile": "cumulative"})
+        assert response.json()["status"] == "healthy"
+
     def test_openapi_docs_not_accessible_in_production(self, client: TestClient) -> None:
         """本番環境でOpenAPIドキュメントにアクセスできないことをテスト"""
         response = client.get("/docs")
@@ -205,6 +524,93 @@ class TestEnvironmentConfiguration:
         assert "environment" in data
         assert data["environment"] in ["production", "development", "dev", "local"]
 
+    def test_data_provider_defaults_to_local(self) -> None:
+        """API_BASE_URL未設定時は同一プロセス内のプロバイダーを使うことを確認"""
+        with patch.dict(os.environ, {}, clear=True):
+            import importlib
+
+            from python_project_2026 import api
+            from python_project_2026.providers import LocalDataProvider
+
+            importlib.reload(api)
+
+            assert isinstance(api.app.state.data_provider, LocalDataProvider)
+
+    def test_data_provider_http_opt_in(self) -> None:
+        """API_BASE_URL設定時はHTTP経由のプロバイダーを使うことを確認"""
+        with patch.dict(os.environ, {"API_BASE_URL": "http://api.internal:9000/"}, clear=True):
+            import importlib
+
+            from python_project_2026 import api
+            from python_project_2026.providers import HttpDataProvider
+
+            importlib.reload(api)
+
+            assert isinstance(api.app.state.data_provider, HttpDataProvider)
+            assert api.app.state.data_provider.base_url == "http://api.internal:9000"
+
+            # lifespan中は共有HTTPクライアントを使うプロバイダーに差し替わる
+            with TestClient(api.app):
+                assert api.app.state.data_provider._client is api.app.state.http_client
+            assert api.app.state.data_provider._client is None
+
+    def test_replacing_data_provider_clears_data_cache(self) -> None:
+        """プロバイダーを差し替えると古いプロバイダーのキャッシュを破棄することをテスト"""
+        from python_project_2026 import api
+        from python_project_2026.routers import web
+
+        original = api.app.state.data_provider
+        web.data_cache._entries[(original, "api_info")] = object()  # type: ignore[assignment]
+        try:
+            api.use_data_provider(api.app, original)
+            assert not web.data_cache._entries
+        finally:
+            api.app.state.data_provider = original
+
+    def test_http_client_settings_from_environment(self) -> None:
+        """コネクションプール設定を環境変数から読み込むことを確認"""
+        env = {
+            "HTTP_POOL_MAX_CONNECTIONS": "8",
+            "HTTP_POOL_MAX_KEEPALIVE": "4",
+            "HTTP_POOL_KEEPALIVE_EXPIRY": "30",
+            "HTTP_TIMEOUT": "1.5",
+            "HTTP2": "true",
+        }
+        with patch.dict(os.environ, env, clear=True):
+            import importlib
+
+            from python_project_2026 import api
+
+            importlib.reload(api)
+
+            settings = api.HTTP_CLIENT_SETTINGS
+            assert settings.max_connections == 8
+            assert settings.max_keepalive_connections == 4
+            assert settings.keepalive_expiry == 30.0
+            assert settings.timeout == 1.5
+            assert settings.http2 is True
+
+    def test_admission_settings_from_environment(self) -> None:
+        """受付制御の設定を環境変数から読み込むことを確認"""
+        env = {
+            "RATE_LIMIT_RPS": "50",
+            "RATE_LIMIT_BURST": "100",
+            "RATE_LIMIT_PER_CLIENT": "true",
+            "MAX_LOOP_LAG": "0.5",
+        }
+        with patch.dict(os.environ, env, clear=True):
+            import importlib
+
+            from python_project_2026 import api
+
+            importlib.reload(api)
+
+            settings = api.ADMISSION_SETTINGS
+            assert (settings.rate_limit, settings.burst, settings.per_client) == (50.0, 100, True)
+            assert settings.max_in_flight == 0
+            assert settings.max_loop_lag == 0.5
+            assert settings.enabled is True
+
     def test_openapi_docs_accessible_in_development(self) -> None:
         """開発環境でOpenAPIドキュメントにアクセス可能であることをテスト"""
         with patch.dict(os.environ, {"ENVIRONMENT": "development"}, clear=True):
@@ -235,3 +641,60 @@ class TestEnvironmentConfiguration:
             data = response.json()
             assert data["info"]["title"] == "Python Project 2026 API"
             assert "version" in data["info"]
+            assert "/metrics" not in data["paths"]
+
+    def test_invalid_log_settings_fall_back(self) -> None:
+        """LOG_LEVELとACCESS_LOG_SAMPLE_RATEが不正でも起動は止めず、既定値を使うことをテスト"""
+        for env in ({"LOG_LEVEL": "verbose"}, {"ACCESS_LOG_SAMPLE_RATE": "-1"}, {"ACCESS_LOG_SAMPLE_RATE": "often"}):
+            with patch.dict(os.environ, env, clear=True):
+                import importlib
+
+                from python_project_2026 import api
+
+                importlib.reload(api)
+
+                assert api.log.level == "info"
+                assert api.log.sample_rate == 10
+
+    def test_tracing_server_timing(self, tmp_path: Path) -> None:
+        """TRACE_SAMPLE_RATE設定時はCORS・ハンドラー・データ取得・テンプレート描画の区間を返すことをテスト"""
+        export_path = tmp_path / "spans.jsonl"
+        env = {
+            "TRACE_SAMPLE_RATE": "1",
+            "TRACE_SERVER_TIMING": "true",
+            "TRACE_EXPORT_PATH": str(export_path),
+            "FRAGMENT_CACHE_TTL": "0",
+        }
+        with patch.dict(os.environ, env, clear=True):
+            import importlib
+
+            from python_project_2026 import api
+
+            importlib.reload(api)
+
+            with TestClient(api.app) as client:
+                response = client.get("/api-info")
+            names = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+            assert names[:3] == ["app", "cors", "handler"]
+            assert {"data", "template"} <= set(names)
+            assert export_path.exists()
+
+    def test_profiling_enabled_with_token(self) -> None:
+        """PROFILING_TOKEN設定時は本番環境でもトークン付きでプロファイリングできることをテスト"""
+        with patch.dict(os.environ, {"PROFILING_TOKEN": "secret"}, clear=True):
+            import importlib
+
+            from python_project_2026 import api
+
+            importlib.reload(api)
+
+            assert api.PROFILING_ENABLED is True
+            client = TestClient(api.app)
+            assert client.get("/debug/profile", params={"seconds": 0.01}).status_code == 403
+
+            response = client.get("/debug/profile", params={"seconds": 0.01}, headers={"X-Profile-Token": "secret"})
+            assert response.status_code == 200
+            assert response.headers["cache-control"] == "no-store"
+
+            response = client.get("/health", headers={"X-Profile": "", "X-Profile-Token": "secret"})
+            assert response.headers["x-profile-status"] == "200"
@@ -0,0 +1,247 @@
+"""assets.pyのテスト"""
+
+import gzip
+import json
+import re
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from python_project_2026.assets import (
+    VENDOR_ASSETS,
+    AssetStaticFiles,
+    LazyAssetManifest,
+    VendorAsset,
+    build_assets,
+    choose_encoding,
+    has_vendored_assets,
+    integrity_of,
+    vendor_assets,
+)
+
+CSS = "body { color: red; }\n" * 50
+
+
+@pytest.fixture
+def dirs():
+    """元ディレクトリと出力先ディレクトリ"""
+    with TemporaryDirectory() as temp_dir:
+        source = Path(temp_dir) / "static"
+        (source / "css").mkdir(parents=True)
+        (source / "css" / "style.css").write_text(CSS)
+        (source / "tiny.txt").write_text("tiny")
+        yield source, Path(temp_dir) / "build"
+
+
+class TestBuildAssets:
+    """build_assets関数のテスト"""
+
+    def test_fingerprints_and_compresses(self, dirs: tuple[Path, Path]) -> None:
+        """フィンガープリント付きファイルとgzip版が出力されることをテスト"""
+        source, output = dirs
+        manifest = build_assets(source, output)
+
+        hashed = manifest.url_path("css/style.css")
+        assert hashed.startswith("css/style.")
+        assert hashed.endswith(".css")
+        assert (output / hashed).read_text() == CSS
+        assert gzip.decompress((output / f"{hashed}.gz").read_bytes()).decode() == CSS
+        assert json.loads((output / "manifest.json").read_text())["css/style.css"] == hashed
+
+    def test_small_files_not_compressed(self, dirs: tuple[Path, Path]) -> None:
+        """小さいファイルは事前圧縮しないことをテスト"""
+        source, output = dirs
+        manifest = build_assets(source, output)
+
+        asset = manifest.lookup(manifest.url_path("tiny.txt"))
+        assert asset is not None
+        assert set(asset.variants) == {"identity"}
+
+    def test_hash_changes_with_content(self, dirs: tuple[Path, Path]) -> None:
+        """内容が変わるとフィンガープリントも変わることをテスト"""
+        source, output = dirs
+        before = build_assets(source, output).url_path("css/style.css")
+        (source / "css" / "style.css").write_text(CSS + "a {}\n")
+        after = build_assets(source, output).url_path("css/style.css")
+
+        assert before != after
+
+    def test_unknown_path_unchanged(self, dirs: tuple[Path, Path]) -> None:
+        """未登録のパスはそのまま返すことをテスト"""
+        source, output = dirs
+        assert build_assets(source, output).url_path("missing.js") == "missing.js"
+
+    def test_in_memory_without_output_dir(self, dirs: tuple[Path, Path]) -> None:
+        """出力先を指定しなければファイルを書き出さないことをテスト"""
+        source, output = dirs
+        manifest = build_assets(source)
+
+        asset = manifest.lookup(manifest.url_path("css/style.css"))
+        assert asset is not None
+        assert asset.variants["identity"].decode() == CSS
+        assert not output.exists()
+
+    def test_rewrites_tampered_file(self, dirs: tuple[Path, Path]) -> None:
+        """既存ファイルの内容がハッシュと一致しなければ書き直すことをテスト"""
+        source, output = dirs
+        hashed = build_assets(source, output).url_path("css/style.css")
+        (output / hashed).write_text("planted")
+        build_assets(source, output)
+
+        assert (output / hashed).read_text() == CSS
+
+
+class TestLazyAssetManifest:
+    """LazyAssetManifestのテスト"""
+
+    def test_builds_on_first_use(self, dirs: tuple[Path, Path]) -> None:
+        """初回の参照時に一度だけビルドすることをテスト"""
+        source, output = dirs
+        lazy = LazyAssetManifest(source, output)
+        assert not output.exists()
+
+        hashed = lazy.url_path("css/style.css")
+        assert hashed != "css/style.css"
+        assert lazy.load() is lazy.load()
+        assert (output / hashed).exists()
+
+
+class TestChooseEncoding:
+    """choose_encoding関数のテスト"""
+
+    @pytest.mark.parametrize(
+        "accept_encoding,available,expected",
+        [
+            ("gzip, deflate, br", {"identity", "gzip", "br"}, "br"),
+            ("gzip, deflate, br", {"identity", "gzip"}, "gzip"),
+            ("br;q=0, gzip", {"identity", "gzip", "br"}, "gzip"),
+            ("", {"identity", "gzip"}, "identity"),
+            ("*", {"identity", "gzip"}, "gzip"),
+            ("gzip;q=0", {"identity", "gzip"}, "identity"),
+        ],
+    )
+    def test_choose_encoding(self, accept_encoding: str, available: set[str], expected: str) -> None:
+        """Accept-Encodingに応じたエンコーディング選択をテスト"""
+        assert choose_encoding(accept_encoding, dict.fromkeys(available)) == expected
+
+
+class TestAssetStaticFiles:
+    """AssetStaticFilesのテスト"""
+
+    @pytest.fixture
+    def client(self, dirs: tuple[Path, Path]) -> tuple[TestClient, str]:
+        source, output = dirs
+        manifest = build_assets(source, output)
+        app = FastAPI()
+        app.mount("/static", AssetStaticFiles(directory=source, manifest=manifest), name="static")
+        return TestClient(app), manifest.url_path("css/style.css")
+
+    def test_serves_precompressed_with_immutable_cache(self, client: tuple[TestClient, str]) -> None:
+        """フィンガープリント付きURLは事前圧縮版を不変キャッシュで返すことをテスト"""
+        test_client, hashed = client
+        response = test_client.get(f"/static/{hashed}", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["content-type"].startswith("text/css")
+        assert response.text == CSS
+
+    def test_serves_identity(self, client: tuple[TestClient, str]) -> None:
+        """圧縮を受け入れないクライアントには元のファイルを返すことをテスト"""
+        test_client, hashed = client
+        response = test_client.get(f"/static/{hashed}", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert response.text == CSS
+
+    def test_not_modified(self, client: tuple[TestClient, str]) -> None:
+        """ETag一致時は304を返すことをテスト"""
+        test_client, hashed = client
+        etag = test_client.get(f"/static/{hashed}").headers["etag"]
+        response = test_client.get(f"/static/{hashed}", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+
+    def test_served_after_output_removed(self, dirs: tuple[Path, Path], client: tuple[TestClient, str]) -> None:
+        """出力先のファイルが削除されても配信を続けることをテスト"""
+        test_client, hashed = client
+        _source, output = dirs
+        for path in output.rglob("*"):
+            if path.is_file():
+                path.unlink()
+        response = test_client.get(f"/static/{hashed}", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.text == CSS
+
+    def test_original_path_still_served(self, client: tuple[TestClient, str]) -> None:
+        """フィンガープリントのないパスも配信されることをテスト"""
+        test_client, _hashed = client
+        response = test_client.get("/static/css/style.css")
+
+        assert response.status_code == 200
+        assert "immutable" not in response.headers.get("cache-control", "")
+
+
+def _serve_urls(request: httpx.Request) -> httpx.Response:
+    """URLを内容として返すCDNの代わり"""
+    return httpx.Response(200, content=str(request.url).encode())
+
+
+class TestVendorAssets:
+    """vendor_assets関数のテスト"""
+
+    def test_pinned_versions(self) -> None:
+        """取得元URLのバージョンが固定されていることをテスト"""
+        for asset in VENDOR_ASSETS.values():
+            assert re.search(r"@\d+\.\d+\.\d+/", asset.url), asset.url
+
+    def test_downloads_verified_assets(self) -> None:
+        """ハッシュが一致するアセットをすべて保存することをテスト"""
+        assets = {
+            relative: VendorAsset(asset.url, integrity_of(asset.url.encode()))
+            for relative, asset in VENDOR_ASSETS.items()
+        }
+        with TemporaryDirectory() as temp_dir, httpx.Client(transport=httpx.MockTransport(_serve_urls)) as http:
+            dest = Path(temp_dir)
+            assert not has_vendored_assets(dest)
+
+            saved = vendor_assets(dest, client=http, assets=assets)
+
+            assert len(saved) == len(VENDOR_ASSETS)
+            assert has_vendored_assets(dest)
+            relative, asset = next(iter(VENDOR_ASSETS.items()))
+            assert (dest / relative).read_text() == asset.url
+
+    def test_integrity_algorithms(self) -> None:
+        """sha256/sha512形式のハッシュでも確認できることをテスト"""
+        url = "https://cdn.example/lib@1.0.0/lib.js"
+        assets = {"vendor/lib.js": VendorAsset(url, integrity_of(url.encode(), "sha256"))}
+        with TemporaryDirectory() as temp_dir, httpx.Client(transport=httpx.MockTransport(_serve_urls)) as http:
+            assert len(vendor_assets(Path(temp_dir), client=http, assets=assets)) == 1
+
+    @pytest.mark.parametrize(
+        ("integrity", "match"),
+        [
+            ("sha384-AAAA", "integrity mismatch"),
+            (None, "no integrity hash is recorded"),
+            ("md5-AAAA", "unsupported integrity algorithm"),
+        ],
+    )
+    def test_rejects_unverified_content(self, integrity: str | None, match: str) -> None:
+        """ハッシュが一致しない・未記録の場合は何も保存しないことをテスト"""
+        ok_url = "https://cdn.example/ok@1.0.0/ok.js"
+        assets = {
+            "vendor/ok.js": VendorAsset(ok_url, integrity_of(ok_url.encode())),
+            "vendor/bad.js": VendorAsset("https://cdn.example/bad@1.0.0/bad.js", integrity),
+        }
+        with TemporaryDirectory() as temp_dir, httpx.Client(transport=httpx.MockTransport(_serve_urls)) as http:
+            with pytest.raises(ValueError, match=match):
+                vendor_assets(Path(temp_dir), client=http, assets=assets)
+            assert not any(Path(temp_dir).iterdir())
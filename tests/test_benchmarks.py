@@ -0,0 +1,66 @@
+"""benchmarks/suite.pyのテスト"""
+
+from pathlib import Path
+
+import pytest
+from benchmarks.suite import Result, compare, load, percentile, save
+
+BASELINE = {"a": Result(ops_per_sec=1000.0, p50_us=100.0, p99_us=200.0)}
+
+
+class TestPercentile:
+    """percentile関数のテスト"""
+
+    @pytest.mark.parametrize(
+        "fraction,expected",
+        [(0.0, 1.0), (0.5, 50.0), (0.99, 99.0), (1.0, 100.0)],
+    )
+    def test_nearest_rank(self, fraction: float, expected: float) -> None:
+        """最近傍法で百分位数を返すことをテスト"""
+        samples = [float(i) for i in range(1, 101)]
+        assert percentile(samples, fraction) == expected
+
+    def test_single_sample(self) -> None:
+        """標本が1つならその値を返すことをテスト"""
+        assert percentile([3.0], 0.5) == 3.0
+        assert percentile([3.0], 0.99) == 3.0
+
+
+class TestCompare:
+    """compare関数のテスト"""
+
+    def test_within_threshold(self) -> None:
+        """閾値内の変化は回帰とみなさないことをテスト"""
+        current = {"a": Result(ops_per_sec=900.0, p50_us=110.0, p99_us=400.0)}
+        assert compare(BASELINE, current, threshold=0.15) == []
+
+    def test_throughput_regression(self) -> None:
+        """スループットの低下を回帰として検出することをテスト"""
+        current = {"a": Result(ops_per_sec=800.0, p50_us=100.0, p99_us=200.0)}
+        assert compare(BASELINE, current, threshold=0.15) == ["a"]
+
+    def test_latency_regression(self) -> None:
+        """p50レイテンシーの増加を回帰として検出することをテスト"""
+        current = {"a": Result(ops_per_sec=1000.0, p50_us=120.0, p99_us=200.0)}
+        assert compare(BASELINE, current, threshold=0.15) == ["a"]
+
+    def test_p99_not_judged(self) -> None:
+        """p99の悪化だけでは回帰とみなさないことをテスト"""
+        current = {"a": Result(ops_per_sec=1000.0, p50_us=100.0, p99_us=1000.0)}
+        assert compare(BASELINE, current, threshold=0.15) == []
+
+    def test_new_benchmark_ignored(self) -> None:
+        """ベースラインにない項目は回帰とみなさないことをテスト"""
+        current = {"b": Result(ops_per_sec=1.0, p50_us=1.0, p99_us=1.0)}
+        assert compare(BASELINE, current, threshold=0.15) == []
+
+
+class TestBaselineFile:
+    """ベースラインの保存と読み込みのテスト"""
+
+    def test_round_trip(self, tmp_path: Path) -> None:
+        """保存した結果を同じ値で読み込めることをテスト"""
+        path = tmp_path / "baseline" / "results.json"
+        results = {"a": Result(ops_per_sec=1.5, p50_us=2.5, p99_us=3.5)}
+        save(path, results)
+        assert load(path) == results
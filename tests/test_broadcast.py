@@ -0,0 +1,152 @@
+"""broadcast.pyのテスト"""
+
+import asyncio
+
+import pytest
+
+from python_project_2026.broadcast import Broadcaster, TooManySubscribersError, format_sse
+
+
+class TestFormatSse:
+    """format_sse関数のテスト"""
+
+    def test_single_line(self) -> None:
+        """1行のデータをテスト"""
+        assert format_sse("hello") == "data: hello\n\n"
+
+    def test_multi_line_with_event(self) -> None:
+        """複数行のデータとイベント名をテスト"""
+        assert format_sse("<div>\n</div>", event="health") == "event: health\ndata: <div>\ndata: </div>\n\n"
+
+    def test_empty_data(self) -> None:
+        """空データでもdataフィールドを出力することをテスト"""
+        assert format_sse("") == "data: \n\n"
+
+
+class TestBroadcaster:
+    """Broadcasterのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_single_producer_for_all_subscribers(self) -> None:
+        """購読者数に関係なくプロデューサーが1回ずつ実行されることをテスト"""
+        calls = 0
+
+        async def producer() -> str:
+            nonlocal calls
+            calls += 1
+            return f"event-{calls}"
+
+        broadcaster = Broadcaster(producer, interval=60)
+        queues = [broadcaster.subscribe() for _ in range(3)]
+
+        events = await asyncio.gather(*(queue.get() for queue in queues))
+
+        assert events == ["event-1", "event-1", "event-1"]
+        assert calls == 1
+        assert broadcaster.latest == "event-1"
+        await broadcaster.aclose()
+
+    @pytest.mark.asyncio
+    async def test_subscriber_limit(self) -> None:
+        """購読者数の上限を超えると例外になることをテスト"""
+
+        async def producer() -> str:
+            return "event"
+
+        broadcaster = Broadcaster(producer, interval=60, max_subscribers=1)
+        broadcaster.subscribe()
+
+        with pytest.raises(TooManySubscribersError):
+            broadcaster.subscribe()
+        await broadcaster.aclose()
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_keeps_latest_only(self) -> None:
+        """遅い購読者には最新イベントのみが残ることをテスト"""
+
+        async def producer() -> str:
+            return "unused"
+
+        broadcaster = Broadcaster(producer, interval=60, queue_size=1)
+        queue = broadcaster.subscribe()
+        broadcaster.publish("first")
+        broadcaster.publish("second")
+
+        assert queue.get_nowait() == "second"
+        assert broadcaster.dropped >= 1
+        await broadcaster.aclose()
+
+    @pytest.mark.asyncio
+    async def test_producer_stops_without_subscribers(self) -> None:
+        """購読者がいなくなるとプロデューサーが停止することをテスト"""
+
+        async def producer() -> str:
+            return "event"
+
+        broadcaster = Broadcaster(producer, interval=60)
+        queue = broadcaster.subscribe()
+        task = broadcaster._task
+        assert task is not None
+
+        broadcaster.unsubscribe(queue)
+        await asyncio.sleep(0)
+
+        assert broadcaster._task is None
+        assert task.cancelled() or task.done()
+        assert broadcaster.subscriber_count == 0
+
+    @pytest.mark.asyncio
+    async def test_latest_is_dropped_when_idle(self) -> None:
+        """購読者がいなくなると最新の結果を破棄し、次の購読者には新しく生成した結果を渡すことをテスト"""
+        calls = 0
+
+        async def producer() -> str:
+            nonlocal calls
+            calls += 1
+            return f"event-{calls}"
+
+        broadcaster = Broadcaster(producer, interval=60)
+        queue = broadcaster.subscribe()
+        assert await queue.get() == "event-1"
+        broadcaster.unsubscribe(queue)
+        assert broadcaster.latest is None
+
+        queue = broadcaster.subscribe()
+        assert await queue.get() == "event-2"
+        await broadcaster.aclose()
+        assert broadcaster.latest is None
+
+    @pytest.mark.asyncio
+    async def test_producer_errors_are_counted(self) -> None:
+        """プロデューサーの例外で配信が停止しないことをテスト"""
+        calls = 0
+
+        async def producer() -> str:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise RuntimeError("boom")
+            return "recovered"
+
+        broadcaster = Broadcaster(producer, interval=0)
+        queue = broadcaster.subscribe()
+
+        assert await asyncio.wait_for(queue.get(), timeout=1) == "recovered"
+        assert broadcaster.errors == 1
+        await broadcaster.aclose()
+
+    @pytest.mark.asyncio
+    async def test_aclose_ends_streams(self) -> None:
+        """終了時に全購読者へ終端を通知することをテスト"""
+
+        async def producer() -> str:
+            return "event"
+
+        broadcaster = Broadcaster(producer, interval=60)
+        queue = broadcaster.subscribe()
+        await asyncio.sleep(0)
+
+        await broadcaster.aclose()
+
+        assert queue.get_nowait() is None
+        assert broadcaster.subscriber_count == 0
@@ -0,0 +1,51 @@
+"""bulk.pyのテスト"""
+
+import io
+
+from python_project_2026.bulk import iter_lines, write_batched
+
+
+class _CountingWriter(io.StringIO):
+    """write呼び出し回数を記録するStringIO"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes = 0
+
+    def write(self, s: str) -> int:
+        self.writes += 1
+        return super().write(s)
+
+
+class TestIterLines:
+    """iter_lines関数のテスト"""
+
+    def test_strips_newlines_and_skips_blank_lines(self) -> None:
+        """改行の除去と空行の無視をテスト"""
+        stream = io.StringIO("a\r\n\n  \n b \nc")
+        assert list(iter_lines(stream)) == ["a", " b ", "c"]
+
+    def test_is_lazy(self) -> None:
+        """ストリームを必要な分だけ読み込むことをテスト"""
+        stream = io.StringIO("a\nb\nc\n")
+        lines = iter_lines(stream)
+        assert next(lines) == "a"
+        assert stream.readline() == "b\n"
+
+
+class TestWriteBatched:
+    """write_batched関数のテスト"""
+
+    def test_batches_writes(self) -> None:
+        """指定した行数ごとにまとめて書き込むことをテスト"""
+        out = _CountingWriter()
+        count = write_batched((f"{i}\n" for i in range(10)), out, batch_size=4)
+        assert count == 10
+        assert out.writes == 3
+        assert out.getvalue() == "".join(f"{i}\n" for i in range(10))
+
+    def test_empty(self) -> None:
+        """入力が空なら何も書き込まないことをテスト"""
+        out = _CountingWriter()
+        assert write_batched([], out) == 0
+        assert out.writes == 0
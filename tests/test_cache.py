@@ -0,0 +1,163 @@
+"""cache.pyのテスト"""
+
+import asyncio
+import traceback
+
+import pytest
+
+from python_project_2026.cache import SingleFlightCache
+
+
+class FakeClock:
+    """テスト用の手動で進める時計"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Upstream:
+    """呼び出し回数を数え、失敗させることもできる取得元"""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.fail = False
+        self.gate: asyncio.Event | None = None
+
+    async def fetch(self) -> dict[str, int]:
+        self.calls += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return {"value": self.calls}
+
+
+class TestSingleFlightCache:
+    """SingleFlightCacheのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_fetch(self) -> None:
+        """同時に来た呼び出しが1回の取得を共有することをテスト"""
+        cache = SingleFlightCache(ttl=1.0, clock=FakeClock())
+        upstream = Upstream()
+        upstream.gate = asyncio.Event()
+
+        callers = [asyncio.create_task(cache.get("k", upstream.fetch)) for _ in range(50)]
+        await asyncio.sleep(0)
+        upstream.gate.set()
+        results = await asyncio.gather(*callers)
+
+        assert upstream.calls == 1
+        assert all(result == {"value": 1} for result in results)
+        assert (cache.misses, cache.coalesced) == (1, 49)
+
+    @pytest.mark.asyncio
+    async def test_fresh_value_is_cached(self) -> None:
+        """TTL内はキャッシュした値を返すことをテスト"""
+        clock = FakeClock()
+        cache = SingleFlightCache(ttl=1.0, clock=clock)
+        upstream = Upstream()
+        await cache.get("k", upstream.fetch)
+        clock.now = 0.5
+        assert await cache.get("k", upstream.fetch) == {"value": 1}
+        assert upstream.calls == 1
+        assert cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self) -> None:
+        """期限切れ後は古い値をすぐに返し、バックグラウンドで再取得することをテスト"""
+        clock = FakeClock()
+        cache = SingleFlightCache(ttl=1.0, max_stale=10.0, clock=clock)
+        upstream = Upstream()
+        await cache.get("k", upstream.fetch)
+
+        clock.now = 2.0
+        assert await cache.get("k", upstream.fetch) == {"value": 1}
+        assert await cache.get("k", upstream.fetch) == {"value": 1}
+        await asyncio.sleep(0)
+        # 再取得は1回だけで、完了後は新しい値を返す
+        assert upstream.calls == 2
+        assert await cache.get("k", upstream.fetch) == {"value": 2}
+
+    @pytest.mark.asyncio
+    async def test_serves_last_known_good_while_upstream_is_down(self) -> None:
+        """取得元の停止中はmax_staleの範囲内で直近の値を返し、再試行はTTLごとに1回であることをテスト"""
+        clock = FakeClock()
+        cache = SingleFlightCache(ttl=1.0, max_stale=10.0, clock=clock)
+        upstream = Upstream()
+        await cache.get("k", upstream.fetch)
+        upstream.fail = True
+
+        clock.now = 2.0
+        for _ in range(20):
+            assert await cache.get("k", upstream.fetch) == {"value": 1}
+            await asyncio.sleep(0)
+        assert upstream.calls == 2
+        assert cache.errors == 1
+
+        clock.now = 3.5
+        assert await cache.get("k", upstream.fetch) == {"value": 1}
+        await asyncio.sleep(0)
+        assert upstream.calls == 3
+
+        # 上限を超えると古い値は返さず、取得の例外を返す
+        clock.now = 20.0
+        with pytest.raises(RuntimeError, match="upstream down"):
+            await cache.get("k", upstream.fetch)
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_retried_within_ttl(self) -> None:
+        """失敗した取得はTTLの間再試行せず同じ例外を返すことをテスト"""
+        clock = FakeClock()
+        cache = SingleFlightCache(ttl=1.0, clock=clock)
+        upstream = Upstream()
+        upstream.fail = True
+        for _ in range(5):
+            with pytest.raises(RuntimeError):
+                await cache.get("k", upstream.fetch)
+        assert upstream.calls == 1
+
+        upstream.fail = False
+        clock.now = 1.5
+        assert await cache.get("k", upstream.fetch) == {"value": 2}
+
+    @pytest.mark.asyncio
+    async def test_cached_failure_traceback_does_not_grow(self) -> None:
+        """TTL内に同じ例外を投げ直してもトレースバックが伸びないことをテスト"""
+        cache = SingleFlightCache(ttl=1.0, clock=FakeClock())
+        upstream = Upstream()
+        upstream.fail = True
+        with pytest.raises(RuntimeError):
+            await cache.get("k", upstream.fetch)
+
+        depths = []
+        for _ in range(3):
+            with pytest.raises(RuntimeError) as info:
+                await cache.get("k", upstream.fetch)
+            depths.append(len(traceback.extract_tb(info.value.__traceback__)))
+        assert depths[0] == depths[1] == depths[2]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_fetch(self) -> None:
+        """待っていた呼び出しがキャンセルされても他の呼び出しの取得は続くことをテスト"""
+        cache = SingleFlightCache(ttl=1.0, clock=FakeClock())
+        upstream = Upstream()
+        upstream.gate = asyncio.Event()
+        first = asyncio.create_task(cache.get("k", upstream.fetch))
+        second = asyncio.create_task(cache.get("k", upstream.fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        upstream.gate.set()
+        assert await second == {"value": 1}
+
+    @pytest.mark.asyncio
+    async def test_disabled_with_zero_ttl(self) -> None:
+        """TTLが0なら毎回取得することをテスト"""
+        cache = SingleFlightCache(ttl=0)
+        upstream = Upstream()
+        await cache.get("k", upstream.fetch)
+        await cache.get("k", upstream.fetch)
+        assert upstream.calls == 2
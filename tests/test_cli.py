@@ -0,0 +1,55 @@
+"""cli.pyのテスト"""
+
+import re
+import subprocess
+import sys
+
+import pytest
+
+from python_project_2026 import __version__
+from python_project_2026.cli import run
+
+# 起動を遅くするため、`version` では読み込まないモジュール
+HEAVY_MODULES = ("typer", "click", "rich", "fastapi", "starlette", "pydantic", "uvicorn", "httpx", "jinja2")
+
+
+def _import_times(*args: str) -> dict[str, int]:
+    """コンソールスクリプトと同じ経路で実行し、``-X importtime`` の出力をモジュール名 -> 累積時間(マイクロ秒)に変換"""
+    code = f"from python_project_2026.cli import run; run({list(args)!r})"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)", line)
+        if match:
+            times[match.group(2)] = int(match.group(1))
+    return times
+
+
+class TestRun:
+    """run関数のテスト"""
+
+    def test_version_fast_path(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """versionがtyperを経由せずに表示されることをテスト"""
+        run(["version"])
+        assert capsys.readouterr().out == f"Python Project 2026 version: {__version__}\n"
+
+    def test_other_commands_use_typer_app(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """version以外のコマンドはtyperアプリに委譲されることをテスト"""
+        with pytest.raises(SystemExit) as exc_info:
+            run(["hello", "--name", "CLI"])
+        assert exc_info.value.code == 0
+        assert "こんにちは、CLI!" in capsys.readouterr().out
+
+
+class TestStartupTime:
+    """起動時間のテスト"""
+
+    def test_version_does_not_import_heavy_modules(self) -> None:
+        """versionの実行時に重いモジュールを読み込まないことをテスト"""
+        loaded = [name for name in _import_times("version") if name.split(".")[0] in HEAVY_MODULES]
+        assert loaded == []
@@ -0,0 +1,206 @@
+"""compression.pyのテスト"""
+
+import asyncio
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+from starlette.types import Message, Receive, Scope, Send
+
+from python_project_2026.compression import (
+    CompressionMiddleware,
+    CompressionSettings,
+    available_compressors,
+    should_compress_type,
+    weaken_etag,
+)
+
+HTML = "<tr><td>item</td><td>value</td></tr>\n" * 200
+
+
+def _create_app(settings: CompressionSettings | None = None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/html")
+    async def html() -> HTMLResponse:
+        return HTMLResponse(HTML, headers={"ETag": '"abc"'})
+
+    @app.get("/small")
+    async def small() -> JSONResponse:
+        return JSONResponse({"status": "ok"})
+
+    @app.get("/png")
+    async def png() -> Response:
+        return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+    @app.get("/encoded")
+    async def encoded() -> Response:
+        return Response(gzip.compress(HTML.encode()), media_type="text/html", headers={"Content-Encoding": "gzip"})
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def lines():
+            for i in range(100):
+                yield f'{{"index": {i}, "padding": "{"x" * 20}"}}\n'
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/events")
+    async def events() -> StreamingResponse:
+        async def lines():
+            yield "data: hello\n\n" * 200
+
+        return StreamingResponse(lines(), media_type="text/event-stream")
+
+    app.add_middleware(CompressionMiddleware, settings=settings)
+    return app
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(_create_app())
+
+
+def test_should_compress_type() -> None:
+    """Content-Typeの判定をテスト"""
+    types = ("text/html", "application/json")
+    assert should_compress_type("text/html; charset=utf-8", types)
+    assert should_compress_type("Application/JSON", types)
+    assert not should_compress_type("image/png", types)
+    assert not should_compress_type("text/event-stream", ("text/",))
+
+
+def test_weaken_etag() -> None:
+    """ETagの弱化をテスト"""
+    assert weaken_etag('"abc"') == 'W/"abc"'
+    assert weaken_etag('W/"abc"') == 'W/"abc"'
+
+
+class TestCompressionMiddleware:
+    """CompressionMiddlewareのテスト"""
+
+    def test_compresses_html_with_gzip(self, client: TestClient) -> None:
+        """HTMLがgzipで圧縮され、ETagが弱化されることをテスト"""
+        response = client.get("/html", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == 'W/"abc"'
+        assert int(response.headers["content-length"]) < len(HTML)
+        # httpxが展開した本文が元と一致する
+        assert response.text == HTML
+
+    def test_no_accept_encoding(self, client: TestClient) -> None:
+        """Accept-Encodingがなければ圧縮しないことをテスト"""
+        response = client.get("/html", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"] == '"abc"'
+        assert response.text == HTML
+
+    @pytest.mark.parametrize("path", ["/small", "/png", "/events"])
+    def test_skipped_responses(self, client: TestClient, path: str) -> None:
+        """小さな本文・対象外のContent-Type・SSEは圧縮しないことをテスト"""
+        response = client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_already_encoded_is_untouched(self, client: TestClient) -> None:
+        """Content-Encoding付きのレスポンスを二重に圧縮しないことをテスト"""
+        response = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text == HTML
+
+    def test_streaming_response(self, client: TestClient) -> None:
+        """ストリーミングのレスポンスを圧縮して送ることをテスト"""
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        lines = response.text.splitlines()
+        assert len(lines) == 100
+        assert lines[-1].startswith('{"index": 99')
+
+    @pytest.mark.asyncio
+    async def test_streaming_chunks_are_flushed(self) -> None:
+        """ストリーミングのチャンクが圧縮器に溜まらず、その都度展開できることをテスト"""
+        release = asyncio.Event()
+        sent: list[Message] = []
+        first_sent = asyncio.Event()
+
+        async def app(_scope: Scope, _receive: Receive, send: Send) -> None:
+            await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+            await send({"type": "http.response.body", "body": b"first line " * 200, "more_body": True})
+            await release.wait()
+            await send({"type": "http.response.body", "body": b"second line", "more_body": False})
+
+        async def receive() -> Message:
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message: Message) -> None:
+            sent.append(message)
+            if message["type"] == "http.response.body":
+                first_sent.set()
+
+        scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", b"gzip")]}
+        task = asyncio.create_task(CompressionMiddleware(app)(scope, receive, send))
+        await asyncio.wait_for(first_sent.wait(), timeout=5)
+
+        decompressor = zlib.decompressobj(31)
+        assert (b"content-encoding", b"gzip") in sent[0]["headers"]
+        assert decompressor.decompress(sent[1]["body"]) == b"first line " * 200
+
+        release.set()
+        await task
+        assert sent[-1]["more_body"] is False
+        assert decompressor.decompress(sent[-1]["body"]) == b"second line"
+        assert decompressor.eof
+
+    def test_cache_reuses_compressed_body(self) -> None:
+        """同一本文の圧縮結果をキャッシュから返すことをテスト"""
+        app = _create_app()
+        client = TestClient(app)
+        middleware = CompressionMiddleware(app, CompressionSettings())
+        first = middleware.compress_body("gzip", HTML.encode())
+        second = middleware.compress_body("gzip", HTML.encode())
+        assert first is second
+        assert middleware.cache is not None
+        assert (middleware.cache.hits, middleware.cache.misses) == (1, 1)
+        assert gzip.decompress(first).decode() == HTML
+
+        for _ in range(2):
+            assert client.get("/html", headers={"Accept-Encoding": "gzip"}).text == HTML
+
+    def test_cache_evicts_oldest(self) -> None:
+        """キャッシュが上限を超えると古いものから破棄されることをテスト"""
+        middleware = CompressionMiddleware(FastAPI(), CompressionSettings(cache_size=2))
+        for body in (b"a" * 2000, b"b" * 2000, b"c" * 2000):
+            middleware.compress_body("gzip", body)
+        assert middleware.cache is not None
+        assert len(middleware.cache) == 2
+
+    def test_choose_encoding(self) -> None:
+        """q値と優先順によるエンコーディングの選択をテスト"""
+        middleware = CompressionMiddleware(FastAPI(), CompressionSettings(encodings=("zstd", "gzip")))
+        assert middleware.choose_encoding("") is None
+        assert middleware.choose_encoding("br") is None
+        assert middleware.choose_encoding("gzip;q=0") is None
+        assert middleware.choose_encoding("*") == middleware.encodings[0]
+        assert middleware.choose_encoding("gzip, deflate") == "gzip"
+
+    def test_minimum_size_setting(self) -> None:
+        """minimum_sizeを超えた本文のみ圧縮することをテスト"""
+        client = TestClient(_create_app(CompressionSettings(minimum_size=10)))
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json() == {"status": "ok"}
+
+    @pytest.mark.parametrize("encoding", sorted(available_compressors()))
+    def test_available_compressors_round_trip(self, encoding: str) -> None:
+        """利用可能な圧縮器でワンショット・ストリーミングの両方が動作することをテスト"""
+        factory = available_compressors()[encoding]
+        one_shot = factory(3)
+        assert one_shot.compress(HTML.encode(), flush=False) + one_shot.finish()
+        streaming = factory(3)
+        assert streaming.compress(b"chunk")
+        assert isinstance(streaming.finish(), bytes)
@@ -0,0 +1,83 @@
+"""diskusage.pyのテスト"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from python_project_2026.diskusage import scan_disk_usage
+
+
+def _dir_size(path: Path) -> int:
+    return os.lstat(path).st_size
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    """a/b/c の3階層のディレクトリツリー"""
+    (tmp_path / "a" / "b" / "c").mkdir(parents=True)
+    (tmp_path / "root.txt").write_bytes(b"x" * 10)
+    (tmp_path / "a" / "a.txt").write_bytes(b"x" * 100)
+    (tmp_path / "a" / "b" / "b.txt").write_bytes(b"x" * 1000)
+    (tmp_path / "a" / "b" / "c" / "c.txt").write_bytes(b"x" * 10000)
+    return tmp_path
+
+
+class TestScanDiskUsage:
+    """scan_disk_usage関数のテスト"""
+
+    def test_totals_include_subdirectories(self, tree: Path) -> None:
+        """各ディレクトリの合計にサブディレクトリが含まれることをテスト"""
+        results = {usage.path: usage for usage in scan_disk_usage(tree, workers=2)}
+        c = tree / "a" / "b" / "c"
+        assert results[c].size == 10000 + _dir_size(c)
+        assert results[c].files == 1
+        dirs = [tree, tree / "a", tree / "a" / "b", c]
+        assert results[tree].size == 11110 + sum(_dir_size(d) for d in dirs)
+        assert results[tree].files == 4
+        assert results[tree].depth == 0
+        assert results[c].depth == 3
+
+    def test_post_order(self, tree: Path) -> None:
+        """サブディレクトリの結果が親より先に返り、最後がrootであることをテスト"""
+        paths = [usage.path for usage in scan_disk_usage(tree)]
+        assert paths == [tree / "a" / "b" / "c", tree / "a" / "b", tree / "a", tree]
+
+    def test_max_depth(self, tree: Path) -> None:
+        """max_depthより深いディレクトリは表示されないが合計には含まれることをテスト"""
+        results = list(scan_disk_usage(tree, max_depth=1))
+        assert [usage.path for usage in results] == [tree / "a", tree]
+        assert results[-1].files == 4
+
+    def test_hard_links_counted_once(self, tmp_path: Path) -> None:
+        """ハードリンクされたファイルを1回だけ数えることをテスト"""
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "data.bin").write_bytes(b"x" * 4096)
+        os.link(tmp_path / "data.bin", tmp_path / "sub" / "link.bin")
+        root = list(scan_disk_usage(tmp_path))[-1]
+        assert root.files == 1
+        assert root.size == 4096 + _dir_size(tmp_path) + _dir_size(tmp_path / "sub")
+
+    def test_symlinks_are_not_followed(self, tree: Path) -> None:
+        """ディレクトリへのシンボリックリンクを辿らないことをテスト"""
+        (tree / "loop").symlink_to(tree, target_is_directory=True)
+        paths = [usage.path for usage in scan_disk_usage(tree)]
+        assert tree / "loop" not in paths
+        assert len(paths) == 4
+
+    def test_errors_are_reported(self, tmp_path: Path) -> None:
+        """読み取れないディレクトリはエラーとして通知され、空として扱われることをテスト"""
+        errors: list[OSError] = []
+        results = list(scan_disk_usage(tmp_path / "missing", on_error=errors.append))
+        assert len(results) == 1
+        assert results[0].size == 0
+        assert isinstance(errors[0], FileNotFoundError)
+
+    def test_many_directories(self, tmp_path: Path) -> None:
+        """同時走査数を超える数のディレクトリでも全件を集計することをテスト"""
+        for i in range(50):
+            (tmp_path / f"d{i}").mkdir()
+            (tmp_path / f"d{i}" / "f").write_bytes(b"x")
+        results = list(scan_disk_usage(tmp_path, workers=2))
+        assert len(results) == 51
+        assert results[-1].files == 50
@@ -0,0 +1,145 @@
+"""health.pyのテスト"""
+
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+
+from python_project_2026.health import HealthMonitor, ReadinessThresholds, pool_utilization
+from python_project_2026.http_client import PoolStats
+from python_project_2026.loop_monitor import LoopLagMonitor
+
+
+class FakeClock:
+    """テスト用の手動で進める時計"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@dataclass
+class LoadState:
+    """テスト用の負荷状況"""
+
+    in_flight: int = 0
+    pool: PoolStats | None = None
+
+
+def _stats(active: int, waiting: int, max_connections: int = 10) -> PoolStats:
+    return PoolStats(
+        connections=active,
+        active=active,
+        idle=0,
+        waiting=waiting,
+        max_connections=max_connections,
+        max_keepalive_connections=5,
+        http2=False,
+    )
+
+
+def test_pool_utilization() -> None:
+    """接続待ちを含むプール使用率をテスト"""
+    assert pool_utilization(None) == 0.0
+    assert pool_utilization(_stats(5, 0)) == 0.5
+    assert pool_utilization(_stats(10, 5)) == 1.5
+
+
+class TestHealthMonitor:
+    """HealthMonitorのテスト"""
+
+    @pytest.fixture
+    def state(self) -> LoadState:
+        return LoadState()
+
+    def _monitor(self, state: LoadState, clock: FakeClock, **thresholds: Any) -> HealthMonitor:
+        return HealthMonitor(
+            LoopLagMonitor(interval=60),
+            in_flight=lambda: state.in_flight,
+            pool=lambda: state.pool,
+            thresholds=ReadinessThresholds(**thresholds),
+            interval=1.0,
+            clock=clock,
+        )
+
+    def test_not_ready_until_warmed_up(self, state: LoadState) -> None:
+        """ウォームアップ完了までNot Readyであることをテスト"""
+        monitor = self._monitor(state, FakeClock())
+        status, body = monitor.readiness()
+        assert status == 503
+        assert json.loads(body)["reasons"] == ["warming_up"]
+
+        monitor.mark_warmed_up()
+        status, body = monitor.readiness()
+        assert status == 200
+        assert json.loads(body)["status"] == "ready"
+
+    def test_shutting_down(self, state: LoadState) -> None:
+        """終了処理中はウォームアップ中と区別してNot Readyを返し、リセットで起動前に戻ることをテスト"""
+        monitor = self._monitor(state, FakeClock())
+        monitor.mark_warmed_up()
+        monitor.mark_shutting_down()
+        status, body = monitor.readiness()
+        data = json.loads(body)
+        assert status == 503
+        assert data["reasons"] == ["shutting_down"]
+        assert data["shutting_down"] is True
+
+        monitor.reset()
+        assert json.loads(monitor.readiness()[1])["reasons"] == ["warming_up"]
+
+    def test_thresholds(self, state: LoadState) -> None:
+        """各閾値を超えると理由付きでNot Readyになることをテスト"""
+        monitor = self._monitor(state, FakeClock(), max_loop_lag=0.5, max_in_flight=3, max_pool_utilization=0.9)
+        monitor.mark_warmed_up()
+        monitor.loop_monitor.record(0.8)
+        state.in_flight = 3
+        state.pool = _stats(9, 1)
+        monitor.refresh()
+
+        status, body = monitor.readiness()
+        data = json.loads(body)
+        assert status == 503
+        assert data["reasons"] == ["loop_lag", "in_flight", "http_pool"]
+        assert data["in_flight"] == 3
+        assert data["pool_utilization"] == 1.0
+
+    def test_probe_uses_cached_snapshot(self, state: LoadState) -> None:
+        """プローブは集計済みの値を返し、次の集計まで変化しないことをテスト"""
+        monitor = self._monitor(state, FakeClock(), max_in_flight=1)
+        monitor.mark_warmed_up()
+        state.in_flight = 5
+        assert monitor.readiness()[0] == 200
+        monitor.refresh()
+        assert monitor.readiness()[0] == 503
+
+    def test_stale_snapshot_is_not_ready(self, state: LoadState) -> None:
+        """集計が長時間更新されていなければNot Readyになることをテスト"""
+        clock = FakeClock()
+        monitor = self._monitor(state, clock)
+        monitor.mark_warmed_up()
+        clock.now = monitor.stale_after + 1
+        status, body = monitor.readiness()
+        assert status == 503
+        assert json.loads(body)["reasons"] == ["stale"]
+
+    @pytest.mark.asyncio
+    async def test_background_refresh(self) -> None:
+        """バックグラウンドのタスクが定期的に集計することをテスト"""
+        monitor = HealthMonitor(
+            LoopLagMonitor(interval=60),
+            in_flight=lambda: 0,
+            pool=lambda: None,
+            thresholds=ReadinessThresholds(max_in_flight=1),
+            interval=0.01,
+        )
+        monitor.warmed_up = True
+        monitor.ensure_started()
+        await asyncio.sleep(0.05)
+        assert monitor.readiness()[0] == 200
+        await monitor.aclose()
+        assert monitor.running is False
@@ -0,0 +1,70 @@
+"""http_client.pyのテスト"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from python_project_2026.http_client import HttpClientSettings, create_http_client, pool_stats
+
+
+class TestCreateHttpClient:
+    """create_http_client関数のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_applies_pool_settings(self) -> None:
+        """プール上限とタイムアウトが反映されることをテスト"""
+        settings = HttpClientSettings(max_connections=7, max_keepalive_connections=3, timeout=1.5, connect_timeout=0.5)
+        async with create_http_client(settings) as client:
+            pool = client._transport._pool
+            assert pool._max_connections == 7
+            assert pool._max_keepalive_connections == 3
+            assert client.timeout.read == 1.5
+            assert client.timeout.connect == 0.5
+
+    @pytest.mark.asyncio
+    async def test_http2_falls_back_without_h2(self) -> None:
+        """h2未インストール時はHTTP/1.1で作成されることをテスト"""
+        settings = HttpClientSettings(http2=True)
+        with patch("python_project_2026.http_client.http2_available", return_value=False):
+            async with create_http_client(settings) as client:
+                assert client._transport._pool._http2 is False
+                assert pool_stats(client, settings).http2 is False
+
+
+class TestPoolStats:
+    """pool_stats関数のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_empty_pool(self) -> None:
+        """未使用のプールはすべて0になることをテスト"""
+        settings = HttpClientSettings()
+        async with create_http_client(settings) as client:
+            stats = pool_stats(client, settings)
+
+        assert stats.connections == 0
+        assert stats.active == 0
+        assert stats.idle == 0
+        assert stats.waiting == 0
+        assert stats.max_connections == settings.max_connections
+
+    @pytest.mark.asyncio
+    async def test_counts_connections_and_waiting_requests(self) -> None:
+        """接続状態と待機中リクエストを集計することをテスト"""
+        settings = HttpClientSettings()
+        async with create_http_client(settings) as client:
+            fake_pool = SimpleNamespace(
+                connections=[
+                    SimpleNamespace(is_idle=lambda: True),
+                    SimpleNamespace(is_idle=lambda: False),
+                    SimpleNamespace(is_idle=lambda: False),
+                ],
+                _requests=[SimpleNamespace(is_queued=lambda: True), SimpleNamespace(is_queued=lambda: False)],
+            )
+            with patch.object(client._transport, "_pool", fake_pool):
+                stats = pool_stats(client, settings)
+
+        assert stats.connections == 3
+        assert stats.idle == 1
+        assert stats.active == 2
+        assert stats.waiting == 1
@@ -0,0 +1,162 @@
+"""lifecycle.pyのテスト"""
+
+import asyncio
+import signal
+
+import httpx
+import jinja2
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from python_project_2026.admission import AdmissionMiddleware, AdmissionSettings, AdmissionStats
+from python_project_2026.lifecycle import Drainer, DrainMiddleware, install_shutdown_hook, warm_up
+from python_project_2026.metrics import MetricsMiddleware, MetricsRegistry
+
+
+def _create_app(drainer: Drainer | None = None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work() -> dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/broken")
+    async def broken() -> None:
+        raise RuntimeError("boom")
+
+    @app.get("/health")
+    async def health() -> dict[str, str]:
+        return {"status": "healthy"}
+
+    if drainer is not None:
+        app.add_middleware(DrainMiddleware, drainer=drainer)
+    return app
+
+
+class TestWarmUp:
+    """warm_up関数のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_compiles_templates_and_requests_routes(self) -> None:
+        """テンプレートのコンパイルと合成リクエストを行うことをテスト"""
+        env = jinja2.Environment(loader=jinja2.DictLoader({"a.html": "{{ x }}", "b.html": "{% if %}"}))
+        report = await warm_up(_create_app(), env, paths=("/work", "/broken", "/missing"))
+
+        assert report.templates == 1
+        assert report.requests == 3
+        assert any(failure.startswith("template b.html") for failure in report.failures)
+        # 5xxは失敗として記録し、404は記録しない
+        assert any("/broken" in failure for failure in report.failures)
+        assert not any("/missing" in failure for failure in report.failures)
+
+    @pytest.mark.asyncio
+    async def test_skips_metrics_and_admission(self) -> None:
+        """合成リクエストはメトリクスと受付制御に含めないことをテスト"""
+        registry = MetricsRegistry()
+        stats = AdmissionStats()
+        app = _create_app()
+        app.add_middleware(AdmissionMiddleware, settings=AdmissionSettings(rate_limit=1, burst=1), stats=stats)
+        app.add_middleware(MetricsMiddleware, registry=registry)
+
+        report = await warm_up(app, paths=("/work", "/work"))
+        assert report.requests == 2
+        assert report.failures == []
+        assert registry.total_requests() == 0
+        assert stats.rejected["rate_limit"] == 0
+
+        # レート制限のトークンも消費していない
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.get("/work")).status_code == 200
+        assert registry.total_requests() == 1
+
+    @pytest.mark.asyncio
+    async def test_timeout(self) -> None:
+        """タイムアウトすると残りを打ち切ることをテスト"""
+        app = FastAPI()
+
+        @app.get("/slow")
+        async def slow() -> None:
+            await asyncio.sleep(10)
+
+        report = await warm_up(app, paths=("/slow",), timeout=0.05)
+        assert report.failures == ["timed out after 0.1s"]
+        assert report.duration < 1
+
+
+class TestDrainer:
+    """Drainer・DrainMiddlewareのテスト"""
+
+    def test_rejects_new_requests_while_draining(self) -> None:
+        """ドレイン中は新しいリクエストを503で断り、ヘルスチェックには応答することをテスト"""
+        drainer = Drainer()
+        client = TestClient(_create_app(drainer))
+        assert client.get("/work").status_code == 200
+
+        drainer.begin()
+        response = client.get("/work")
+        assert response.status_code == 503
+        assert response.headers["connection"] == "close"
+        assert response.headers["retry-after"] == "1"
+        assert client.get("/health").status_code == 200
+
+        drainer.reset()
+        assert client.get("/work").status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_waits_for_in_flight_requests(self) -> None:
+        """処理中のリクエストの完了を待つことをテスト"""
+        drainer = Drainer()
+        release = asyncio.Event()
+        app = FastAPI()
+
+        @app.get("/slow")
+        async def slow() -> dict[str, str]:
+            await release.wait()
+            return {"status": "done"}
+
+        app.add_middleware(DrainMiddleware, drainer=drainer)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            pending = asyncio.create_task(client.get("/slow"))
+            await asyncio.sleep(0.01)
+            assert drainer.in_flight == 1
+
+            drainer.begin()
+            assert await drainer.wait(0.01) == 1
+            asyncio.get_running_loop().call_later(0.01, release.set)
+            assert await drainer.wait(5) == 0
+            assert (await pending).json() == {"status": "done"}
+
+
+class TestInstallShutdownHook:
+    """install_shutdown_hook関数のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_runs_callback_and_previous_handler(self) -> None:
+        """終了シグナルで元のハンドラーとコールバックの両方が呼ばれることをテスト"""
+        received: list[str] = []
+        original = signal.signal(signal.SIGTERM, lambda *_: received.append("server"))
+        try:
+            uninstall = install_shutdown_hook(lambda: received.append("drain"))
+            signal.raise_signal(signal.SIGTERM)
+            await asyncio.sleep(0.01)
+            assert received == ["server", "drain"]
+
+            uninstall()
+            signal.raise_signal(signal.SIGTERM)
+            await asyncio.sleep(0.01)
+            assert received == ["server", "drain", "server"]
+        finally:
+            signal.signal(signal.SIGTERM, original)
+
+    def test_noop_outside_main_thread(self) -> None:
+        """メインスレッド以外では何もしないことをテスト"""
+
+        async def install() -> None:
+            install_shutdown_hook(lambda: None)()
+
+        before = signal.getsignal(signal.SIGTERM)
+        asyncio.run(asyncio.to_thread(asyncio.run, install()))
+        assert signal.getsignal(signal.SIGTERM) is before
@@ -0,0 +1,152 @@
+"""logs.pyのテスト"""
+
+import io
+import json
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from python_project_2026.logs import AccessLogMiddleware, JsonLinesLogger, normalize_level
+
+
+class BlockingStream(io.StringIO):
+    """releaseされるまで書き込みを止める出力先"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, text: str) -> int:
+        self.release.wait(5)
+        return super().write(text)
+
+
+def _lines(stream: io.StringIO) -> list[dict[str, object]]:
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+class TestJsonLinesLogger:
+    """JsonLinesLoggerのテスト"""
+
+    def test_writes_json_lines(self) -> None:
+        """JSON Lines形式で書き出されることをテスト"""
+        stream = io.StringIO()
+        logger = JsonLinesLogger(stream=stream, clock=lambda: 0.0)
+        logger.info("起動", version="1.0")
+        logger.warning("警告")
+        logger.close()
+
+        records = _lines(stream)
+        assert records[0] == {"time": "1970-01-01T00:00:00.000Z", "level": "info", "message": "起動", "version": "1.0"}
+        assert records[1]["level"] == "warning"
+        assert logger.written == 2
+
+    def test_level_filter(self) -> None:
+        """設定したレベル未満のログは出力しないことをテスト"""
+        stream = io.StringIO()
+        logger = JsonLinesLogger(stream=stream, level="warning")
+        logger.info("skipped")
+        logger.error("kept")
+        logger.flush()
+        assert [record["message"] for record in _lines(stream)] == ["kept"]
+        logger.level = "debug"
+        assert logger.level == "debug"
+        logger.close()
+
+    @pytest.mark.parametrize("name,expected", [("WARN", "warning"), ("critical", "error"), (" Info ", "info")])
+    def test_level_aliases(self, name: str, expected: str) -> None:
+        """レベル名の別名と大文字小文字を受け付けることをテスト"""
+        assert normalize_level(name) == expected
+
+    def test_unknown_level_rejected(self) -> None:
+        """未知のレベル名はValueErrorになり、設定が変わらないことをテスト"""
+        logger = JsonLinesLogger(stream=io.StringIO(), level="warning")
+        with pytest.raises(ValueError):
+            logger.level = "verbose"
+        assert logger.level == "warning"
+
+    def test_flush_without_records(self) -> None:
+        """ログがない状態でもflush・closeできることをテスト"""
+        logger = JsonLinesLogger(stream=io.StringIO())
+        assert logger.flush() is True
+        logger.close()
+
+    def test_drops_when_queue_is_full(self) -> None:
+        """出力先が詰まってキューが満杯になると新しいログを捨てて数えることをテスト"""
+        stream = BlockingStream()
+        logger = JsonLinesLogger(stream=stream, max_queue=4, batch_size=1)
+        for i in range(20):
+            logger.info(f"message {i}")
+        assert logger.dropped["info"] > 0
+
+        stream.release.set()
+        logger.close()
+        assert logger.written + logger.dropped["info"] == 20
+        assert 'log_records_dropped_total{level="info"}' in logger.render_metrics()
+
+    def test_access_log_sampled_under_load(self) -> None:
+        """キューが混んでいる間はアクセスログを間引くことをテスト"""
+        stream = BlockingStream()
+        logger = JsonLinesLogger(stream=stream, max_queue=100, batch_size=1, sample_rate=10)
+        for _ in range(200):
+            logger.access("GET", "/", 200, 0.001, "127.0.0.1")
+        assert logger.sampled_out > 0
+        assert sum(logger.dropped.values()) == 0
+
+        stream.release.set()
+        logger.close()
+        assert logger.written + logger.sampled_out == 200
+
+    def test_sample_rate_zero_disables_sampling(self) -> None:
+        """sample_rateが0なら混雑時もアクセスログを間引かないことをテスト"""
+        stream = BlockingStream()
+        logger = JsonLinesLogger(stream=stream, max_queue=100, batch_size=1, sample_rate=0)
+        for _ in range(60):
+            logger.access("GET", "/", 200, 0.001, "127.0.0.1")
+        assert logger.sampled_out == 0
+
+        stream.release.set()
+        logger.close()
+
+    def test_negative_sample_rate_rejected(self) -> None:
+        """負のsample_rateはValueErrorになることをテスト"""
+        with pytest.raises(ValueError):
+            JsonLinesLogger(stream=io.StringIO(), sample_rate=-1)
+
+    def test_write_errors_are_counted(self) -> None:
+        """出力先が閉じられていても例外にならず件数を数えることをテスト"""
+        stream = io.StringIO()
+        stream.close()
+        logger = JsonLinesLogger(stream=stream)
+        logger.info("lost")
+        logger.close()
+        assert logger.write_errors == 1
+
+
+class TestAccessLogMiddleware:
+    """AccessLogMiddlewareのテスト"""
+
+    def test_records_requests(self) -> None:
+        """リクエストごとにアクセスログを記録することをテスト"""
+        stream = io.StringIO()
+        logger = JsonLinesLogger(stream=stream)
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: int) -> dict[str, int]:
+            return {"id": item_id}
+
+        app.add_middleware(AccessLogMiddleware, logger=logger)
+        client = TestClient(app)
+        client.get("/items/1")
+        client.get("/missing")
+        logger.close()
+
+        records = _lines(stream)
+        assert [(r["method"], r["path"], r["status"]) for r in records] == [
+            ("GET", "/items/1", 200),
+            ("GET", "/missing", 404),
+        ]
+        assert all(r["message"] == "request" and r["duration_ms"] >= 0 for r in records)
@@ -0,0 +1,50 @@
+"""loop_monitor.pyのテスト"""
+
+import asyncio
+import time
+
+import pytest
+
+from python_project_2026.loop_monitor import LoopLagMonitor
+
+
+class TestLoopLagMonitor:
+    """LoopLagMonitorのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_detects_blocked_loop(self) -> None:
+        """イベントループが塞がれた時間を遅延として記録することをテスト"""
+        monitor = LoopLagMonitor(interval=0.01)
+        monitor.ensure_started()
+        await asyncio.sleep(0.02)
+
+        time.sleep(0.2)
+        await asyncio.sleep(0.05)
+        assert monitor.max_lag >= 0.15
+
+        # ループが解放されると遅延は小さい値に戻る
+        await asyncio.sleep(0.05)
+        assert monitor.lag < 0.15
+        await monitor.aclose()
+        assert monitor.running is False
+
+    @pytest.mark.asyncio
+    async def test_ensure_started_is_idempotent(self) -> None:
+        """同じループで何度呼んでも計測タスクは1つであることをテスト"""
+        monitor = LoopLagMonitor(interval=0.01)
+        monitor.ensure_started()
+        task = monitor._task
+        monitor.ensure_started()
+        assert monitor._task is task
+        await monitor.aclose()
+
+    def test_restarts_on_new_loop(self) -> None:
+        """別のイベントループで呼ぶと計測タスクを起動し直すことをテスト"""
+        monitor = LoopLagMonitor(interval=0.01)
+
+        async def start() -> bool:
+            monitor.ensure_started()
+            return monitor.running
+
+        assert asyncio.run(start()) is True
+        assert asyncio.run(start()) is True
@@ -1,5 +1,10 @@
 """main.pyのテスト"""
 
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
 from typer.testing import CliRunner
 
 from python_project_2026 import __version__
@@ -25,8 +30,106 @@ class TestCLI:
         assert result.exit_code == 0
         assert "こんにちは、テスト!" in result.stdout
 
+    def test_hello_from_file(self) -> None:
+        """ファイルの名前ごとにプレーンテキストで挨拶することをテスト"""
+        with TemporaryDirectory() as temp_dir:
+            names = Path(temp_dir) / "names.txt"
+            names.write_text("太郎\n\n花子\n", encoding="utf-8")
+            result = self.runner.invoke(app, ["hello", "--file", str(names)])
+        assert result.exit_code == 0
+        assert result.stdout == "こんにちは、太郎!\nこんにちは、花子!\n"
+
+    def test_hello_ndjson_from_stdin(self) -> None:
+        """標準入力の名前ごとにNDJSONで挨拶することをテスト"""
+        result = self.runner.invoke(
+            app, ["hello", "-f", "-", "--format", "ndjson", "--batch-size", "1"], input='a"b\nc\n'
+        )
+        assert result.exit_code == 0
+        lines = [json.loads(line) for line in result.stdout.splitlines()]
+        assert lines == [
+            {"message": 'こんにちは、a"b!', "name": 'a"b'},
+            {"message": "こんにちは、c!", "name": "c"},
+        ]
+
+    def test_hello_invalid_format(self) -> None:
+        """不正な出力形式がエラーになることをテスト"""
+        result = self.runner.invoke(app, ["hello", "--format", "xml"])
+        assert result.exit_code != 0
+
+    def test_hello_missing_file(self) -> None:
+        """存在しないファイルがエラーになることをテスト"""
+        result = self.runner.invoke(app, ["hello", "--file", "/nonexistent/names.txt"])
+        assert result.exit_code != 0
+
     def test_version(self) -> None:
         """バージョン表示をテスト"""
         result = self.runner.invoke(app, ["version"])
         assert result.exit_code == 0
         assert __version__ in result.stdout
+
+    def test_build_assets(self) -> None:
+        """静的ファイルのビルドをテスト"""
+        with TemporaryDirectory() as temp_dir:
+            result = self.runner.invoke(app, ["build-assets", "--output", temp_dir])
+            assert result.exit_code == 0
+            assert (Path(temp_dir) / "manifest.json").exists()
+
+    def test_du(self) -> None:
+        """duコマンドがディレクトリごとの合計を出力することをテスト"""
+        with TemporaryDirectory() as temp_dir, TemporaryDirectory() as output_dir:
+            root = Path(temp_dir)
+            (root / "sub").mkdir()
+            (root / "sub" / "file.txt").write_bytes(b"x" * 2048)
+            output = Path(output_dir) / "out" / "du.tsv"
+            result = self.runner.invoke(app, ["du", str(root), "--max-depth", "1", "--bytes", "--output", str(output)])
+            assert result.exit_code == 0
+            lines = output.read_text(encoding="utf-8").splitlines()
+        assert [line.split("\t")[1] for line in lines] == [str(root / "sub"), str(root)]
+        assert int(lines[0].split("\t")[0]) >= 2048
+
+    def test_du_human_readable(self) -> None:
+        """duコマンドがformat_sizeの形式で表示することをテスト"""
+        with TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "file.bin").write_bytes(b"x" * 4096)
+            result = self.runner.invoke(app, ["du", temp_dir, "-d", "0"])
+        assert result.exit_code == 0
+        assert result.stdout.endswith(f"\t{temp_dir}\n")
+        assert "KB\t" in result.stdout
+
+    def test_vendor_assets_requires_destination(self) -> None:
+        """保存先を指定しない場合は取り込まないことをテスト"""
+        with patch("python_project_2026.assets.vendor_assets") as download:
+            result = self.runner.invoke(app, ["vendor-assets"])
+        assert result.exit_code != 0
+        download.assert_not_called()
+
+    def test_vendor_assets_unverified(self) -> None:
+        """ハッシュを確認できなかった場合は終了コード1で中止することをテスト"""
+        with (
+            TemporaryDirectory() as temp_dir,
+            patch("python_project_2026.assets.vendor_assets", side_effect=ValueError("integrity mismatch")),
+        ):
+            result = self.runner.invoke(app, ["vendor-assets", "--dest", temp_dir])
+        assert result.exit_code == 1
+        assert "integrity mismatch" in result.stderr
+
+    def test_serve(self) -> None:
+        """serveコマンドが設定を組み立ててサーバーを起動することをテスト"""
+        with patch("python_project_2026.server.serve") as serve:
+            result = self.runner.invoke(
+                app,
+                ["serve", "--workers", "4", "--loop", "asyncio", "--http", "h11", "--max-requests", "1000"],
+            )
+        assert result.exit_code == 0, result.output
+        settings = serve.call_args.args[0]
+        assert settings.workers == 4
+        assert settings.limit_max_requests == 1000
+        assert settings.uvicorn_options()["loop"] == "asyncio"
+        assert "4 workers" in result.stdout
+
+    def test_serve_invalid_loop(self) -> None:
+        """不正なイベントループの指定がエラーになることをテスト"""
+        with patch("python_project_2026.server.serve") as serve:
+            result = self.runner.invoke(app, ["serve", "--loop", "trio"])
+        assert result.exit_code != 0
+        serve.assert_not_called()
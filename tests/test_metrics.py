@@ -0,0 +1,109 @@
+"""metrics.pyのテスト"""
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from python_project_2026.metrics import UNMATCHED_ROUTE, MetricsMiddleware, MetricsRegistry
+
+
+class TestMetricsRegistry:
+    """MetricsRegistryのテスト"""
+
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        """ヒストグラムのバケットが累積値で出力されることをテスト"""
+        registry = MetricsRegistry(buckets=(0.1, 1.0))
+        registry.observe("GET", "/a", 200, 0.05)
+        registry.observe("GET", "/a", 200, 0.5)
+        registry.observe("GET", "/a", 500, 2.0)
+
+        text = registry.render()
+        assert 'http_requests_total{method="GET",route="/a",status="200"} 2' in text
+        assert 'http_requests_total{method="GET",route="/a",status="500"} 1' in text
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/a",le="0.1"} 1' in text
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/a",le="1.0"} 2' in text
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/a",le="+Inf"} 3' in text
+        assert 'http_request_duration_seconds_count{method="GET",route="/a"} 3' in text
+        assert registry.total_requests() == 3
+
+    def test_bucket_boundary_is_inclusive(self) -> None:
+        """境界値ちょうどの観測がそのバケットに含まれることをテスト"""
+        registry = MetricsRegistry(buckets=(0.1,))
+        registry.observe("GET", "/a", 200, 0.1)
+        assert 'le="0.1"} 1' in registry.render()
+
+    def test_unknown_method_collapsed(self) -> None:
+        """未知のHTTPメソッドがOTHERにまとめられることをテスト"""
+        registry = MetricsRegistry()
+        registry.observe("FOO", "/a", 405, 0.0)
+        registry.observe("BAR", "/a", 405, 0.0)
+        assert 'http_requests_total{method="OTHER",route="/a",status="405"} 2' in registry.render()
+
+    def test_label_escaping(self) -> None:
+        """ラベル値がエスケープされることをテスト"""
+        registry = MetricsRegistry()
+        registry.observe("GET", '/a"b\\c', 200, 0.0)
+        assert 'route="/a\\"b\\\\c"' in registry.render()
+
+
+class TestMetricsMiddleware:
+    """MetricsMiddlewareのテスト"""
+
+    @pytest.fixture
+    def registry(self) -> MetricsRegistry:
+        return MetricsRegistry()
+
+    @pytest.fixture
+    def client(self, registry: MetricsRegistry) -> TestClient:
+        app = FastAPI()
+        router = APIRouter()
+
+        @router.get("/items/{item_id}")
+        async def item(item_id: int) -> dict[str, int]:
+            return {"id": item_id, "in_flight": registry.in_flight}
+
+        @app.get("/boom")
+        async def boom() -> None:
+            raise RuntimeError("boom")
+
+        app.include_router(router, prefix="/v1")
+        app.add_middleware(MetricsMiddleware, registry=registry)
+        return TestClient(app, raise_server_exceptions=False)
+
+    def test_path_parameters_are_templated(self, client: TestClient, registry: MetricsRegistry) -> None:
+        """パスパラメーターが値ではなくテンプレートとして記録されることをテスト"""
+        assert client.get("/v1/items/1").json()["in_flight"] == 1
+        client.get("/v1/items/2")
+        text = registry.render()
+        assert 'http_requests_total{method="GET",route="/v1/items/{item_id}",status="200"} 2' in text
+        assert registry.in_flight == 0
+
+    def test_parameterized_prefix_keeps_bounded_label(self, registry: MetricsRegistry) -> None:
+        """パラメーターを含むプレフィックスは値を含めず、ルート自身のテンプレートで記録することをテスト"""
+        app = FastAPI()
+        router = APIRouter()
+
+        @router.get("/items")
+        async def items(tenant: str) -> dict[str, str]:
+            return {"tenant": tenant}
+
+        app.include_router(router, prefix="/tenants/{tenant}")
+        app.add_middleware(MetricsMiddleware, registry=registry)
+        with TestClient(app) as client:
+            client.get("/tenants/a/items")
+            client.get("/tenants/b/items")
+        text = registry.render()
+        assert "/tenants/a" not in text
+        assert 'status="200"} 2' in text
+
+    def test_unmatched_route(self, client: TestClient, registry: MetricsRegistry) -> None:
+        """ルートに一致しないリクエストが共通のラベルで記録されることをテスト"""
+        client.get("/random/1")
+        client.get("/random/2")
+        assert f'route="{UNMATCHED_ROUTE}",status="404"}} 2' in registry.render()
+
+    def test_exception_is_recorded_as_500(self, client: TestClient, registry: MetricsRegistry) -> None:
+        """例外で終了したリクエストが500として記録されることをテスト"""
+        assert client.get("/boom").status_code == 500
+        assert 'route="/boom",status="500"} 1' in registry.render()
+        assert registry.in_flight == 0
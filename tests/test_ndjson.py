@@ -0,0 +1,98 @@
+"""ndjson.pyのテスト"""
+
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+
+from python_project_2026.ndjson import ItemTooLargeError, iter_json_array, iter_ndjson
+
+
+async def _chunks(data: bytes, size: int) -> AsyncIterator[bytes]:
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+async def _collect(iterator: AsyncIterator[Any]) -> list[Any]:
+    return [item async for item in iterator]
+
+
+class TestIterJsonArray:
+    """iter_json_array関数のテスト"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 1024])
+    async def test_any_chunk_boundary(self, size: int) -> None:
+        """チャンク境界(マルチバイト文字の途中を含む)に関係なく同じ結果になることをテスト"""
+        items = ["太郎", {"name": "花子"}, 12345, "", [1, 2], None, 1.5e10]
+        data = json.dumps(items, ensure_ascii=False, indent=1).encode()
+
+        assert await _collect(iter_json_array(_chunks(data, size))) == items
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("data", [b"[]", b"  [ ]  ", b"[\n]"])
+    async def test_empty_array(self, data: bytes) -> None:
+        """空配列をテスト"""
+        assert await _collect(iter_json_array(_chunks(data, 1))) == []
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("data", [b"", b"{}", b'["a"', b'["a" "b"]', b'["a",]', b"[1,"])
+    async def test_invalid(self, data: bytes) -> None:
+        """不正な入力で例外になることをテスト"""
+        with pytest.raises(json.JSONDecodeError):
+            await _collect(iter_json_array(_chunks(data, 2)))
+
+    @pytest.mark.asyncio
+    async def test_yields_before_end(self) -> None:
+        """配列の終端を待たずに要素を返すことをテスト"""
+
+        async def endless() -> AsyncIterator[bytes]:
+            yield b'["first", '
+            yield b'"second", '
+            raise AssertionError("should not be read")
+
+        iterator = iter_json_array(endless())
+        assert await anext(iterator) == "first"
+
+    @pytest.mark.asyncio
+    async def test_item_too_large(self) -> None:
+        """上限を超える要素は終端を待たずに打ち切ることをテスト"""
+
+        async def endless() -> AsyncIterator[bytes]:
+            yield b'["ok", "'
+            while True:
+                yield b"x" * 100
+
+        iterator = iter_json_array(endless(), max_item_size=1000)
+        assert await anext(iterator) == "ok"
+        with pytest.raises(ItemTooLargeError):
+            await anext(iterator)
+
+
+class TestIterNdjson:
+    """iter_ndjson関数のテスト"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("size", [1, 5, 1024])
+    async def test_lines(self, size: int) -> None:
+        """行単位で要素を返すことをテスト(空行と末尾改行なしを含む)"""
+        data = '"太郎"\n\n{"name": "花子"}\r\n"最後"'.encode()
+
+        assert await _collect(iter_ndjson(_chunks(data, size))) == ["太郎", {"name": "花子"}, "最後"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_line(self) -> None:
+        """不正な行で例外になることをテスト"""
+        with pytest.raises(json.JSONDecodeError):
+            await _collect(iter_ndjson(_chunks(b'"ok"\nnot json\n', 4)))
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("size", [3, 1024])
+    async def test_line_too_large(self, size: int) -> None:
+        """上限を超える行で例外になることをテスト(改行の有無によらない)"""
+        data = b'"ok"\n"' + b"x" * 100 + b'"\n'
+        with pytest.raises(ItemTooLargeError):
+            await _collect(iter_ndjson(_chunks(data, size), max_item_size=50))
+        with pytest.raises(ItemTooLargeError):
+            await _collect(iter_ndjson(_chunks(data.rstrip(), size), max_item_size=50))
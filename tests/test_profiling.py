@@ -0,0 +1,132 @@
+"""profiling.pyのテスト"""
+
+import asyncio
+import threading
+import time
+from collections import Counter
+from collections.abc import AsyncIterator
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from starlette.datastructures import Headers
+
+from python_project_2026.profiling import (
+    ProfilingMiddleware,
+    format_collapsed,
+    is_authorized,
+    sample_stacks,
+)
+
+
+def _busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        time.sleep(0.001)
+
+
+def _create_app(token: str | None = None, timeout: float = 30.0) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work() -> dict[str, int]:
+        return {"total": sum(range(1000))}
+
+    @app.get("/slow")
+    async def slow() -> None:
+        await asyncio.sleep(10)
+
+    @app.get("/events")
+    async def events() -> StreamingResponse:
+        async def endless() -> AsyncIterator[bytes]:
+            while True:
+                yield b"data: tick\n\n"
+                await asyncio.sleep(0.01)
+
+        return StreamingResponse(endless(), media_type="text/event-stream")
+
+    app.add_middleware(ProfilingMiddleware, token=token, timeout=timeout)
+    return app
+
+
+class TestIsAuthorized:
+    """is_authorized関数のテスト"""
+
+    def test_without_token(self) -> None:
+        """トークン未設定なら常に許可されることをテスト"""
+        assert is_authorized(Headers({}), None) is True
+
+    def test_with_token(self) -> None:
+        """トークン設定時はヘッダーの一致が必要なことをテスト"""
+        assert is_authorized(Headers({"x-profile-token": "secret"}), "secret") is True
+        assert is_authorized(Headers({"x-profile-token": "wrong"}), "secret") is False
+        assert is_authorized(Headers({}), "secret") is False
+
+
+class TestProfilingMiddleware:
+    """ProfilingMiddlewareのテスト"""
+
+    def test_passthrough_without_header(self) -> None:
+        """ヘッダーがなければ通常のレスポンスを返すことをテスト"""
+        response = TestClient(_create_app()).get("/work")
+        assert response.json() == {"total": 499500}
+        assert "x-profile-status" not in response.headers
+
+    def test_profile_request(self) -> None:
+        """ヘッダー付きのリクエストでcProfileの結果を返すことをテスト"""
+        response = TestClient(_create_app()).get("/work", headers={"X-Profile": "tottime"})
+        assert response.status_code == 200
+        assert response.headers["x-profile-status"] == "200"
+        assert response.headers["content-type"].startswith("text/plain")
+        assert response.text.startswith("# GET /work -> 200")
+        assert "function calls" in response.text
+
+    def test_event_stream_refused(self) -> None:
+        """SSEは計測せずに拒否し、プロファイラーを解放することをテスト"""
+        client = TestClient(_create_app())
+        response = client.get("/events", headers={"X-Profile": ""})
+        assert response.status_code == 400
+
+        response = client.get("/events", headers={"X-Profile": "", "Accept": "text/event-stream"})
+        assert response.status_code == 400
+        assert client.get("/work", headers={"X-Profile": ""}).headers["x-profile-status"] == "200"
+
+    def test_timeout(self) -> None:
+        """最長時間を超えるとそれまでの結果を返すことをテスト"""
+        response = TestClient(_create_app(timeout=0.05)).get("/slow", headers={"X-Profile": ""})
+        assert response.status_code == 200
+        assert response.headers["x-profile-status"] == "timeout"
+        assert "timed out after" in response.text
+
+    def test_token_required(self) -> None:
+        """トークンが一致しない場合は計測せずに通常のレスポンスを返すことをテスト"""
+        client = TestClient(_create_app(token="secret"))
+        response = client.get("/work", headers={"X-Profile": ""})
+        assert response.json() == {"total": 499500}
+
+        response = client.get("/work", headers={"X-Profile": "", "X-Profile-Token": "secret"})
+        assert response.headers["x-profile-status"] == "200"
+
+
+class TestSampleStacks:
+    """sample_stacks関数のテスト"""
+
+    def test_samples_other_threads(self) -> None:
+        """他スレッドのスタックが呼び出し元から順に記録されることをテスト"""
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy_loop, args=(stop,), name="busy-worker")
+        worker.start()
+        try:
+            samples = sample_stacks(0.05, interval=0.005)
+        finally:
+            stop.set()
+            worker.join()
+
+        worker_stacks = [stack for stack in samples if stack.startswith("busy-worker;")]
+        assert worker_stacks
+        assert any("_busy_loop (test_profiling.py:" in stack for stack in worker_stacks)
+        assert all(stack.index("run (") < stack.index("_busy_loop") for stack in worker_stacks)
+
+    def test_format_collapsed(self) -> None:
+        """collapsed stacks形式で出力されることをテスト"""
+        samples = Counter({"main;b": 2, "main;a": 3})
+        assert format_collapsed(samples) == "main;a 3\nmain;b 2\n"
@@ -0,0 +1,54 @@
+"""providers.pyのテスト"""
+
+import httpx
+import pytest
+
+from python_project_2026.providers import HttpDataProvider, LocalDataProvider
+
+
+class TestLocalDataProvider:
+    """LocalDataProviderのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_returns_built_payloads(self) -> None:
+        """構築関数の結果をそのまま返すことをテスト"""
+        provider = LocalDataProvider(api_info=lambda: {"message": "api"}, health=lambda: {"status": "healthy"})
+
+        assert await provider.api_info() == {"message": "api"}
+        assert await provider.health() == {"status": "healthy"}
+
+
+class TestHttpDataProvider:
+    """HttpDataProviderのテスト"""
+
+    @staticmethod
+    def _client(requested: list[str]) -> httpx.AsyncClient:
+        def handler(request: httpx.Request) -> httpx.Response:
+            requested.append(str(request.url))
+            if request.url.path == "/health":
+                return httpx.Response(200, json={"status": "healthy"})
+            return httpx.Response(200, json={"message": "remote"})
+
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    @pytest.mark.asyncio
+    async def test_fetches_from_base_url(self) -> None:
+        """ベースURLに対してリクエストすることをテスト"""
+        requested: list[str] = []
+        async with self._client(requested) as client:
+            provider = HttpDataProvider("http://api.internal:9000/", client=client)
+
+            assert await provider.api_info() == {"message": "remote"}
+            assert await provider.health() == {"status": "healthy"}
+
+        assert requested == ["http://api.internal:9000/api/", "http://api.internal:9000/health"]
+
+    @pytest.mark.asyncio
+    async def test_raises_on_error_status(self) -> None:
+        """エラーステータスを例外として扱うことをテスト"""
+        transport = httpx.MockTransport(lambda _request: httpx.Response(503))
+        async with httpx.AsyncClient(transport=transport) as client:
+            provider = HttpDataProvider("http://api.internal", client=client)
+
+            with pytest.raises(httpx.HTTPStatusError):
+                await provider.health()
@@ -0,0 +1,154 @@
+"""responses.pyのテスト"""
+
+import json
+
+import pytest
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from python_project_2026.responses import ModelResponse, PrecomputedJSON, TrustedModelRoute, etag_matches
+
+
+class Item(BaseModel):
+    """テスト用モデル"""
+
+    name: str
+    count: int
+
+
+class DetailedItem(Item):
+    """レスポンスモデルより多くのフィールドを持つモデル"""
+
+    secret: str
+
+
+class TestPrecomputedJSON:
+    """PrecomputedJSONのテスト"""
+
+    def test_body_matches_json_response(self) -> None:
+        """JSONResponseと同じバイト列になることをテスト"""
+        content = {"message": "こんにちは", "docs": None, "version": "1.0.0"}
+        precomputed = PrecomputedJSON.from_content(content)
+
+        assert precomputed.body == JSONResponse(content=content).body
+        assert json.loads(precomputed.body) == content
+
+    def test_etag_depends_on_content(self) -> None:
+        """内容が変わるとETagも変わることをテスト"""
+        first = PrecomputedJSON.from_content({"status": "healthy"})
+        second = PrecomputedJSON.from_content({"status": "healthy"})
+        other = PrecomputedJSON.from_content({"status": "degraded"})
+
+        assert first.etag == second.etag
+        assert first.etag != other.etag
+
+
+class TestEtagMatches:
+    """etag_matches関数のテスト"""
+
+    @pytest.mark.parametrize(
+        "header,expected",
+        [
+            (None, False),
+            ("", False),
+            ('"abc"', True),
+            ('W/"abc"', True),
+            ('"x", "abc"', True),
+            ("*", True),
+            ('"abcd"', False),
+        ],
+    )
+    def test_etag_matches(self, header: str | None, expected: bool) -> None:
+        """If-None-Matchヘッダーの比較をテスト"""
+        assert etag_matches(header, '"abc"') is expected
+
+
+class TestModelResponse:
+    """ModelResponseのテスト"""
+
+    def test_render_matches_model_dump_json(self) -> None:
+        """model_dump_jsonと同じバイト列になることをテスト"""
+        item = Item(name="テスト", count=1)
+        response = ModelResponse(item)
+
+        assert response.body == item.model_dump_json().encode()
+        assert response.media_type == "application/json"
+
+
+class TestTrustedModelRoute:
+    """TrustedModelRouteのテスト"""
+
+    @pytest.fixture
+    def client(self) -> TestClient:
+        router = APIRouter(route_class=TrustedModelRoute)
+
+        @router.get("/trusted", response_model=Item)
+        async def trusted() -> Item:
+            # 検証を経ずに構築したモデル(再検証されればエラーになる)
+            return Item.model_construct(name="unchecked", count="not-a-number")
+
+        @router.get("/subclass", response_model=Item)
+        async def subclass() -> Item:
+            return DetailedItem(name="a", count=1, secret="hidden")
+
+        @router.get("/excluded", response_model=Item, response_model_exclude={"count"})
+        async def excluded() -> Item:
+            return Item(name="a", count=1)
+
+        @router.post("/created", response_model=Item, status_code=201)
+        async def created() -> Item:
+            return Item(name="a", count=1)
+
+        @router.get("/with-response", response_model=Item)
+        async def with_response(response: Response) -> Item:
+            response.headers["X-Extra"] = "1"
+            response.set_cookie("seen", "yes")
+            return Item(name="a", count=1)
+
+        @router.get("/plain")
+        def plain() -> dict[str, str]:
+            return {"status": "ok"}
+
+        app = FastAPI()
+        app.include_router(router)
+        return TestClient(app)
+
+    @pytest.mark.filterwarnings("ignore::UserWarning")
+    def test_skips_revalidation(self, client: TestClient) -> None:
+        """レスポンスモデルと同じ型は再検証せずに返すことをテスト"""
+        response = client.get("/trusted")
+        assert response.status_code == 200
+        assert response.json() == {"name": "unchecked", "count": "not-a-number"}
+
+    def test_subclass_is_filtered(self, client: TestClient) -> None:
+        """サブクラスは通常どおりレスポンスモデルで絞り込まれることをテスト"""
+        assert client.get("/subclass").json() == {"name": "a", "count": 1}
+
+    def test_field_filters_respected(self, client: TestClient) -> None:
+        """フィールドの除外設定があるルートは通常の処理になることをテスト"""
+        assert client.get("/excluded").json() == {"name": "a"}
+
+    def test_route_status_code_used(self, client: TestClient) -> None:
+        """ルートに指定したステータスコードで返すことをテスト"""
+        response = client.post("/created")
+        assert response.status_code == 201
+        assert response.json() == {"name": "a", "count": 1}
+
+    def test_response_parameter_respected(self, client: TestClient) -> None:
+        """Response引数で設定したヘッダーとCookieが保持されることをテスト"""
+        response = client.get("/with-response")
+        assert response.headers["x-extra"] == "1"
+        assert response.cookies["seen"] == "yes"
+        assert response.json() == {"name": "a", "count": 1}
+
+    def test_sync_endpoint_unchanged(self, client: TestClient) -> None:
+        """同期エンドポイントはそのまま動作することをテスト"""
+        assert client.get("/plain").json() == {"status": "ok"}
+
+    def test_openapi_schema_kept(self, client: TestClient) -> None:
+        """OpenAPIスキーマにレスポンスモデルが残ることをテスト"""
+        schema = client.get("/openapi.json").json()
+        response_schema = schema["paths"]["/trusted"]["get"]["responses"]["200"]["content"]["application/json"]
+        assert response_schema["schema"] == {"$ref": "#/components/schemas/Item"}
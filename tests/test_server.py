@@ -0,0 +1,111 @@
+"""server.pyのテスト"""
+
+import socket
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from python_project_2026.server import (
+    STARTUP_FAILURE,
+    ReusePortSupervisor,
+    ServerSettings,
+    bind_reuse_port,
+    resolve_http,
+    resolve_loop,
+    reuse_port_available,
+    serve,
+)
+from python_project_2026.utils import default_workers
+
+
+class TestResolve:
+    """イベントループ・HTTPパーサーの選択のテスト"""
+
+    def test_auto_prefers_fast_implementations(self) -> None:
+        """インストール済みならuvloop/httptoolsを選ぶことをテスト"""
+        with patch("python_project_2026.server.find_spec", return_value=object()), patch("sys.platform", "linux"):
+            assert resolve_loop("auto") == "uvloop"
+            assert resolve_http("auto") == "httptools"
+
+    def test_auto_falls_back(self) -> None:
+        """未インストールなら標準実装にフォールバックすることをテスト"""
+        with patch("python_project_2026.server.find_spec", return_value=None):
+            assert resolve_loop("auto") == "asyncio"
+            assert resolve_http("auto") == "h11"
+
+    def test_explicit_missing_implementation(self) -> None:
+        """未インストールの実装を明示した場合はエラーになることをテスト"""
+        with patch("python_project_2026.server.find_spec", return_value=None):
+            with pytest.raises(ValueError, match="uvloop"):
+                resolve_loop("uvloop")
+            with pytest.raises(ValueError, match="httptools"):
+                resolve_http("httptools")
+
+    def test_unknown_choice(self) -> None:
+        """不明な指定がエラーになることをテスト"""
+        with pytest.raises(ValueError):
+            resolve_loop("trio")
+
+
+class TestServerSettings:
+    """ServerSettingsのテスト"""
+
+    def test_defaults(self) -> None:
+        """ワーカー数のデフォルトがCPU数であることをテスト"""
+        assert ServerSettings().workers == default_workers() >= 1
+
+    def test_uvicorn_options(self) -> None:
+        """uvicornのオプションに変換されることをテスト"""
+        settings = ServerSettings(workers=2, loop="asyncio", http="h11", backlog=128, limit_max_requests=10)
+        options = settings.uvicorn_options()
+        assert options["loop"] == "asyncio"
+        assert options["http"] == "h11"
+        assert options["backlog"] == 128
+        assert options["limit_max_requests"] == 10
+        assert options["workers"] == 2
+
+
+class TestServe:
+    """serve関数のテスト"""
+
+    def test_shared_socket(self) -> None:
+        """SO_REUSEPORTを使わない場合はuvicornのプロセス管理に任せることをテスト"""
+        with patch("python_project_2026.server.uvicorn.run") as run:
+            serve(ServerSettings(workers=3, loop="asyncio", http="h11"))
+        assert run.call_args.args[0] == "python_project_2026.api:app"
+        assert run.call_args.kwargs["workers"] == 3
+
+    @pytest.mark.skipif(not reuse_port_available(), reason="SO_REUSEPORT is not available")
+    def test_reuse_port(self) -> None:
+        """SO_REUSEPORT指定時はワーカーごとのソケットで起動することをテスト"""
+        with patch("python_project_2026.server.ReusePortSupervisor") as supervisor:
+            serve(ServerSettings(workers=2, loop="asyncio", http="h11", reuse_port=True))
+        assert supervisor.call_args.args[1] == 2
+        supervisor.return_value.run.assert_called_once()
+
+    @pytest.mark.skipif(not reuse_port_available(), reason="SO_REUSEPORT is not available")
+    def test_bind_reuse_port_allows_multiple_sockets(self) -> None:
+        """同じポートに複数のソケットをバインドできることをテスト"""
+        first = bind_reuse_port("127.0.0.1", 0)
+        try:
+            port = first.getsockname()[1]
+            second = bind_reuse_port("127.0.0.1", port)
+            second.close()
+            assert first.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT) == 1
+        finally:
+            first.close()
+
+
+class TestReusePortSupervisor:
+    """ReusePortSupervisorのテスト"""
+
+    def test_stops_on_startup_failure(self) -> None:
+        """起動に失敗したワーカーは再起動せず、構造化ログに記録して全体を止めることをテスト"""
+        supervisor = ReusePortSupervisor({}, workers=1)
+        supervisor.processes = [MagicMock(pid=123, exitcode=STARTUP_FAILURE, **{"is_alive.return_value": False})]
+        with patch.object(supervisor, "_spawn") as spawn, patch("python_project_2026.server.log") as log:
+            supervisor.replace_exited_workers()
+        spawn.assert_not_called()
+        assert supervisor.should_exit.is_set()
+        log.error.assert_called_once()
+        assert log.error.call_args.kwargs["pid"] == 123
@@ -0,0 +1,204 @@
+"""shared_stats.pyのテスト"""
+
+import os
+import sys
+import uuid
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from python_project_2026.shared_stats import SharedStats, runtime_dir, segment_size
+
+# /dev/shmのパスやパーミッション・所有者の確認はPOSIXでしか成り立たない
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="requires POSIX shared memory and permissions")
+
+
+class FakeClock:
+    """テスト用の手動で進める時計"""
+
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# 実在しないPID(別のワーカーとして扱う)
+DEAD_PID = 2**22 + 12345
+
+
+@pytest.fixture(autouse=True)
+def private_runtime_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """ロックファイルをテストごとの一時ディレクトリに置く"""
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    return tmp_path / "python-project-2026"
+
+
+@pytest.fixture
+def name() -> Iterator[str]:
+    segment = f"pp2026-test-{uuid.uuid4().hex[:8]}"
+    yield segment
+    Path(f"/dev/shm/{segment}").unlink(missing_ok=True)
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def _open(name: str, clock: FakeClock) -> SharedStats:
+    return SharedStats(name, slots=4, buckets=(0.1, 1.0), stale_after=5.0, clock=clock)
+
+
+class TestSharedStats:
+    """SharedStatsのテスト"""
+
+    def test_totals_across_workers(self, name: str, clock: FakeClock) -> None:
+        """別々に接続したワーカーの値を合計できることをテスト"""
+        first = _open(name, clock)
+        second = _open(name, clock)
+        try:
+            assert first.claim(pid=os.getpid()) == 0
+            assert second.claim(pid=DEAD_PID) == 1
+            first.observe(200, 0.05)
+            first.observe(503, 2.0)
+            second.observe(404, 0.5)
+            first.publish(ready=True, warmed_up=True, in_flight=3, loop_lag=0.002)
+            second.publish(ready=False, warmed_up=True, in_flight=1, loop_lag=0.0)
+
+            totals = second.totals()
+            assert totals.workers == 2
+            assert totals.ready_workers == 1
+            assert totals.in_flight == 4
+            assert totals.requests == 3
+            assert totals.statuses == {"1xx": 0, "2xx": 1, "3xx": 0, "4xx": 1, "5xx": 1}
+            assert totals.buckets == (1, 1, 1)
+            assert totals.duration_sum == pytest.approx(2.55)
+            assert totals.worker_stats[0].loop_lag == pytest.approx(0.002)
+        finally:
+            second.release()
+            first.release()
+
+    def test_render_metrics(self, name: str, clock: FakeClock) -> None:
+        """合計がPrometheus形式の累積ヒストグラムで出力されることをテスト"""
+        stats = _open(name, clock)
+        try:
+            stats.claim()
+            stats.observe(200, 0.1)
+            stats.observe(200, 0.5)
+            text = stats.render_metrics()
+            assert "instance_workers 1" in text
+            assert 'instance_http_requests_total{status_class="2xx"} 2' in text
+            assert 'instance_http_request_duration_seconds_bucket{le="0.1"} 1' in text
+            assert 'instance_http_request_duration_seconds_bucket{le="1.0"} 2' in text
+            assert 'instance_http_request_duration_seconds_bucket{le="+Inf"} 2' in text
+        finally:
+            stats.release()
+
+    def test_observe_without_slot_is_ignored(self, name: str, clock: FakeClock) -> None:
+        """スロット未確保のワーカーは書き込まないことをテスト"""
+        stats = _open(name, clock)
+        try:
+            stats.observe(200, 0.1)
+            stats.publish(ready=True, warmed_up=True, in_flight=1, loop_lag=0.0)
+            assert stats.totals().requests == 0
+        finally:
+            stats.release()
+
+    def test_stale_worker_is_not_counted(self, name: str, clock: FakeClock) -> None:
+        """ハートビートが途絶えたワーカーは動作中として数えず、累計には残すことをテスト"""
+        stats = _open(name, clock)
+        other = _open(name, clock)
+        try:
+            stats.claim()
+            other.claim(pid=DEAD_PID)
+            other.observe(200, 0.1)
+            other.publish(ready=True, warmed_up=True, in_flight=2, loop_lag=0.0)
+            clock.now += 10
+            stats.publish(ready=True, warmed_up=True, in_flight=0, loop_lag=0.0)
+
+            totals = stats.totals()
+            assert totals.workers == 1
+            assert totals.in_flight == 0
+            assert totals.requests == 1
+        finally:
+            other.close()
+            stats.release()
+
+    def test_replacement_worker_inherits_counters(self, name: str, clock: FakeClock) -> None:
+        """終了したワーカーのスロットを引き継ぎ、累計が減らないことをテスト"""
+        stats = _open(name, clock)
+        old = _open(name, clock)
+        try:
+            old.claim(pid=DEAD_PID)
+            old.observe(200, 0.1)
+            old.publish(ready=True, warmed_up=True, in_flight=5, loop_lag=0.0)
+            old.close()
+            clock.now += 10
+
+            assert stats.claim() == 0
+            totals = stats.totals()
+            assert totals.requests == 1
+            assert totals.in_flight == 0
+            assert [worker.pid for worker in totals.worker_stats] == [os.getpid()]
+        finally:
+            stats.release()
+
+    def test_no_free_slot(self, name: str, clock: FakeClock) -> None:
+        """スロットがすべて使用中ならRuntimeErrorになることをテスト"""
+        stats = SharedStats(name, slots=1, clock=clock)
+        other = SharedStats(name, slots=1, clock=clock)
+        try:
+            stats.claim()
+            with pytest.raises(RuntimeError, match="no free slot"):
+                other.claim(pid=DEAD_PID)
+        finally:
+            other.close()
+            stats.release()
+
+    def test_layout_mismatch(self, name: str, clock: FakeClock) -> None:
+        """既存の共有メモリとレイアウトが異なる場合はValueErrorになることをテスト"""
+        stats = _open(name, clock)
+        try:
+            with pytest.raises(ValueError, match="different layout"):
+                SharedStats(name, slots=8, buckets=(0.1, 1.0), clock=clock)
+        finally:
+            stats.release()
+
+    def test_last_worker_removes_segment(self, name: str, clock: FakeClock) -> None:
+        """最後のワーカーが解放すると共有メモリを削除することをテスト"""
+        first = _open(name, clock)
+        second = _open(name, clock)
+        first.claim()
+        second.claim(pid=os.getppid())
+        first.release()
+        assert Path(f"/dev/shm/{name}").exists()
+        second.release()
+        assert not Path(f"/dev/shm/{name}").exists()
+
+    def test_lock_file_in_private_dir(self, name: str, clock: FakeClock, private_runtime_dir: Path) -> None:
+        """ロックファイルは専用ディレクトリに作成し、最後のワーカーが削除することをテスト"""
+        stats = _open(name, clock)
+        stats.claim()
+        assert stats.lock_path == private_runtime_dir / f"{name}.lock"
+        assert stats.lock_path.exists()
+        assert private_runtime_dir.stat().st_mode & 0o777 == 0o700
+        stats.release()
+        assert not stats.lock_path.exists()
+
+
+class TestRuntimeDir:
+    """runtime_dir関数のテスト"""
+
+    def test_rejects_shared_directory(self, private_runtime_dir: Path) -> None:
+        """他のユーザーも書き込めるディレクトリは使わないことをテスト"""
+        private_runtime_dir.mkdir(mode=0o700)
+        private_runtime_dir.chmod(0o777)
+        with pytest.raises(OSError):
+            runtime_dir()
+
+
+def test_segment_size() -> None:
+    """ヘッダーとスロットの大きさから共有メモリのサイズを求めることをテスト"""
+    assert segment_size(2, 2) == (4 + 2 * (13 + 3)) * 8
@@ -0,0 +1,141 @@
+"""templating.pyのテスト"""
+
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import jinja2
+import pytest
+
+from python_project_2026.templating import FragmentRenderer, create_environment
+
+
+class FakeClock:
+    """テスト用の時計"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _renderer(ttl: float = 5.0, maxsize: int = 256) -> tuple[FragmentRenderer, FakeClock]:
+    clock = FakeClock()
+    env = jinja2.Environment(loader=jinja2.DictLoader({"frag.html": "<p>{{ value }}</p>"}), autoescape=True)
+    return FragmentRenderer(env, ttl=ttl, maxsize=maxsize, clock=clock), clock
+
+
+class TestCreateEnvironment:
+    """create_environment関数のテスト"""
+
+    def test_loads_package_templates(self) -> None:
+        """パッケージ内のテンプレートを読み込めることをテスト"""
+        env = create_environment()
+        html = env.get_template("fragments/health_check.html").render(
+            data={"status": "healthy", "version": "1.0.0"}, rendered_at="now"
+        )
+        assert "HEALTHY" in html
+        assert "1.0.0" in html
+
+    def test_bytecode_cache_written(self) -> None:
+        """バイトコードキャッシュが保存されることをテスト"""
+        with TemporaryDirectory() as temp_dir:
+            cache_dir = Path(temp_dir) / "jinja"
+            env = create_environment(cache_dir=cache_dir)
+            env.get_template("fragments/error.html")
+
+            assert any(cache_dir.iterdir())
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="owner and permission bits are POSIX-only")
+    def test_bytecode_cache_default_directory(self) -> None:
+        """保存先を指定しない場合はJinja2の既定(利用者ごとのディレクトリ)を使うことをテスト"""
+        env = create_environment(bytecode_cache=True)
+        assert isinstance(env.bytecode_cache, jinja2.FileSystemBytecodeCache)
+        directory = Path(env.bytecode_cache.directory)
+        assert directory.stat().st_uid == os.getuid()
+        assert directory.stat().st_mode & 0o077 == 0
+        assert create_environment().bytecode_cache is None
+
+    def test_fragments_have_no_leading_whitespace(self) -> None:
+        """フラグメントが空行から始まらないこと(SSEのイベントが空のdata行で始まらないこと)をテスト"""
+        env = create_environment()
+        contexts = {
+            "fragments/api_info.html": {"data": {}},
+            "fragments/health_check.html": {"data": {}},
+            "fragments/error.html": {"error": "e", "url": "/", "target": "#t", "indicator": "#i"},
+        }
+        for name, context in contexts.items():
+            html = env.get_template(name).render(**context)
+            assert html == html.strip(), name
+
+    def test_autoescape(self) -> None:
+        """エラーメッセージがエスケープされることをテスト"""
+        env = create_environment()
+        html = env.get_template("fragments/error.html").render(error="<script>", url="/", target="#t", indicator="#i")
+        assert "&lt;script&gt;" in html
+        assert "<script>" not in html
+
+
+class TestFragmentRenderer:
+    """FragmentRendererのテスト"""
+
+    def test_cache_hit_for_same_data(self) -> None:
+        """同じデータではキャッシュを返すことをテスト"""
+        renderer, _clock = _renderer()
+
+        first = renderer.render("frag.html", {"value": "a"})
+        second = renderer.render("frag.html", {"value": "a"})
+
+        assert first == second == "<p>a</p>"
+        assert renderer.hits == 1
+        assert renderer.misses == 1
+
+    def test_different_data_rendered_separately(self) -> None:
+        """異なるデータは別々に描画されることをテスト"""
+        renderer, _clock = _renderer()
+
+        assert renderer.render("frag.html", {"value": "a"}) == "<p>a</p>"
+        assert renderer.render("frag.html", {"value": "b"}) == "<p>b</p>"
+        assert renderer.misses == 2
+
+    def test_expires_after_ttl(self) -> None:
+        """TTL経過後は再描画することをテスト"""
+        renderer, clock = _renderer(ttl=5.0)
+        renderer.render("frag.html", {"value": "a"})
+
+        clock.now = 5.0
+        renderer.render("frag.html", {"value": "a"})
+
+        assert renderer.misses == 2
+
+    def test_rendered_at_is_not_cached(self) -> None:
+        """キャッシュから返す場合も描画時刻は現在時刻になることをテスト"""
+        times = iter([datetime(2026, 1, 1, 9, 0, 0), datetime(2026, 1, 1, 9, 0, 3)])
+        env = jinja2.Environment(loader=jinja2.DictLoader({"frag.html": "<p>{{ value }} {{ rendered_at }}</p>"}))
+        renderer = FragmentRenderer(env, clock=FakeClock(), now=lambda: next(times))
+
+        assert renderer.render("frag.html", {"value": "a"}) == "<p>a 2026-01-01 09:00:00</p>"
+        assert renderer.render("frag.html", {"value": "a"}) == "<p>a 2026-01-01 09:00:03</p>"
+        assert renderer.hits == 1
+
+    def test_cache_disabled(self) -> None:
+        """cache=FalseやTTL0では毎回描画することをテスト"""
+        renderer, _clock = _renderer(ttl=0)
+        renderer.render("frag.html", {"value": "a"})
+        renderer.render("frag.html", {"value": "a"})
+
+        assert renderer.hits == 0
+
+    def test_evicts_oldest_entry(self) -> None:
+        """上限を超えると最も古いエントリを破棄することをテスト"""
+        renderer, _clock = _renderer(maxsize=2)
+        for value in ("a", "b", "c"):
+            renderer.render("frag.html", {"value": value})
+
+        renderer.render("frag.html", {"value": "a"})
+
+        assert renderer.misses == 4
+        assert len(renderer._entries) == 2
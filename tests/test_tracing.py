@@ -0,0 +1,180 @@
+"""tracing.pyのテスト"""
+
+import json
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from python_project_2026.tracing import (
+    SPAN_KIND_CLIENT,
+    FileSpanExporter,
+    Span,
+    SpanMiddleware,
+    Trace,
+    TracingMiddleware,
+    TracingSettings,
+    current_trace,
+    parse_traceparent,
+    propagation_headers,
+    server_timing,
+    span,
+)
+
+TRACEPARENT = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+
+def _app(
+    sample_rate: float = 1.0,
+    exporter: FileSpanExporter | None = None,
+    trust_parent: bool = True,
+    expose_server_timing: bool = True,
+) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int) -> dict[str, int]:
+        with span("db", "select"):
+            pass
+        with span("http.client", "GET /remote", kind=SPAN_KIND_CLIENT):
+            headers = propagation_headers()
+        return {"id": item_id, "propagated": len(headers)}
+
+    @app.get("/boom")
+    async def boom() -> None:
+        with span("work"):
+            raise RuntimeError("boom")
+
+    app.add_middleware(SpanMiddleware, name="handler")
+    settings = TracingSettings(
+        sample_rate=sample_rate, trust_parent=trust_parent, expose_server_timing=expose_server_timing
+    )
+    app.add_middleware(TracingMiddleware, settings=settings, exporter=exporter)
+    return app
+
+
+def _timings(header: str) -> list[str]:
+    return [entry.split(";")[0] for entry in header.split(", ")]
+
+
+class TestTracingMiddleware:
+    """TracingMiddlewareのテスト"""
+
+    def test_server_timing_header(self) -> None:
+        """トレース対象のリクエストに区間ごとのServer-Timingが付くことをテスト"""
+        response = TestClient(_app()).get("/items/1")
+        assert response.json()["propagated"] == 1
+        header = response.headers["server-timing"]
+        assert _timings(header) == ["app", "handler", "db", "http.client"]
+        assert "db;dur=" in header
+        assert 'desc="select"' in header
+
+    def test_not_sampled(self) -> None:
+        """サンプリング対象外ならヘッダーを付けず、区間も記録しないことをテスト"""
+        response = TestClient(_app(sample_rate=0.0)).get("/items/1")
+        assert response.status_code == 200
+        assert "server-timing" not in response.headers
+
+    def test_traceparent_sampled_flag(self) -> None:
+        """traceparentヘッダーのsampledフラグがサンプリング率より優先されることをテスト"""
+        client = TestClient(_app(sample_rate=0.0))
+        assert "server-timing" in client.get("/items/1", headers={"traceparent": TRACEPARENT}).headers
+        unsampled = TRACEPARENT[:-2] + "00"
+        assert "server-timing" not in TestClient(_app()).get("/items/1", headers={"traceparent": unsampled}).headers
+
+    def test_untrusted_traceparent_ignored(self) -> None:
+        """信頼しない設定ではtraceparentヘッダーでトレースを強制できないことをテスト"""
+        client = TestClient(_app(sample_rate=0.0, trust_parent=False))
+        assert "server-timing" not in client.get("/items/1", headers={"traceparent": TRACEPARENT}).headers
+
+    def test_server_timing_opt_in(self) -> None:
+        """Server-Timingヘッダーは設定した場合のみ付けることをテスト"""
+        response = TestClient(_app(expose_server_timing=False)).get("/items/1")
+        assert response.status_code == 200
+        assert "server-timing" not in response.headers
+
+    def test_export(self, tmp_path: Path) -> None:
+        """終了したトレースがOTLP/JSON形式でファイルに追記されることをテスト"""
+        exporter = FileSpanExporter(tmp_path / "traces" / "spans.jsonl")
+        client = TestClient(_app(exporter=exporter), raise_server_exceptions=False)
+        client.get("/items/1", headers={"traceparent": TRACEPARENT})
+        client.get("/boom")
+        assert exporter.flush()
+        exporter.close()
+
+        lines = (tmp_path / "traces" / "spans.jsonl").read_text().splitlines()
+        assert len(lines) == 2
+        resource = json.loads(lines[0])["resourceSpans"][0]
+        assert resource["resource"]["attributes"][0] == {
+            "key": "service.name",
+            "value": {"stringValue": "python-project-2026"},
+        }
+        spans = {item["name"]: item for item in resource["scopeSpans"][0]["spans"]}
+        root = spans["app"]
+        assert root["traceId"] == "4bf92f3577b34da6a3ce929d0e0e4736"
+        assert root["parentSpanId"] == "00f067aa0ba902b7"
+        assert root["kind"] == 2
+        assert {"key": "http.route", "value": {"stringValue": "/items/{item_id}"}} in root["attributes"]
+        assert {"key": "http.response.status_code", "value": {"intValue": "200"}} in root["attributes"]
+        assert spans["handler"]["parentSpanId"] == root["spanId"]
+        assert spans["db"]["parentSpanId"] == spans["handler"]["spanId"]
+        assert spans["http.client"]["kind"] == SPAN_KIND_CLIENT
+        assert int(root["endTimeUnixNano"]) >= int(root["startTimeUnixNano"])
+        assert spans["http.client"]["traceId"] == root["traceId"]
+
+        failed = {item["name"]: item for item in json.loads(lines[1])["resourceSpans"][0]["scopeSpans"][0]["spans"]}
+        assert failed["app"]["status"] == {"code": 2}
+        assert {"key": "error.type", "value": {"stringValue": "RuntimeError"}} in failed["work"]["attributes"]
+
+
+class TestSpan:
+    """span()のテスト"""
+
+    def test_noop_outside_trace(self) -> None:
+        """トレース対象外では何も記録しないことをテスト"""
+        assert current_trace() is None
+        with span("anything") as current:
+            assert current is None
+        assert propagation_headers() == {}
+
+
+def test_server_timing_escapes_description() -> None:
+    """Server-Timingのdescに使えない文字を置き換えることをテスト"""
+    trace = Trace()
+    item = Span("template", 'a"b\\c日本', None, 1)
+    item.end = item.start + 0.0015
+    trace.spans.append(item)
+    assert server_timing(trace, item.start) == 'template;dur=1.500;desc="a?b?c??"'
+
+
+def test_server_timing_self_time() -> None:
+    """入れ子の区間は子の区間を除いた自己時間を出力することをテスト"""
+    trace = Trace()
+    root = Span("app", None, None, 2)
+    cors = Span("cors", None, root.span_id, 1)
+    handler = Span("handler", None, cors.span_id, 1)
+    for item, start, end in ((root, 0.0, 0.010), (cors, 0.001, 0.009), (handler, 0.002, 0.008)):
+        item.start, item.end = start, end
+        trace.spans.append(item)
+    assert server_timing(trace, 0.0) == "app;dur=10.000, cors;dur=2.000, handler;dur=6.000"
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (TRACEPARENT, ("4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7", True)),
+        (TRACEPARENT.upper(), ("4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7", True)),
+        (
+            "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00",
+            ("4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7", False),
+        ),
+        ("00-00000000000000000000000000000000-00f067aa0ba902b7-01", None),
+        ("ff-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01", None),
+        ("garbage", None),
+    ],
+)
+def test_parse_traceparent(value: str, expected: tuple[str, str, bool] | None) -> None:
+    """traceparentヘッダーの解析をテスト"""
+    parsed = parse_traceparent(value)
+    assert (None if parsed is None else (parsed.trace_id, parsed.span_id, parsed.sampled)) == expected
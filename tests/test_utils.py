@@ -2,10 +2,21 @@
 
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from typing import Any, ClassVar
 
 import pytest
 
-from python_project_2026.utils import ensure_directory, format_size, safe_get
+from python_project_2026.utils import (
+    compile_path,
+    default_workers,
+    ensure_directory,
+    extract_paths,
+    format_size,
+    format_sizes,
+    get_path,
+    pick_paths,
+    safe_get,
+)
 
 
 class TestEnsureDirectory:
@@ -52,6 +63,82 @@ class TestFormatSize:
         assert format_size(size_bytes) == expected
 
 
+def _format_size_by_loop(size_bytes: float) -> str:
+    """単位を繰り返し除算で求める従来の実装(比較用)"""
+    if size_bytes == 0:
+        return "0B"
+    size_names = ["B", "KB", "MB", "GB", "TB"]
+    i = 0
+    size_float = float(size_bytes)
+    while size_float >= 1024.0 and i < len(size_names) - 1:
+        size_float /= 1024.0
+        i += 1
+    return f"{size_float:.1f}{size_names[i]}"
+
+
+class _FakeArray:
+    """NumPy配列のようにtolist()を持つオブジェクト"""
+
+    def __init__(self, values: list[int]) -> None:
+        self.values = values
+
+    def tolist(self) -> list[int]:
+        return list(self.values)
+
+
+# 単位の境界とその前後、TBを超える値、負の値、浮動小数点数
+SIZE_EDGE_CASES = (
+    *(value for k in range(6) for value in (1024**k - 1, 1024**k, 1024**k + 1)),
+    1023 * 1024 + 1000,
+    2**53 + 1,
+    2**70,
+    -1,
+    -4096,
+    1023.99,
+    1536.0,
+)
+
+
+class TestFormatSizes:
+    """format_sizes関数のテスト"""
+
+    def test_matches_scalar_function(self) -> None:
+        """デフォルト設定ではformat_sizeおよび従来の実装と同じ文字列になることをテスト"""
+        values = [*SIZE_EDGE_CASES, *range(0, 5_000_000, 4099)]
+        expected = [_format_size_by_loop(value) for value in values]
+        assert format_sizes(values) == expected
+        assert [format_size(value) for value in values] == expected
+
+    def test_memoize(self) -> None:
+        """メモ化しても結果が変わらないことをテスト"""
+        values = [0, 1024, 1024, 512, 0, 1024]
+        assert format_sizes(values, memoize=True) == format_sizes(values)
+
+    def test_array_like(self) -> None:
+        """tolist()を持つ配列を受け付けることをテスト"""
+        assert format_sizes(_FakeArray([0, 2048])) == ["0B", "2.0KB"]
+
+    def test_generator(self) -> None:
+        """反復可能オブジェクトを受け付けることをテスト"""
+        assert format_sizes(1024**k for k in range(3)) == ["1.0B", "1.0KB", "1.0MB"]
+
+    @pytest.mark.parametrize(
+        "units,expected",
+        [
+            ("iec", ["999.00B", "1.50KiB", "1.00MiB"]),
+            ("si", ["999.00B", "1.54kB", "1.05MB"]),
+        ],
+    )
+    def test_units_and_precision(self, units: str, expected: list[str]) -> None:
+        """IEC/SI単位系と精度の指定をテスト"""
+        assert format_sizes([999, 1536, 1048576], units=units, precision=2) == expected
+
+    def test_unknown_units(self) -> None:
+        """不明な単位系がエラーになることをテスト"""
+        with pytest.raises(ValueError):
+            format_sizes([1], units="jedec")
+
+
 class TestSafeGet:
     """safe_get関数のテスト"""
 
@@ -69,3 +156,68 @@ class TestSafeGet:
         """存在しないキーでデフォルト値なしの場合をテスト"""
         data: dict[str, str] = {}
         assert safe_get(data, "missing") is None
+
+
+class TestGetPath:
+    """get_path関数とcompile_path関数のテスト"""
+
+    DATA: ClassVar[dict[str, Any]] = {
+        "a": {"b": [{"c": 1}, {"c": None}]},
+        "dotted.key": "dotted",
+        "items": [10, 20, 30],
+    }
+
+    @pytest.mark.parametrize(
+        "path,expected",
+        [
+            ("a.b[0].c", 1),
+            ("a.b[1].c", None),
+            ("items[-1]", 30),
+            ('["dotted.key"]', "dotted"),
+            ("['dotted.key']", "dotted"),
+            ("a.b", [{"c": 1}, {"c": None}]),
+        ],
+    )
+    def test_existing_path(self, path: str, expected: Any) -> None:
+        """存在するパスの値の取得をテスト"""
+        assert get_path(self.DATA, path, "default") == expected
+
+    @pytest.mark.parametrize("path", ["missing", "a.b[5].c", "a.b.c", "items[0].x", "a.b[0].c.d"])
+    def test_missing_path_with_default(self, path: str) -> None:
+        """存在しない、または型が合わないパスでデフォルト値を返すことをテスト"""
+        assert get_path(self.DATA, path, "default") == "default"
+
+    @pytest.mark.parametrize("path", ["", "a..b", ".a", "a.", "a[", "a[x]", "a.[0]", "a]"])
+    def test_invalid_path(self, path: str) -> None:
+        """不正なパス式がエラーになることをテスト"""
+        with pytest.raises(ValueError):
+            compile_path(path)
+
+    def test_compiled_once(self) -> None:
+        """同じパス式は解析済みのアクセサーを再利用することをテスト"""
+        assert compile_path("a.b[0].c") is compile_path("a.b[0].c")
+        assert compile_path("a.b[0].c").keys == ("a", "b", 0, "c")
+
+
+class TestExtractPaths:
+    """pick_paths関数とextract_paths関数のテスト"""
+
+    def test_pick_paths(self) -> None:
+        """1件のデータから複数のフィールドを取り出すことをテスト"""
+        data = {"user": {"name": "太郎", "tags": ["admin"]}}
+        fields = {"name": "user.name", "role": "user.tags[0]", "age": "user.age"}
+        assert pick_paths(data, fields) == {"name": "太郎", "role": "admin", "age": None}
+
+    def test_extract_paths(self) -> None:
+        """レコードの一覧から複数のフィールドをまとめて取り出すことをテスト"""
+        rows = [{"id": 1, "meta": {"size": 10}}, {"id": 2}, "not a dict"]
+        result = extract_paths(rows, {"id": "id", "size": "meta.size"}, default=0)
+        assert result == [{"id": 1, "size": 10}, {"id": 2, "size": 0}, {"id": 0, "size": 0}]
+
+
+class TestDefaultWorkers:
+    """default_workers関数のテスト"""
+
+    def test_at_least_one(self) -> None:
+        """1以上のCPU数を返すことをテスト"""
+        assert default_workers() >= 1